@@ -0,0 +1,535 @@
+""" Headless command line interface for running QAX checks. This module must
+not import Qt (PySide2) so that it can be run on processing servers that have
+no display.
+"""
+from multiprocessing.connection import wait
+from pathlib import Path
+from typing import List, Optional
+import json
+import logging
+import multiprocessing as mp
+import os
+import sys
+import time
+
+import click
+
+from ausseabed.qajson.model import QajsonRoot
+from ausseabed.qajson.parser import QajsonParser
+
+from hyo2.qax.app import app_info
+from hyo2.qax.lib.check_executor import CheckExecutor, DATA_LEVELS
+from hyo2.qax.lib.check_options import CheckOption, ExecutorOption
+from hyo2.qax.lib.config import QaxConfig
+from hyo2.qax.lib.event_stream import EventStreamSummary, read_events
+from hyo2.qax.lib.logging import set_logging
+from hyo2.qax.lib.plugin import QaxPlugins
+from hyo2.qax.lib.plugin_service import PluginService
+from hyo2.qax.lib.qajson_util import QajsonCsvExporter, QajsonParquetExporter
+from hyo2.qax.lib.qajson_builder import get_profile, get_specification, \
+    get_specification_checks, get_profile_checks, group_files, build_qajson
+from hyo2.qax.lib.scheduler import SchedulingPolicy
+from hyo2.qax.lib.work_queue import QueueWorker
+
+logger = logging.getLogger(__name__)
+
+# exit codes returned by qax-run
+EXIT_OK = 0
+# one or more checks failed to execute
+EXIT_CHECK_FAILED = 1
+# check execution was stopped due to an error, or invalid arguments given
+EXIT_ERROR = 2
+# qax-worker process has run its maximum number of jobs and should be
+# replaced with a new process
+EXIT_WORKER_RECYCLE = 3
+
+# exporters of the --results table, by file extension
+RESULTS_EXPORTERS = {
+    '.csv': QajsonCsvExporter,
+    '.parquet': QajsonParquetExporter,
+}
+
+
+class ConsoleCheckExecutor(CheckExecutor):
+    """ CheckExecutor that reports progress and status via the logger rather
+    than print statements.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super(ConsoleCheckExecutor, self).__init__(*args, **kwargs)
+        self._last_progress = {}
+
+    def _progress_callback(self, check_tool, progress):
+        super(ConsoleCheckExecutor, self)._progress_callback(
+            check_tool, progress)
+        name = 'all checks' if check_tool is None else check_tool.name
+        # only log every 10% to keep the output readable
+        step = int(progress * 10)
+        if self._last_progress.get(name) != step:
+            self._last_progress[name] = step
+            logger.info(f"{name} {progress * 100:.0f}%")
+
+    def _check_tool_started(self, check_tool, check_number, total_check_count):
+        super(ConsoleCheckExecutor, self)._check_tool_started(
+            check_tool, check_number, total_check_count)
+        logger.info(
+            f"Started {check_tool.name} ({check_number}/{total_check_count})")
+
+    def _checks_complete(self):
+        super(ConsoleCheckExecutor, self)._checks_complete()
+        logger.info(f"Check execution finished with status {self.status}")
+
+    def _set_status(self, status: str):
+        super(ConsoleCheckExecutor, self)._set_status(status)
+        logger.debug(f"Status {status}")
+
+
+def get_check_tool_class_names(qa_json: QajsonRoot, profile) -> List[str]:
+    """ Gets the class names of the check tools (plugins) that implement the
+    checks included in the qa_json. Order follows the profile definition.
+    """
+    profile_plugins = QaxPlugins.instance().get_profile_plugins(profile)
+    check_ids = set()
+    for data_level_name in DATA_LEVELS:
+        data_level = qa_json.qa.get_data_level(data_level_name)
+        if data_level is None:
+            continue
+        for check in data_level.checks:
+            check_ids.add(check.info.id)
+
+    class_names = []
+    for plugin in profile_plugins.plugins:
+        if any(plugin.implements_check(check_id) for check_id in check_ids):
+            class_names.append(plugin.plugin_class)
+    return class_names
+
+
+def count_failed_checks(qa_json: QajsonRoot) -> int:
+    """ Number of checks that have a failed (or aborted) execution status
+    """
+    count = 0
+    for data_level_name in DATA_LEVELS:
+        data_level = qa_json.qa.get_data_level(data_level_name)
+        if data_level is None:
+            continue
+        for check in data_level.checks:
+            outputs = check.outputs
+            if (
+                outputs is not None and
+                outputs.execution is not None and
+                outputs.execution.status in ['failed', 'aborted']
+            ):
+                count += 1
+    return count
+
+
+def load_plugins(config_folder: Optional[Path]) -> QaxConfig:
+    """ Loads the QAX config and the check tool plugins it references
+    """
+    if config_folder is None:
+        config_folder = Path(os.path.join(app_info.app_path, "config"))
+    config = QaxConfig(config_folder)
+    config.load()
+    plugins = QaxPlugins()
+    plugins.load(config)
+    return config
+
+
+def list_input_files(input_folder: Path, recursive: bool) -> List[str]:
+    pattern = '**/*' if recursive else '*'
+    return sorted([
+        str(p) for p in input_folder.glob(pattern) if p.is_file()
+    ])
+
+
+@click.command()
+@click.option(
+    '-p', '--profile', 'profile_name', required=True,
+    help="Name of the QAX profile (eg; AusSeabed)")
+@click.option(
+    '-s', '--specification', 'specification_name', default=None,
+    help="Name of the specification used for check parameters. Defaults to "
+    "the first specification of the profile.")
+@click.option(
+    '-q', '--qajson', 'qajson_file', default=None,
+    type=click.Path(exists=True, dir_okay=False, path_type=Path),
+    help="QAJSON file defining the checks to run")
+@click.option(
+    '-i', '--input', 'input_folder', default=None,
+    type=click.Path(exists=True, file_okay=False, path_type=Path),
+    help="Folder of input files. A QAJSON is built that includes each check "
+    "of the specification for every supported file.")
+@click.option(
+    '--recursive', is_flag=True, default=False,
+    help="Include files in sub folders of the input folder")
+@click.option(
+    '--single-dataset', is_flag=True, default=False,
+    help="Include all input files in a single dataset, rather than one "
+    "dataset per file")
+@click.option(
+    '-o', '--output', 'output_file', default=None,
+    type=click.Path(dir_okay=False, path_type=Path),
+    help="File the updated QAJSON is written to. Defaults to the input QAJSON "
+    "file, or qajson.json within the input folder.")
+@click.option(
+    '-c', '--config', 'config_folder', default=None,
+    type=click.Path(exists=True, file_okay=False, path_type=Path),
+    help="QAX config folder. Defaults to the config bundled with QAX.")
+@click.option(
+    '-w', '--workers', default=1, type=click.IntRange(min=1),
+    help="Number of worker processes check tools are run on")
+@click.option(
+    '--split-by-file-group', is_flag=True, default=False,
+    help="Run each dataset as a separate job")
+@click.option(
+    '--spatial-qajson/--no-spatial-qajson', default=True,
+    help="Include summary spatial outputs in the QAJSON")
+@click.option(
+    '--spatial-export', 'spatial_export_folder', default=None,
+    type=click.Path(file_okay=False, path_type=Path),
+    help="Export detailed spatial outputs to this folder")
+@click.option(
+    '--tile-size', default=None, type=click.IntRange(min=1),
+    help="Grid processing tile size (used for both x and y)")
+@click.option(
+    '--checkpoint', 'checkpoint_file', default=None,
+    type=click.Path(dir_okay=False, path_type=Path),
+    help="Record the outputs of each check to this journal file as it "
+    "completes")
+@click.option(
+    '--resume', is_flag=True, default=False,
+    help="Restore the outputs of checks recorded in the checkpoint file, "
+    "rather than run them again. Requires --checkpoint.")
+@click.option(
+    '--cache', 'cache_folder', default=None,
+    type=click.Path(file_okay=False, path_type=Path),
+    help="Folder of the check output cache. Checks with unchanged input "
+    "files, parameters and version are restored from the cache.")
+@click.option(
+    '--cache-size', default=1024, type=click.IntRange(min=1),
+    help="Maximum size of the check output cache in MB")
+@click.option(
+    '--scheduling-policy', default='fifo',
+    type=click.Choice([p.value for p in SchedulingPolicy]),
+    help="Order checks are run in. fifo follows the order of the profile, sjf "
+    "runs the checks predicted to be quickest first.")
+@click.option(
+    '--history', 'history_file', default=None,
+    type=click.Path(dir_okay=False, path_type=Path),
+    help="Throughput history file, used to predict check durations for the "
+    "sjf scheduling policy. Updated after each run.")
+@click.option(
+    '--memory-fraction', default=None, type=click.FloatRange(min=0, max=1),
+    help="Fraction of the available memory that parallel jobs may use. Jobs "
+    "are queued until memory is available. 0 disables the limit.")
+@click.option(
+    '--check-timeout', default=None, type=click.FloatRange(min=0, min_open=True),
+    help="Time budget in seconds for each check. Checks that exceed their "
+    "budget are aborted.")
+@click.option(
+    '--run-timeout', default=None, type=click.FloatRange(min=0, min_open=True),
+    help="Time budget in seconds for all checks. Once exceeded the remaining "
+    "checks are aborted.")
+@click.option(
+    '--continue-on-error', is_flag=True, default=False,
+    help="Record an error raised by a check as a failed check, and continue "
+    "running the remaining checks")
+@click.option(
+    '--retry-failed', is_flag=True, default=False,
+    help="With --continue-on-error, run failed checks again at the end of "
+    "the run with a reduced tile size")
+@click.option(
+    '--telemetry', 'telemetry_file', default=None,
+    type=click.Path(dir_okay=False, path_type=Path),
+    help="Append the resource use (wall time, CPU time, peak memory, bytes "
+    "read) of each check to this JSON lines file")
+@click.option(
+    '--telemetry-in-outputs', is_flag=True, default=False,
+    help="Include the resource use of each check in its QAJSON outputs")
+@click.option(
+    '--events', 'event_stream', default=None,
+    help="Write a JSON lines stream of the run's events (progress, status, "
+    "check outputs updated and log records) to this file, or TCP socket "
+    "given as tcp://host:port. Summarised by qax-events.")
+@click.option(
+    '--results', 'results_file', default=None,
+    type=click.Path(dir_okay=False, path_type=Path),
+    help="Also save the check results as a table with one row per check and "
+    "input file, to a .csv or .parquet file (requires pyarrow)")
+@click.option(
+    '--work-queue', 'work_queue_file', default=None,
+    type=click.Path(dir_okay=False, path_type=Path),
+    help="Publish jobs to this work queue database, rather than running them "
+    "locally. Jobs are run by qax-worker processes using the same queue.")
+@click.option(
+    '--log-level', default='INFO',
+    type=click.Choice(['DEBUG', 'INFO', 'WARNING', 'ERROR']),
+    help="Log level of QAX and plugin messages")
+def qax_run(
+        profile_name: str,
+        specification_name: Optional[str],
+        qajson_file: Optional[Path],
+        input_folder: Optional[Path],
+        recursive: bool,
+        single_dataset: bool,
+        output_file: Optional[Path],
+        config_folder: Optional[Path],
+        workers: int,
+        split_by_file_group: bool,
+        spatial_qajson: bool,
+        spatial_export_folder: Optional[Path],
+        tile_size: Optional[int],
+        checkpoint_file: Optional[Path],
+        resume: bool,
+        cache_folder: Optional[Path],
+        cache_size: int,
+        scheduling_policy: str,
+        history_file: Optional[Path],
+        memory_fraction: Optional[float],
+        check_timeout: Optional[float],
+        run_timeout: Optional[float],
+        continue_on_error: bool,
+        retry_failed: bool,
+        telemetry_file: Optional[Path],
+        telemetry_in_outputs: bool,
+        event_stream: Optional[str],
+        results_file: Optional[Path],
+        work_queue_file: Optional[Path],
+        log_level: str):
+    """ Runs QAX checks without the graphical user interface.
+    """
+    set_logging(
+        default_logging=logging.WARNING,
+        qax_logging=logging.getLevelName(log_level)
+    )
+
+    if (qajson_file is None) == (input_folder is None):
+        raise click.UsageError("Provide one of --qajson or --input")
+    if resume and checkpoint_file is None:
+        raise click.UsageError("--resume requires --checkpoint")
+    if (
+        results_file is not None and
+        results_file.suffix.lower() not in RESULTS_EXPORTERS
+    ):
+        raise click.BadParameter(
+            "must be a .csv or .parquet file", param_hint='--results')
+
+    config = load_plugins(config_folder)
+
+    profile = get_profile(profile_name)
+    if profile is None:
+        names = ", ".join([p.name for p in config.profiles])
+        raise click.BadParameter(
+            f"{profile_name} is not one of {names}", param_hint='--profile')
+
+    specification = get_specification(profile, specification_name)
+    if specification_name is not None and specification is None:
+        names = ", ".join([s.name for s in profile.specifications])
+        raise click.BadParameter(
+            f"{specification_name} is not one of {names}",
+            param_hint='--specification')
+
+    if qajson_file is not None:
+        qa_json = QajsonParser(qajson_file).root
+        if output_file is None:
+            output_file = qajson_file
+    else:
+        if specification is None:
+            checks = get_profile_checks(profile)
+        else:
+            checks = get_specification_checks(profile, specification)
+        profile_plugins = QaxPlugins.instance().get_profile_plugins(profile)
+        plugin_service = PluginService(profile_plugins.plugins)
+        grouped_files = group_files(
+            plugin_service,
+            list_input_files(input_folder, recursive),
+            single_dataset
+        )
+        qa_json = build_qajson(
+            plugin_service, grouped_files, checks, specification)
+        if output_file is None:
+            output_file = input_folder.joinpath('qajson.json')
+        logger.info(
+            f"Found {len(grouped_files)} datasets in {input_folder}")
+
+    options = {
+        CheckOption.spatial_output_qajson: spatial_qajson,
+        CheckOption.spatial_output_export: spatial_export_folder is not None,
+        CheckOption.spatial_output_export_location: (
+            None if spatial_export_folder is None
+            else str(spatial_export_folder)
+        ),
+        ExecutorOption.workers: workers,
+        ExecutorOption.split_by_file_group: split_by_file_group,
+        ExecutorOption.resume: resume,
+    }
+    if checkpoint_file is not None:
+        options[ExecutorOption.checkpoint_file] = str(checkpoint_file)
+    if cache_folder is not None:
+        options[ExecutorOption.cache_folder] = str(cache_folder)
+        options[ExecutorOption.cache_max_size] = cache_size * 1024 * 1024
+    options[ExecutorOption.scheduling_policy] = scheduling_policy
+    if history_file is not None:
+        options[ExecutorOption.throughput_history] = str(history_file)
+    if memory_fraction is not None:
+        options[ExecutorOption.memory_fraction] = memory_fraction
+    if check_timeout is not None:
+        options[ExecutorOption.check_timeout] = check_timeout
+    if run_timeout is not None:
+        options[ExecutorOption.run_timeout] = run_timeout
+    options[ExecutorOption.continue_on_error] = continue_on_error
+    options[ExecutorOption.retry_failed] = retry_failed
+    if telemetry_file is not None:
+        options[ExecutorOption.telemetry_file] = str(telemetry_file)
+    options[ExecutorOption.telemetry_in_outputs] = telemetry_in_outputs
+    if event_stream is not None:
+        options[ExecutorOption.event_stream] = event_stream
+    if work_queue_file is not None:
+        options[ExecutorOption.work_queue] = str(work_queue_file)
+    if tile_size is not None:
+        options[CheckOption.gridprocessing_tile_x] = tile_size
+        options[CheckOption.gridprocessing_tile_y] = tile_size
+
+    executor = ConsoleCheckExecutor(
+        qa_json,
+        profile.name,
+        get_check_tool_class_names(qa_json, profile)
+    )
+    executor.options = options
+    executor.run()
+
+    with open(str(output_file), "w") as file:
+        json.dump(qa_json.to_dict(), file, indent=4)
+    logger.info(f"Saved QAJSON to {output_file}")
+
+    if results_file is not None:
+        exporter = RESULTS_EXPORTERS[results_file.suffix.lower()]()
+        exporter.export(qa_json, results_file)
+        logger.info(f"Saved check results to {results_file}")
+
+    if executor.status != "Complete":
+        sys.exit(EXIT_ERROR)
+    failed_count = count_failed_checks(qa_json)
+    if failed_count > 0:
+        logger.error(f"{failed_count} checks failed to execute")
+        sys.exit(EXIT_CHECK_FAILED)
+    sys.exit(EXIT_OK)
+
+
+def _run_queue_worker(
+        work_queue_file: Path,
+        config_folder: Optional[Path],
+        idle_timeout: Optional[float],
+        max_jobs: Optional[int],
+        log_level: str) -> None:
+    set_logging(
+        default_logging=logging.WARNING,
+        qax_logging=logging.getLevelName(log_level)
+    )
+    load_plugins(config_folder)
+    worker = QueueWorker(work_queue_file)
+    logger.info(f"Worker {worker.worker_id} started")
+    try:
+        worker.run(idle_timeout=idle_timeout, max_jobs=max_jobs)
+    except KeyboardInterrupt:
+        return
+    logger.info(f"Worker {worker.worker_id} ran {worker.jobs_run} jobs")
+    if max_jobs is not None and worker.jobs_run >= max_jobs:
+        sys.exit(EXIT_WORKER_RECYCLE)
+
+
+@click.command()
+@click.option(
+    '-q', '--work-queue', 'work_queue_file', required=True,
+    type=click.Path(dir_okay=False, path_type=Path),
+    help="Work queue database shared with the qax-run coordinator")
+@click.option(
+    '-c', '--config', 'config_folder', default=None,
+    type=click.Path(exists=True, file_okay=False, path_type=Path),
+    help="QAX config folder. Defaults to the config bundled with QAX.")
+@click.option(
+    '-w', '--workers', default=1, type=click.IntRange(min=1),
+    help="Number of worker processes to start on this host")
+@click.option(
+    '--idle-timeout', default=None, type=click.FloatRange(min=0),
+    help="Stop once no jobs have been available for this number of seconds")
+@click.option(
+    '--max-jobs', default=None, type=click.IntRange(min=1),
+    help="Replace each worker process with a new process after it has run "
+    "this number of jobs, limits memory leaked by check tools")
+@click.option(
+    '--log-level', default='INFO',
+    type=click.Choice(['DEBUG', 'INFO', 'WARNING', 'ERROR']),
+    help="Log level of QAX and plugin messages")
+def qax_worker(
+        work_queue_file: Path,
+        config_folder: Optional[Path],
+        workers: int,
+        idle_timeout: Optional[float],
+        max_jobs: Optional[int],
+        log_level: str):
+    """ Runs check jobs published to a work queue by qax-run. Any number of
+    workers, on any host that can access the work queue and input files,
+    may be run at the same time.
+    """
+    args = (work_queue_file, config_folder, idle_timeout, max_jobs, log_level)
+    if workers == 1 and max_jobs is None:
+        _run_queue_worker(*args)
+        return
+
+    def start_process() -> mp.Process:
+        process = mp.Process(target=_run_queue_worker, args=args)
+        process.start()
+        return process
+
+    processes = [start_process() for _ in range(workers)]
+    while len(processes) > 0:
+        wait([process.sentinel for process in processes])
+        for process in [p for p in processes if not p.is_alive()]:
+            processes.remove(process)
+            process.join()
+            if process.exitcode == EXIT_WORKER_RECYCLE:
+                processes.append(start_process())
+
+
+@click.command()
+@click.argument('event_stream', type=click.File('r', encoding='utf-8'))
+@click.option(
+    '-f', '--follow', is_flag=True, default=False,
+    help="Keep reading the stream as it is written, until the run completes")
+@click.option(
+    '--interval', default=5.0, type=click.FloatRange(min=0),
+    help="Seconds between summaries when following a stream")
+def qax_events(event_stream, follow: bool, interval: float):
+    """ Summarises the event stream written by qax-run --events, including
+    the throughput and estimated time remaining. Use - to read the stream
+    from stdin (eg; when received on a socket).
+    """
+    summary = EventStreamSummary()
+    last_output = time.monotonic()
+    for event in read_events(event_stream, follow):
+        summary.update(event)
+        if event.get('type') == 'log' and event['level'] in ['ERROR', 'CRITICAL']:
+            click.echo(f"{event['timestamp']} {event['level']} {event['message']}")
+        if follow and time.monotonic() - last_output >= interval:
+            last_output = time.monotonic()
+            click.echo(str(summary))
+    click.echo(str(summary))
+
+
+def main():
+    mp.freeze_support()
+    qax_run()
+
+
+def worker_main():
+    mp.freeze_support()
+    qax_worker()
+
+
+def events_main():
+    qax_events()
+
+
+if __name__ == "__main__":
+    main()
@@ -10,6 +10,7 @@ from hyo2.qax.app.gui_settings import GuiSettings
 from hyo2.qax.app.mainwin import MainWin
 from hyo2.qax.lib.config import QaxConfig
 from hyo2.qax.lib.plugin import QaxPlugins
+from hyo2.qax.lib.plugin_manifest import PluginManifest
 from hyo2.qax.lib.logging import setup_logging
 
 
@@ -63,7 +64,8 @@ def gui(dev_mode=False):
     config = QaxConfig(Path(cfg_dir))
     config.load()
     plugins = QaxPlugins()
-    plugins.load(config)
+    # plugins are imported when first run, rather than on startup
+    plugins.load(config, PluginManifest(Path(GuiSettings.plugin_manifest())))
 
     main_win = MainWin()
     main_win.initialize()
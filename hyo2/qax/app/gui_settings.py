@@ -55,6 +55,30 @@ class GuiSettings:
         udd = user_data_dir(appname=app_info.app_name)
         return os.path.join(udd, 'config')
 
+    @staticmethod
+    def check_cache():
+        """ folder used to cache check outputs """
+        udd = user_data_dir(appname=app_info.app_name)
+        return os.path.join(udd, 'check_cache')
+
+    @staticmethod
+    def throughput_history():
+        """ file the throughput of each check is recorded to """
+        udd = user_data_dir(appname=app_info.app_name)
+        return os.path.join(udd, 'throughput_history.json')
+
+    @staticmethod
+    def telemetry_file():
+        """ file the resource use of each check is recorded to """
+        udd = user_data_dir(appname=app_info.app_name)
+        return os.path.join(udd, 'telemetry.jsonl')
+
+    @staticmethod
+    def plugin_manifest():
+        """ file the metadata of the check tool plugins is cached in """
+        udd = user_data_dir(appname=app_info.app_name)
+        return os.path.join(udd, 'plugin_manifest.json')
+
     @staticmethod
     def settings_file():
         config_dir = GuiSettings.config()
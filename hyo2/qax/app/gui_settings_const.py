@@ -20,6 +20,29 @@ spatial_outputs_folder = 'spatial_outputs'
 gridprocessing_tile_x = 'gridprocessing_tile_x'
 gridprocessing_tile_y = 'gridprocessing_tile_y'
 
+## Check execution
+# number of worker processes check tools are run on
+execution_workers = 'execution_workers'
+# run each group of input files as a separate job
+execution_split_by_file_group = 'execution_split_by_file_group'
+# restore outputs of unchanged checks from the check cache
+execution_cache = 'execution_cache'
+# maximum size of the check cache in MB
+execution_cache_size = 'execution_cache_size'
+# time budget for each check, and all checks, in minutes. 0 for no limit
+execution_check_timeout = 'execution_check_timeout'
+execution_run_timeout = 'execution_run_timeout'
+# order check tools are run in, value of SchedulingPolicy
+execution_scheduling_policy = 'execution_scheduling_policy'
+# include the resource use of each check in its outputs
+execution_telemetry_in_outputs = 'execution_telemetry_in_outputs'
+# keep the check executor and worker processes running between check runs
+execution_keep_workers = 'execution_keep_workers'
+# record check errors as failed checks and continue running other checks
+execution_continue_on_error = 'execution_continue_on_error'
+# retry failed checks with a reduced tile size
+execution_retry_failed = 'execution_retry_failed'
+
 ## Log settings
 logging_qax = 'logging_qax'
 logging_qt = 'logging_qt'
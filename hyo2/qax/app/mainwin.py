@@ -14,6 +14,9 @@ import traceback
 from hyo2.qax.app import qta
 from hyo2.qax.app.widgets.qax.manual import ManualWindow
 from hyo2.qax.lib import lib_info
+from hyo2.qax.lib.export_job import ExportJob
+from hyo2.qax.lib.qajson_util import QajsonExporter, QajsonJsonExporter, \
+    get_exporters
 from hyo2.qax.app import app_info
 from hyo2.qax.app.widgets.qax.widget import QAXWidget
 from hyo2.qax.app.widgets.qax.settings_dialog import SettingsDialog
@@ -23,6 +26,30 @@ from hyo2.qax.app.grid_transformer_dialog import GridTransformerDialog
 logger = logging.getLogger(__name__)
 
 
+class QtExportJobThread(QtCore.QThread):
+    """ QThread that runs a save or export of the QAJSON, so the user
+    interface remains responsive while large projects are written.
+    """
+
+    progress = QtCore.Signal(float)
+    job_finished = QtCore.Signal(object)
+
+    def __init__(self, job: ExportJob):
+        super(QtExportJobThread, self).__init__()
+        self.job = job
+        # called from this thread, the signal is delivered in the main
+        # thread
+        self.job.progress_callback = self.progress.emit
+
+    @property
+    def is_save(self) -> bool:
+        return isinstance(self.job.exporter, QajsonJsonExporter)
+
+    def run(self):
+        self.job.run()
+        self.job_finished.emit(self.job)
+
+
 class MainWin(QtWidgets.QMainWindow):
 
     here = os.path.abspath(os.path.dirname(__file__))
@@ -62,6 +89,20 @@ class MainWin(QtWidgets.QMainWindow):
         self.setStatusBar(self.status_bar)
         self.status_bar.showMessage('...')
 
+        # saves and exports that are running
+        self.export_threads: List[QtExportJobThread] = []
+        self.export_progress_bar = QtWidgets.QProgressBar()
+        self.export_progress_bar.setRange(0, 100)
+        self.export_progress_bar.setMaximumWidth(150)
+        self.export_progress_bar.setVisible(False)
+        self.status_bar.addPermanentWidget(self.export_progress_bar)
+        self.export_cancel_button = QtWidgets.QToolButton()
+        self.export_cancel_button.setIcon(qta.icon('fa.close'))
+        self.export_cancel_button.setToolTip("Cancel export")
+        self.export_cancel_button.clicked.connect(self.cancel_exports)
+        self.export_cancel_button.setVisible(False)
+        self.status_bar.addPermanentWidget(self.export_cancel_button)
+
         self.setCentralWidget(self.qax_widget)
 
     def update_status_bar(self, message: str, timeout=0):
@@ -95,12 +136,12 @@ class MainWin(QtWidgets.QMainWindow):
         saveas_action.triggered.connect(self.saveas_qajson)
         fileMenu.addAction(saveas_action)
 
-        export_qajson_excel_icon = qta.icon('fa5s.file-export')
-        export_qajson_excel_action = QAction(export_qajson_excel_icon, "Export to Excel...", self)
-        export_qajson_excel_action.setShortcuts(QKeySequence.SaveAs)
-        export_qajson_excel_action.setStatusTip("Export QAJSON as Excel file")
-        export_qajson_excel_action.triggered.connect(self.export_qajson_excel)
-        fileMenu.addAction(export_qajson_excel_action)
+        # includes an action for each registered exporter, the list is
+        # refreshed each time the menu is shown
+        export_icon = qta.icon('fa5s.file-export')
+        self.export_menu = fileMenu.addMenu(export_icon, "&Export")
+        self.export_menu.aboutToShow.connect(self._update_export_menu)
+        self._update_export_menu()
 
         open_action = QAction('&Open...', self)
         open_action.setShortcuts(QKeySequence.Open)
@@ -214,17 +255,74 @@ class MainWin(QtWidgets.QMainWindow):
         self.qax_widget.prj.qa_json = minimal_qajson()
         self.update_ui(self.qax_widget.prj.qa_json)
 
-    def _save_qajson(self):
-        self.qax_widget.prj.save_qa_json()
-        base_name = os.path.basename(self.qax_widget.prj.qa_json_path)
-        self.update_status_bar("Saved {}".format(base_name), 1500)
-
-    def _export_qajson_excel(self, output: Path):
-        success = self.qax_widget.prj.export_qajson_excel(output_file=output)
-        if success:
-            self.update_status_bar("Saved {}".format(output.name), 1500)
+    def _update_export_menu(self):
+        self.export_menu.clear()
+        for exporter in get_exporters():
+            export_action = QAction(f"Export to {exporter.name}...", self)
+            export_action.setStatusTip(exporter.description)
+            export_action.triggered.connect(
+                lambda checked=False, e=exporter: self.export_qajson(e))
+            self.export_menu.addAction(export_action)
+
+    def _start_export_job(self, job: ExportJob) -> None:
+        """ Runs the save or export in a worker thread """
+        if any(t.job.file == job.file for t in self.export_threads):
+            self.update_status_bar(
+                f"{job.file.name} is still being written", 3000)
+            return
+        export_thread = QtExportJobThread(job)
+        export_thread.progress.connect(self._update_export_progress)
+        export_thread.job_finished.connect(self._export_job_finished)
+        self.export_threads.append(export_thread)
+        self._update_export_progress()
+        self.export_progress_bar.setVisible(True)
+        self.export_cancel_button.setVisible(True)
+        self.update_status_bar(f"Writing {job.file.name}...")
+        export_thread.start()
+
+    def _update_export_progress(self, progress: float = 0.0):
+        # overall progress of all running jobs
+        if len(self.export_threads) == 0:
+            return
+        total = sum(t.job.progress for t in self.export_threads)
+        self.export_progress_bar.setValue(
+            int(100 * total / len(self.export_threads)))
+
+    def _export_job_finished(self, job: ExportJob):
+        export_thread = next(
+            (t for t in self.export_threads if t.job is job), None)
+        if export_thread is not None:
+            export_thread.wait()
+            self.export_threads.remove(export_thread)
+        if len(self.export_threads) == 0:
+            self.export_progress_bar.setVisible(False)
+            self.export_cancel_button.setVisible(False)
         else:
-            self.update_status_bar("Failed to export QAJSON to Excel", 1500)
+            self._update_export_progress()
+
+        if job.status == "Complete":
+            self.update_status_bar(f"Saved {job.file.name}", 1500)
+        elif job.status == "Cancelled":
+            self.update_status_bar(f"Cancelled writing {job.file.name}", 3000)
+        else:
+            self.update_status_bar(
+                f"Failed to write {job.file.name}: {job.error}", 5000)
+
+    def cancel_exports(self):
+        for export_thread in self.export_threads:
+            export_thread.job.cancel()
+
+    def _finish_export_jobs(self):
+        """ Waits for any running jobs to finish before the application is
+        closed. Exports are cancelled, saves are allowed to complete.
+        """
+        for export_thread in list(self.export_threads):
+            if not export_thread.is_save:
+                export_thread.job.cancel()
+            export_thread.wait()
+
+    def _save_qajson(self):
+        self._start_export_job(self.qax_widget.prj.save_job())
 
     def save_qajson(self):
         if self.qax_widget.prj.qa_json_path is None:
@@ -246,18 +344,20 @@ class MainWin(QtWidgets.QMainWindow):
             self.qax_widget.prj.qa_json_path = file_name
             self._save_qajson()
 
-    def export_qajson_excel(self):
-        # Save the QAJSON as an XLSX file (Excel)
+    def export_qajson(self, exporter: QajsonExporter):
+        # Export the QAJSON using one of the registered exporters
         dialog = QtWidgets.QFileDialog(self)
         dialog.setAcceptMode(QtWidgets.QFileDialog.AcceptMode.AcceptSave)
         dialog.setFileMode(QtWidgets.QFileDialog.AnyFile)
-        dialog.setNameFilter("Microsoft Excel (*.xlsx)")
+        dialog.setNameFilter(f"{exporter.name} (*.{exporter.extension})")
+        dialog.setDefaultSuffix(exporter.extension)
         if dialog.exec_():
             file_names = dialog.selectedFiles()
             if len(file_names) == 0:
                 return
             file_name = file_names[0]
-            self._export_qajson_excel(Path(file_name))
+            self._start_export_job(
+                self.qax_widget.prj.export_job(exporter, Path(file_name)))
 
     def open_qajson(self):
         dialog = QtWidgets.QFileDialog(self)
@@ -293,6 +393,8 @@ class MainWin(QtWidgets.QMainWindow):
         if reply == QtWidgets.QMessageBox.Yes:
             # store window size
             self._persist_exit_settings()
+            self._finish_export_jobs()
+            self.qax_widget.shutdown()
             QApplication.instance().quit()
 
     def closeEvent(self, event):
@@ -302,6 +404,8 @@ class MainWin(QtWidgets.QMainWindow):
         if reply == QtWidgets.QMessageBox.Yes:
             # store window size
             self._persist_exit_settings()
+            self._finish_export_jobs()
+            self.qax_widget.shutdown()
             event.accept()
             super().closeEvent(event)
         else:
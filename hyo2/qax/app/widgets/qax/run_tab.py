@@ -1,8 +1,9 @@
 import json
 import logging
 import os
+import queue
 import time
-from typing import List, NoReturn, Dict
+from typing import List, NoReturn, Dict, Optional
 from pathlib import Path
 from PySide2 import QtCore, QtGui, QtWidgets
 from PySide2.QtWidgets import QApplication, QDialog, QLineEdit, \
@@ -20,10 +21,12 @@ from hyo2.qax.app.gui_settings import GuiSettings
 from hyo2.qax.app import gui_settings_const
 from hyo2.qax.app.widgets.qax.check_widget import CheckWidget
 from hyo2.qax.lib.plugin import QaxCheckToolPlugin
-from hyo2.qax.lib.check_options import CheckOption
+from hyo2.qax.lib.check_options import CheckOption, ExecutorOption
 from hyo2.qax.lib.check_executor import CheckExecutor, MultiprocessCheckExecutor, \
     ProgressQueueItem, CheckToolStartedQueueItem, StatusQueueItem, \
-    QajsonChangedQueueItem, ChecksCompleteQueueItem
+    QajsonChangedQueueItem, QajsonPatchQueueItem, ChecksCompleteQueueItem, \
+    SharedPayloadStore, CheckExecutorService, QueueCheckExecutor, \
+    RunFinishedQueueItem
 from ausseabed.qajson.model import QajsonRoot
 from hyo2.qax.lib.project import QAXProject
 
@@ -36,10 +39,15 @@ class QtCheckExecutorThread(QtCore.QThread):
     the checks from this run method thread does allow the UI to update while
     the check run, however it is still restricted to running on a single process.
     Hence, multiprocessing was introduced to get around this issue.
+
+    If a CheckExecutorService is given the checks are run by this (already
+    running) service process rather than a new process.
     """
 
     progress = QtCore.Signal(float)
     qajson_updated = QtCore.Signal()
+    # list of the CheckRefs of the checks updated in place
+    checks_updated = QtCore.Signal(list)
     check_tool_started = QtCore.Signal(object)
     checks_complete = QtCore.Signal()
     status_changed = QtCore.Signal(str)
@@ -49,30 +57,60 @@ class QtCheckExecutorThread(QtCore.QThread):
             self,
             qa_json: QajsonRoot,
             profile_name: str,
-            check_tool_class_names: List[str]):
+            check_tool_class_names: List[str],
+            service: CheckExecutorService = None):
         super(QtCheckExecutorThread, self).__init__()
 
-        self.queue = mp.Queue()
-        self.mp_checkexecutor = MultiprocessCheckExecutor(
-            qa_json,
-            profile_name,
-            check_tool_class_names,
-            self.queue
-        )
+        self.service = service
+        if service is None:
+            self.queue = mp.Queue()
+            self.mp_checkexecutor = MultiprocessCheckExecutor(
+                qa_json,
+                profile_name,
+                check_tool_class_names,
+                self.queue
+            )
+        else:
+            self.queue = service.queue
+            self.mp_checkexecutor = QueueCheckExecutor(
+                qa_json,
+                profile_name,
+                check_tool_class_names
+            )
         self.mp_running = False
         self.qa_json = qa_json
+        # reads the large check outputs the executor sends via shared memory
+        self.shared_payloads = SharedPayloadStore()
         # options such as what output to generate, where to put it. Keys come
         # from check_options.py
         self.options = {}
 
+    def _executor_process(self) -> mp.Process:
+        """ Process the checks are being run in """
+        if self.service is None:
+            return self.mp_checkexecutor
+        return self.service
+
     def run(self):
         self.mp_checkexecutor.options = self.options
 
         self.mp_running = True
-        self.mp_checkexecutor.start()
+        if self.service is None:
+            self.mp_checkexecutor.start()
+        else:
+            self.service.submit(self.mp_checkexecutor)
+        checks_complete = False
 
         while self.mp_running:
-            queue_item = self.queue.get()
+            try:
+                # timeout allows this thread to notice if the executor
+                # process has exited without sending the complete item (eg;
+                # it was killed)
+                queue_item = self.queue.get(timeout=0.5)
+            except queue.Empty:
+                if not self._executor_process().is_alive():
+                    self.mp_running = False
+                continue
             if queue_item is not None:
                 if isinstance(queue_item, ProgressQueueItem):
                     self.progress.emit(queue_item.progress)
@@ -86,22 +124,45 @@ class QtCheckExecutorThread(QtCore.QThread):
                 elif isinstance(queue_item, StatusQueueItem):
                     self.status = queue_item.status
                     self.status_changed.emit(queue_item.status)
+                elif isinstance(queue_item, QajsonPatchQueueItem):
+                    self.shared_payloads.unpack_patch(queue_item)
+                    queue_item.apply(self.qa_json)
+                    self.checks_updated.emit([
+                        check_ref
+                        for check_ref, _ in queue_item.check_outputs
+                    ])
                 elif isinstance(queue_item, QajsonChangedQueueItem):
                     self.qa_json = queue_item.qajson
                     self.qajson_updated.emit()
                 elif isinstance(queue_item, ChecksCompleteQueueItem):
+                    checks_complete = True
                     self.checks_complete.emit()
                 elif isinstance(queue_item, logging.LogRecord):
                     self.log_recieved.emit(queue_item)
+                elif isinstance(queue_item, RunFinishedQueueItem):
+                    # the service process keeps running, ready for the
+                    # next run
+                    self.mp_running = False
                 else:
                     print("Other queue item")
                     print(type(queue_item).__name__)
                     print(queue_item)
 
-        self.mp_checkexecutor.join()
+        if self.service is None:
+            self.mp_checkexecutor.join()
+        if not checks_complete:
+            logger.error(
+                "Check executor exited unexpectedly (exit code "
+                f"{self._executor_process().exitcode})")
+            self.status = "Error"
+            self.status_changed.emit(self.status)
+            self.checks_complete.emit()
 
     def stop(self):
-        self.mp_checkexecutor.stop()
+        if self.service is None:
+            self.mp_checkexecutor.stop()
+        else:
+            self.service.stop_run()
 
 
 class RunTab(QtWidgets.QWidget):
@@ -112,6 +173,9 @@ class RunTab(QtWidgets.QWidget):
         super(RunTab, self).__init__()
         self.prj = prj
         self.check_executor = None
+        # long lived process checks are run in, only used if enabled in the
+        # settings
+        self._executor_service = None
 
         self.vbox = QtWidgets.QVBoxLayout()
         self.setLayout(self.vbox)
@@ -375,6 +439,32 @@ class RunTab(QtWidgets.QWidget):
         self.log_messages.appendPlainText(message)
         self.log_messages.appendPlainText("")
 
+    def executor_service(self) -> Optional[CheckExecutorService]:
+        """ Gets the service process checks are run in, starting it if
+        required. Returns None if worker processes are not kept running
+        between check runs.
+        """
+        keep_workers = GuiSettings.settings().value(
+            gui_settings_const.execution_keep_workers,
+            True,
+            bool
+        )
+        if not keep_workers:
+            self.shutdown_executor_service()
+            return None
+        if (
+            self._executor_service is None or
+            not self._executor_service.is_alive()
+        ):
+            self._executor_service = CheckExecutorService(mp.Queue())
+            self._executor_service.start()
+        return self._executor_service
+
+    def shutdown_executor_service(self) -> None:
+        if self._executor_service is not None:
+            self._executor_service.shutdown()
+            self._executor_service = None
+
     def run_executor(self, check_executor: QtCheckExecutorThread):
         # we pass the check_executor into the run tab as this is where the UI
         # components are that will display the execution status.
@@ -389,6 +479,7 @@ class RunTab(QtWidgets.QWidget):
             self._on_check_tool_started)
         self.check_executor.progress.connect(self._on_progress)
         self.check_executor.qajson_updated.connect(self._on_qajson_update)
+        self.check_executor.checks_updated.connect(self._on_checks_updated)
         self.check_executor.checks_complete.connect(self._on_checks_complete)
         self.check_executor.status_changed.connect(self._on_status_change)
         self.check_executor.log_recieved.connect(self._on_log_recieved)
@@ -412,6 +503,62 @@ class RunTab(QtWidgets.QWidget):
             options[CheckOption.gridprocessing_tile_x] = int(gp_t_x)
             options[CheckOption.gridprocessing_tile_y] = int(gp_t_y)
 
+        workers = GuiSettings.settings().value(gui_settings_const.execution_workers)
+        if workers is not None:
+            options[ExecutorOption.workers] = int(workers)
+        options[ExecutorOption.split_by_file_group] = GuiSettings.settings().value(
+            gui_settings_const.execution_split_by_file_group,
+            False,
+            bool
+        )
+        cache = GuiSettings.settings().value(
+            gui_settings_const.execution_cache,
+            False,
+            bool
+        )
+        if cache:
+            options[ExecutorOption.cache_folder] = GuiSettings.check_cache()
+            cache_size = GuiSettings.settings().value(
+                gui_settings_const.execution_cache_size)
+            if cache_size is not None:
+                options[ExecutorOption.cache_max_size] = \
+                    int(cache_size) * 1024 * 1024
+
+        scheduling_policy = GuiSettings.settings().value(
+            gui_settings_const.execution_scheduling_policy)
+        if scheduling_policy is not None:
+            options[ExecutorOption.scheduling_policy] = scheduling_policy
+        options[ExecutorOption.throughput_history] = \
+            GuiSettings.throughput_history()
+        options[ExecutorOption.telemetry_file] = GuiSettings.telemetry_file()
+        options[ExecutorOption.continue_on_error] = \
+            GuiSettings.settings().value(
+                gui_settings_const.execution_continue_on_error,
+                False,
+                bool
+            )
+        options[ExecutorOption.retry_failed] = GuiSettings.settings().value(
+            gui_settings_const.execution_retry_failed,
+            False,
+            bool
+        )
+        options[ExecutorOption.telemetry_in_outputs] = \
+            GuiSettings.settings().value(
+                gui_settings_const.execution_telemetry_in_outputs,
+                False,
+                bool
+            )
+
+        # time budgets are stored in minutes, a value of 0 means no limit
+        check_timeout = GuiSettings.settings().value(
+            gui_settings_const.execution_check_timeout)
+        if check_timeout is not None and int(check_timeout) > 0:
+            options[ExecutorOption.check_timeout] = int(check_timeout) * 60
+        run_timeout = GuiSettings.settings().value(
+            gui_settings_const.execution_run_timeout)
+        if run_timeout is not None and int(run_timeout) > 0:
+            options[ExecutorOption.run_timeout] = int(run_timeout) * 60
+
         return options
 
     def _click_run(self):
@@ -432,6 +579,14 @@ class RunTab(QtWidgets.QWidget):
     def _on_qajson_update(self):
         self.prj.qa_json = self.check_executor.qa_json
 
+    @QtCore.Slot(list)
+    def _on_checks_updated(self, check_refs):
+        if self.prj.qa_json is self.check_executor.qa_json:
+            # only the summaries of the updated checks need to change
+            self.prj.update_checks(check_refs)
+        else:
+            self.prj.qa_json = self.check_executor.qa_json
+
     @QtCore.Slot(object)
     def _on_check_tool_started(self, tpl):
         check_tool_name, check_number, total_check_count = tpl
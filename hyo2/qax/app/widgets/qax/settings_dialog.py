@@ -1,21 +1,43 @@
 from PySide2.QtWidgets import QApplication, QDialog, QLineEdit, \
     QPushButton, QVBoxLayout, QHBoxLayout, QGroupBox, QLabel, QWidget, \
     QSizePolicy, QComboBox, QFileDialog, QPlainTextEdit, QProgressBar, \
-    QFrame
+    QFrame, QCheckBox
 from PySide2.QtGui import QFont, QIntValidator
 from PySide2 import QtCore
 from typing import Any
 import logging
+import os
 
 from hyo2.qax.app import qta
 from hyo2.qax.app.gui_settings import GuiSettings
 from hyo2.qax.app import gui_settings_const
 from hyo2.qax.lib.logging import set_logging
+from hyo2.qax.lib.scheduler import SchedulingPolicy, \
+    DEFAULT_SCHEDULING_POLICY
 
 GRIDPROCESSING_TILE_SIZE_MIN = 2000
 GRIDPROCESSING_TILE_SIZE_MAX = 200000
 GRIDPROCESSING_TILE_SIZE_DEFAULT = 40000
 
+EXECUTION_WORKERS_MIN = 1
+EXECUTION_WORKERS_MAX = os.cpu_count() or 1
+EXECUTION_WORKERS_DEFAULT = 1
+
+EXECUTION_CACHE_SIZE_MIN = 10
+EXECUTION_CACHE_SIZE_MAX = 1000000
+EXECUTION_CACHE_SIZE_DEFAULT = 1024
+
+# time budgets are in minutes, 0 disables the budget
+EXECUTION_TIMEOUT_MIN = 0
+EXECUTION_TIMEOUT_MAX = 100000
+EXECUTION_TIMEOUT_DEFAULT = 0
+
+EXECUTION_SCHEDULING_POLICIES = [
+    ("First in, first out", SchedulingPolicy.fifo),
+    ("Shortest job first", SchedulingPolicy.sjf),
+    ("Arbitrary", SchedulingPolicy.arbitrary),
+]
+
 
 class SettingsDialog(QDialog):
 
@@ -33,6 +55,7 @@ class SettingsDialog(QDialog):
         self.setLayout(self.layout)
 
         self._add_gridprocessing()
+        self._add_execution()
         self._add_logging()
 
         self.layout.addStretch()
@@ -64,6 +87,48 @@ class SettingsDialog(QDialog):
         except ValueError:
             return GRIDPROCESSING_TILE_SIZE_DEFAULT
 
+    def __sanitise_execution_workers(self, val: Any) -> int:
+        if val is None:
+            return EXECUTION_WORKERS_DEFAULT
+        try:
+            ival = int(val)
+            if ival < EXECUTION_WORKERS_MIN:
+                return EXECUTION_WORKERS_MIN
+            elif ival > EXECUTION_WORKERS_MAX:
+                return EXECUTION_WORKERS_MAX
+            else:
+                return ival
+        except ValueError:
+            return EXECUTION_WORKERS_DEFAULT
+
+    def __sanitise_execution_cache_size(self, val: Any) -> int:
+        if val is None:
+            return EXECUTION_CACHE_SIZE_DEFAULT
+        try:
+            ival = int(val)
+            if ival < EXECUTION_CACHE_SIZE_MIN:
+                return EXECUTION_CACHE_SIZE_MIN
+            elif ival > EXECUTION_CACHE_SIZE_MAX:
+                return EXECUTION_CACHE_SIZE_MAX
+            else:
+                return ival
+        except ValueError:
+            return EXECUTION_CACHE_SIZE_DEFAULT
+
+    def __sanitise_execution_timeout(self, val: Any) -> int:
+        if val is None:
+            return EXECUTION_TIMEOUT_DEFAULT
+        try:
+            ival = int(val)
+            if ival < EXECUTION_TIMEOUT_MIN:
+                return EXECUTION_TIMEOUT_MIN
+            elif ival > EXECUTION_TIMEOUT_MAX:
+                return EXECUTION_TIMEOUT_MAX
+            else:
+                return ival
+        except ValueError:
+            return EXECUTION_TIMEOUT_DEFAULT
+
     def _load_data_from_config(self) -> None:
         gp_t_x = self.__get_gridprocessing_tile_size(
             gui_settings_const.gridprocessing_tile_x
@@ -74,6 +139,69 @@ class SettingsDialog(QDialog):
         )
         self.processingtile_y.setText(str(gp_t_y))
 
+        workers = self.__sanitise_execution_workers(
+            GuiSettings.settings().value(gui_settings_const.execution_workers)
+        )
+        self.execution_workers.setText(str(workers))
+        split_by_file_group = GuiSettings.settings().value(
+            gui_settings_const.execution_split_by_file_group,
+            False,
+            bool
+        )
+        self.execution_split_by_file_group.setChecked(split_by_file_group)
+        cache = GuiSettings.settings().value(
+            gui_settings_const.execution_cache,
+            False,
+            bool
+        )
+        self.execution_cache.setChecked(cache)
+        cache_size = self.__sanitise_execution_cache_size(
+            GuiSettings.settings().value(
+                gui_settings_const.execution_cache_size)
+        )
+        self.execution_cache_size.setText(str(cache_size))
+        check_timeout = self.__sanitise_execution_timeout(
+            GuiSettings.settings().value(
+                gui_settings_const.execution_check_timeout)
+        )
+        self.execution_check_timeout.setText(str(check_timeout))
+        run_timeout = self.__sanitise_execution_timeout(
+            GuiSettings.settings().value(
+                gui_settings_const.execution_run_timeout)
+        )
+        self.execution_run_timeout.setText(str(run_timeout))
+        policy_val = GuiSettings.settings().value(
+            gui_settings_const.execution_scheduling_policy,
+            DEFAULT_SCHEDULING_POLICY.value
+        )
+        telemetry_in_outputs = GuiSettings.settings().value(
+            gui_settings_const.execution_telemetry_in_outputs,
+            False,
+            bool
+        )
+        self.execution_telemetry_in_outputs.setChecked(telemetry_in_outputs)
+        keep_workers = GuiSettings.settings().value(
+            gui_settings_const.execution_keep_workers,
+            True,
+            bool
+        )
+        self.execution_keep_workers.setChecked(keep_workers)
+        continue_on_error = GuiSettings.settings().value(
+            gui_settings_const.execution_continue_on_error,
+            False,
+            bool
+        )
+        self.execution_continue_on_error.setChecked(continue_on_error)
+        retry_failed = GuiSettings.settings().value(
+            gui_settings_const.execution_retry_failed,
+            False,
+            bool
+        )
+        self.execution_retry_failed.setChecked(retry_failed)
+        policy_values = [p[1].value for p in EXECUTION_SCHEDULING_POLICIES]
+        if policy_val in policy_values:
+            self.execution_scheduling_policy.setCurrentIndex(
+                policy_values.index(policy_val))
 
         log_qax_val = GuiSettings.settings().value(gui_settings_const.logging_qax)
         log_qt_val = GuiSettings.settings().value(gui_settings_const.logging_qt)
@@ -175,6 +303,213 @@ class SettingsDialog(QDialog):
             self.__sanitise_tile_size(y)
         )
 
+    def _add_execution(self) -> None:
+        # Check execution config options
+        execution_groupbox = QGroupBox("Check Execution")
+        execution_groupbox.setSizePolicy(
+            QSizePolicy.Expanding,
+            QSizePolicy.Fixed)
+        execution_layout = QVBoxLayout()
+        execution_layout.setSpacing(4)
+        execution_groupbox.setLayout(execution_layout)
+        self.layout.addWidget(execution_groupbox)
+
+        execution_label = QLabel(
+            "Number of worker processes used to run check tools. When more "
+            "than one worker is used, check tools are run in parallel. Each "
+            "worker requires its own memory for processing, so reduce this "
+            "value if experiencing out of memory errors."
+        )
+        execution_label.setWordWrap(True)
+        execution_label.setSizePolicy(
+            QSizePolicy.Expanding,
+            QSizePolicy.Minimum)
+        execution_label.setStyleSheet("background: none")
+        execution_layout.addWidget(execution_label)
+
+        workers_layout = QHBoxLayout()
+        workers_layout.setSpacing(4)
+        execution_layout.addLayout(workers_layout)
+        self.execution_workers = QLineEdit()
+        self.execution_workers.setValidator(
+            QIntValidator(EXECUTION_WORKERS_MIN, EXECUTION_WORKERS_MAX)
+        )
+        self.execution_workers.textChanged.connect(
+            self._on_execution_workers_changed)
+        self.execution_workers.setFixedWidth(80)
+        workers_layout.addWidget(QLabel(
+            f"Worker processes (max {EXECUTION_WORKERS_MAX}):"))
+        workers_layout.addWidget(self.execution_workers)
+        workers_layout.addStretch()
+
+        self.execution_split_by_file_group = QCheckBox(
+            "Run each dataset as a separate job. Allows a single check tool to "
+            "process multiple datasets in parallel.")
+        self.execution_split_by_file_group.stateChanged.connect(
+            self._on_execution_split_by_file_group_changed)
+        execution_layout.addWidget(self.execution_split_by_file_group)
+
+        self.execution_cache = QCheckBox(
+            "Cache check outputs. Checks with unchanged input files, "
+            "parameters and version are not run again.")
+        self.execution_cache.stateChanged.connect(
+            self._on_execution_cache_changed)
+        execution_layout.addWidget(self.execution_cache)
+
+        cache_size_layout = QHBoxLayout()
+        cache_size_layout.setSpacing(4)
+        execution_layout.addLayout(cache_size_layout)
+        self.execution_cache_size = QLineEdit()
+        self.execution_cache_size.setValidator(
+            QIntValidator(EXECUTION_CACHE_SIZE_MIN, EXECUTION_CACHE_SIZE_MAX)
+        )
+        self.execution_cache_size.textChanged.connect(
+            self._on_execution_cache_size_changed)
+        self.execution_cache_size.setFixedWidth(80)
+        cache_size_layout.addWidget(QLabel("Maximum cache size (MB):"))
+        cache_size_layout.addWidget(self.execution_cache_size)
+        cache_size_layout.addStretch()
+
+        timeout_label = QLabel(
+            "Time budgets in minutes (0 for no limit). Checks that run for "
+            "longer than the check time budget, or are still running when "
+            "the run time budget is reached, are aborted."
+        )
+        timeout_label.setWordWrap(True)
+        timeout_label.setSizePolicy(
+            QSizePolicy.Expanding,
+            QSizePolicy.Minimum)
+        timeout_label.setStyleSheet("background: none")
+        execution_layout.addWidget(timeout_label)
+
+        timeout_layout = QHBoxLayout()
+        timeout_layout.setSpacing(4)
+        execution_layout.addLayout(timeout_layout)
+        self.execution_check_timeout = QLineEdit()
+        self.execution_check_timeout.setValidator(
+            QIntValidator(EXECUTION_TIMEOUT_MIN, EXECUTION_TIMEOUT_MAX)
+        )
+        self.execution_check_timeout.textChanged.connect(
+            self._on_execution_check_timeout_changed)
+        self.execution_check_timeout.setFixedWidth(80)
+        timeout_layout.addWidget(QLabel("Check:"))
+        timeout_layout.addWidget(self.execution_check_timeout)
+        self.execution_run_timeout = QLineEdit()
+        self.execution_run_timeout.setValidator(
+            QIntValidator(EXECUTION_TIMEOUT_MIN, EXECUTION_TIMEOUT_MAX)
+        )
+        self.execution_run_timeout.textChanged.connect(
+            self._on_execution_run_timeout_changed)
+        self.execution_run_timeout.setFixedWidth(80)
+        timeout_layout.addWidget(QLabel("Run:"))
+        timeout_layout.addWidget(self.execution_run_timeout)
+        timeout_layout.addStretch()
+
+        policy_layout = QHBoxLayout()
+        policy_layout.setSpacing(4)
+        execution_layout.addLayout(policy_layout)
+        self.execution_scheduling_policy = QComboBox()
+        for name, _ in EXECUTION_SCHEDULING_POLICIES:
+            self.execution_scheduling_policy.addItem(name)
+        self.execution_scheduling_policy.currentIndexChanged.connect(
+            self._on_execution_scheduling_policy_changed)
+        policy_layout.addWidget(QLabel("Check order:"))
+        policy_layout.addWidget(self.execution_scheduling_policy)
+        policy_layout.addStretch()
+
+        self.execution_telemetry_in_outputs = QCheckBox(
+            "Include the resource use (time, memory and data read) of each "
+            "check in the QAJSON outputs")
+        self.execution_telemetry_in_outputs.stateChanged.connect(
+            self._on_execution_telemetry_in_outputs_changed)
+        execution_layout.addWidget(self.execution_telemetry_in_outputs)
+
+        self.execution_keep_workers = QCheckBox(
+            "Keep worker processes running between check runs (faster to "
+            "start checks, uses more memory while idle)")
+        self.execution_keep_workers.stateChanged.connect(
+            self._on_execution_keep_workers_changed)
+        execution_layout.addWidget(self.execution_keep_workers)
+
+        self.execution_continue_on_error = QCheckBox(
+            "Continue running other checks when a check fails")
+        self.execution_continue_on_error.stateChanged.connect(
+            self._on_execution_continue_on_error_changed)
+        execution_layout.addWidget(self.execution_continue_on_error)
+
+        self.execution_retry_failed = QCheckBox(
+            "Retry failed checks with a smaller tile size")
+        self.execution_retry_failed.stateChanged.connect(
+            self._on_execution_retry_failed_changed)
+        execution_layout.addWidget(self.execution_retry_failed)
+
+    def _on_execution_workers_changed(self, workers):
+        GuiSettings.settings().setValue(
+            gui_settings_const.execution_workers,
+            self.__sanitise_execution_workers(workers)
+        )
+
+    def _on_execution_split_by_file_group_changed(self):
+        GuiSettings.settings().setValue(
+            gui_settings_const.execution_split_by_file_group,
+            self.execution_split_by_file_group.isChecked()
+        )
+
+    def _on_execution_cache_changed(self):
+        GuiSettings.settings().setValue(
+            gui_settings_const.execution_cache,
+            self.execution_cache.isChecked()
+        )
+
+    def _on_execution_cache_size_changed(self, cache_size):
+        GuiSettings.settings().setValue(
+            gui_settings_const.execution_cache_size,
+            self.__sanitise_execution_cache_size(cache_size)
+        )
+
+    def _on_execution_check_timeout_changed(self, check_timeout):
+        GuiSettings.settings().setValue(
+            gui_settings_const.execution_check_timeout,
+            self.__sanitise_execution_timeout(check_timeout)
+        )
+
+    def _on_execution_run_timeout_changed(self, run_timeout):
+        GuiSettings.settings().setValue(
+            gui_settings_const.execution_run_timeout,
+            self.__sanitise_execution_timeout(run_timeout)
+        )
+
+    def _on_execution_scheduling_policy_changed(self, index):
+        _, policy = EXECUTION_SCHEDULING_POLICIES[index]
+        GuiSettings.settings().setValue(
+            gui_settings_const.execution_scheduling_policy,
+            policy.value
+        )
+
+    def _on_execution_telemetry_in_outputs_changed(self):
+        GuiSettings.settings().setValue(
+            gui_settings_const.execution_telemetry_in_outputs,
+            self.execution_telemetry_in_outputs.isChecked()
+        )
+
+    def _on_execution_keep_workers_changed(self):
+        GuiSettings.settings().setValue(
+            gui_settings_const.execution_keep_workers,
+            self.execution_keep_workers.isChecked()
+        )
+
+    def _on_execution_continue_on_error_changed(self):
+        GuiSettings.settings().setValue(
+            gui_settings_const.execution_continue_on_error,
+            self.execution_continue_on_error.isChecked()
+        )
+
+    def _on_execution_retry_failed_changed(self):
+        GuiSettings.settings().setValue(
+            gui_settings_const.execution_retry_failed,
+            self.execution_retry_failed.isChecked()
+        )
+
     def __add_log_levels(self, cb: QComboBox) -> None:
         for (name, level) in gui_settings_const.LOG_LEVELS:
             cb.addItem(name, level)
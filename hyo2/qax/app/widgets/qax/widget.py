@@ -1,7 +1,6 @@
-from ausseabed.qajson.model import QajsonRoot
-from pathlib import Path
+from ausseabed.qajson.model import QajsonRoot, QajsonParam
 from PySide2 import QtGui, QtCore, QtWidgets
-from typing import NoReturn
+from typing import List, NoReturn
 import logging
 import os
 
@@ -14,9 +13,7 @@ from hyo2.qax.app.widgets.qax.run_tab import RunTab, QtCheckExecutorThread
 from hyo2.qax.lib.config import QaxConfig, QaxConfigProfile, QaxConfigSpecification
 from hyo2.qax.lib.plugin import QaxPlugins, QaxCheckToolPlugin, QaxCheckReference
 from hyo2.qax.lib.project import QAXProject
-
-from ausseabed.qajson.parser import QajsonParser
-from ausseabed.qajson.model import QajsonRoot, QajsonQa
+from hyo2.qax.lib.qajson_builder import build_qajson, get_check_params
 
 logger = logging.getLogger(__name__)
 
@@ -134,68 +131,49 @@ class QAXWidget(QtWidgets.QTabWidget):
         Builds a QA JSON root object based on the information currently
         entered into the user interface.
         """
-        root = QajsonRoot(None)
-
-        # Add the root Qa object to the QAJSON
-
-        # assume schema naming convention is
-        #  `some_path/v0.1.2/qa.schema.json` or similar
-        last_path = QajsonParser.schema_paths()[-1]
-        version = last_path.parent.name[1:]
-        root.qa = QajsonQa(
-            version=version,
-            raw_data=None,
-            survey_products=None,
+        # for each set of grouped files (datasets in UI) the checks that
+        # support the group of files are added to the QAJSON. If there's
+        # multiple groups of files, then the same check will be added multiple
+        # times with different sets of input files.
+        file_group_selection = self.tab_inputs.file_group_selection
+        return build_qajson(
+            file_group_selection.plugin_service,
+            file_group_selection.get_grouped_files(),
+            self.tab_inputs.selected_checks,
+            self.tab_inputs.profile_selection.selected_specification,
+            check_params=self._get_check_params
         )
-        root.qa.get_or_add_data_level('raw_data')
-        root.qa.get_or_add_data_level('survey_products')
-
-        # for each set of grouped files, loop through all the checks and see if
-        # the group of files are suitable for that check. If they are, then add
-        # a new check reference to the QAJSON
-        # If there's multiple groups (datasets in UI) of files, then the same check
-        # will be added multiple times with different sets of input files.
-        grouped_files = self.tab_inputs.file_group_selection.get_grouped_files()
-        for file_group_list in grouped_files:
-            # the plugin function we use to check if the group of files is suitable
-            # for a specific check uses a simple tuple list (not a list of QajsonFiles)
-            # so we need to convert this
-            paths_and_types = [(Path(f.path), f.file_type) for f in file_group_list]
-
-            for check in self.tab_inputs.selected_checks:
-                if check.supports_files(paths_and_types):
-                    data_level = root.qa.get_or_add_data_level(check.data_level)
-                    plugin_check_tool = QaxPlugins.instance().get_plugin_for_check(check.id)
-                    qajson_check = plugin_check_tool.add_check(data_level, check)
-                    qajson_inputs = qajson_check.get_or_add_inputs()
-                    qajson_inputs.files.extend(file_group_list)
-
-        for check in self.tab_inputs.selected_checks:
-            plugin_check_tool = QaxPlugins.instance().get_plugin_for_check(check.id)
-            # get the plugin tab for the current check tool
-            plugin_tab = next(
-                (
-                    ptab
-                    for ptab in self.tab_plugins.plugin_tabs
-                    if type(ptab.plugin) == type(plugin_check_tool)
-                ),
-                None
-            )
 
-            check_param_details = plugin_tab.get_check_ids_and_params()
+    def _get_check_params(self, check: QaxCheckReference) -> List[QajsonParam]:
+        """ Gets the input params of a check as entered into its plugin tab.
+        The specification values are used if the check has no plugin tab.
+        """
+        plugin_check_tool = QaxPlugins.instance().get_plugin_for_check(check.id)
+        # get the plugin tab for the current check tool, all plugins are
+        # QaxLazyCheckToolPlugins so they're matched by their plugin class
+        plugin_tab = next(
+            (
+                ptab
+                for ptab in self.tab_plugins.plugin_tabs
+                if ptab.plugin.plugin_class == plugin_check_tool.plugin_class
+            ),
+            None
+        )
+        params = None
+        if plugin_tab is not None:
             params = next(
                 (
                     ps
-                    for check_id, ps in check_param_details
+                    for check_id, ps in plugin_tab.get_check_ids_and_params()
                     if check_id == check.id
                 ),
                 None
             )
-            plugin_check_tool.update_qa_json_input_params(
-                root, check.id, params
-            )
-
-        return root
+        if params is None:
+            params = get_check_params(
+                check,
+                self.tab_inputs.profile_selection.selected_specification)
+        return params
 
     def _on_execute_checks(self):
         """ the run checks """
@@ -206,13 +184,16 @@ class QAXWidget(QtWidgets.QTabWidget):
             QaxPlugins.instance().get_plugin_for_check(selected_check.id).plugin_class
             for selected_check in self.tab_inputs.selected_checks
         ]
-        # remove duplicate class names
-        check_tool_plugin_class_names = list(set(check_tool_plugin_class_names))
+        # remove duplicate class names, keeping the order the checks were
+        # selected in (the executor orders them by the scheduling policy)
+        check_tool_plugin_class_names = list(
+            dict.fromkeys(check_tool_plugin_class_names))
 
         executor = QtCheckExecutorThread(
             qa_json,
             self.profile.name,
-            check_tool_plugin_class_names)
+            check_tool_plugin_class_names,
+            self.tab_run.executor_service())
         self.tab_run.run_executor(executor)
 
     def change_tabs(self, index):
@@ -228,3 +209,7 @@ class QAXWidget(QtWidgets.QTabWidget):
 
     def persist_exit_settings(self):
         self.tab_inputs.persist_exit_settings()
+
+    def shutdown(self):
+        """ Stops any processes started by the widget """
+        self.tab_run.shutdown_executor_service()
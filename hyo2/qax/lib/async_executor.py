@@ -0,0 +1,180 @@
+""" asyncio interface to the check executor. Allows QAX checks to be run from
+services built on asyncio (eg; a data ingestion service) without blocking
+the event loop.
+"""
+from typing import AsyncIterator, Dict, List, Optional
+import asyncio
+import logging
+import logging.handlers
+import multiprocessing as mp
+import queue
+import time
+
+from ausseabed.qajson.model import QajsonRoot
+from hyo2.qax.lib.check_executor import MultiprocessCheckExecutor, \
+    ChecksCompleteQueueItem, QajsonChangedQueueItem, QajsonPatchQueueItem, \
+    SharedPayloadStore, StatusQueueItem, STOP_GRACE_PERIOD
+
+logger = logging.getLogger(__name__)
+
+# seconds between reads of the executor queue, the event loop is free to run
+# other tasks in between
+POLL_INTERVAL = 0.1
+
+# seconds the executor process is given to stop once the run has been
+# cancelled. Includes the grace period given to worker processes, after
+# which the executor process is terminated.
+STOP_TIMEOUT = STOP_GRACE_PERIOD + 10.0
+
+
+class _HeadlessCheckExecutor(MultiprocessCheckExecutor):
+    """ MultiprocessCheckExecutor that doesn't configure logging from the
+    GUI settings (which depend on Qt). Log records at or above the log level
+    of the process that created the executor are sent on the queue.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super(_HeadlessCheckExecutor, self).__init__(*args, **kwargs)
+        self.log_level = logging.getLogger().getEffectiveLevel()
+
+    def _configure_log(self):
+        root = logging.getLogger()
+        root.handlers = [logging.handlers.QueueHandler(self.queue)]
+        root.setLevel(self.log_level)
+
+
+class AsyncCheckExecutor():
+    """ Runs checks in a separate process (and its worker processes, see
+    `ExecutorOption.workers`). The run is awaited, and its events (the queue
+    items of the MultiprocessCheckExecutor and log records) can be consumed
+    with `events`. Cancelling the task awaiting `run` stops the checks.
+
+        executor = AsyncCheckExecutor(qa_json, profile_name, class_names)
+        task = asyncio.create_task(executor.run())
+        async for event in executor.events():
+            ...
+        qa_json = await task
+
+    Events are buffered until they are consumed. An executor can only be run
+    once.
+    """
+
+    def __init__(
+            self,
+            qa_json: QajsonRoot,
+            profile_name: str,
+            check_tool_class_names: List[str],
+            options: Optional[Dict] = None):
+        self.qa_json = qa_json
+        self.status = "Not started"
+        # reads the large check outputs the executor sends via shared memory
+        self.shared_payloads = SharedPayloadStore()
+        self.queue = mp.Queue()
+        # process the checks are run in
+        self.process = _HeadlessCheckExecutor(
+            qa_json,
+            profile_name,
+            check_tool_class_names,
+            self.queue
+        )
+        self.process.options = {} if options is None else options
+        self._events: Optional[asyncio.Queue] = None
+
+    def _get_events(self) -> asyncio.Queue:
+        # created on first use so that it belongs to the running event loop
+        if self._events is None:
+            self._events = asyncio.Queue()
+        return self._events
+
+    async def events(self) -> AsyncIterator[object]:
+        """ Iterates over the events of the run until it has finished.
+        Events are ProgressQueueItem, CheckToolStartedQueueItem,
+        StatusQueueItem, QajsonPatchQueueItem (already applied to `qa_json`),
+        ChecksCompleteQueueItem and logging.LogRecord instances.
+        """
+        events = self._get_events()
+        while True:
+            event = await events.get()
+            if event is None:
+                return
+            yield event
+
+    def _handle_item(self, item) -> None:
+        if isinstance(item, StatusQueueItem):
+            self.status = item.status
+        elif isinstance(item, QajsonPatchQueueItem):
+            self.shared_payloads.unpack_patch(item)
+            item.apply(self.qa_json)
+        elif isinstance(item, QajsonChangedQueueItem):
+            self.qa_json = item.qajson
+        elif isinstance(item, logging.LogRecord):
+            # log records of the executor are passed on to the handlers of
+            # this process
+            logging.getLogger(item.name).handle(item)
+        self._get_events().put_nowait(item)
+
+    def _read_queue(self) -> bool:
+        """ Handles all items currently on the executor queue. Returns True
+        if the ChecksCompleteQueueItem was read.
+        """
+        complete = False
+        while True:
+            try:
+                item = self.queue.get_nowait()
+            except queue.Empty:
+                return complete
+            if isinstance(item, ChecksCompleteQueueItem):
+                complete = True
+            self._handle_item(item)
+
+    async def _wait_for_process(self, timeout: Optional[float]) -> bool:
+        """ Reads the executor queue until the executor process exits, or
+        `timeout` seconds have passed. Returns True if the
+        ChecksCompleteQueueItem was read.
+        """
+        complete = False
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            complete = self._read_queue() or complete
+            if not self.process.is_alive():
+                # items put on the queue before the process exited
+                return self._read_queue() or complete
+            if deadline is not None and time.monotonic() > deadline:
+                return complete
+            await asyncio.sleep(POLL_INTERVAL)
+
+    async def _stop(self) -> None:
+        """ Stops the checks, terminating the executor process if it doesn't
+        stop within the STOP_TIMEOUT.
+        """
+        self.process.stop()
+        try:
+            await self._wait_for_process(STOP_TIMEOUT)
+        finally:
+            # also reached if cancelled again while stopping
+            if self.process.is_alive():
+                logger.warning(
+                    f"Terminating check executor process {self.process.pid}")
+                self.process.terminate()
+            self.process.join()
+            self.status = "Stopped"
+
+    async def run(self) -> QajsonRoot:
+        """ Runs the checks, and returns the qa_json including the check
+        outputs.
+        """
+        self.process.start()
+        try:
+            complete = await self._wait_for_process(None)
+            self.process.join()
+            if not complete:
+                logger.error(
+                    "Check executor exited unexpectedly (exit code "
+                    f"{self.process.exitcode})")
+                self.status = "Error"
+        except asyncio.CancelledError:
+            await self._stop()
+            raise
+        finally:
+            self._get_events().put_nowait(None)
+        return self.qa_json
@@ -0,0 +1,172 @@
+""" Persistent cache of check outputs. Entries are addressed by the check
+fingerprint (see `check_fingerprint`) so a check is only run again when its
+input files, version, parameters or options have changed.
+"""
+from collections import OrderedDict
+from pathlib import Path
+from typing import Dict, Optional
+import json
+import logging
+import os
+
+from ausseabed.qajson.model import QajsonCheck, QajsonOutputs
+
+logger = logging.getLogger(__name__)
+
+# default maximum size of all cache entries, in bytes
+DEFAULT_CACHE_MAX_SIZE = 1024 * 1024 * 1024
+
+
+class CheckCacheStats():
+    """ Counts of cache operations since the cache was opened
+    """
+
+    def __init__(self):
+        self.hits = 0
+        self.misses = 0
+        self.stores = 0
+        self.evictions = 0
+
+    @property
+    def hit_ratio(self) -> float:
+        lookups = self.hits + self.misses
+        if lookups == 0:
+            return 0.0
+        return self.hits / lookups
+
+    def to_dict(self) -> Dict:
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'stores': self.stores,
+            'evictions': self.evictions,
+            'hit_ratio': self.hit_ratio,
+        }
+
+    def __repr__(self):
+        return (
+            f"{self.hits} hits, {self.misses} misses, {self.stores} stores, "
+            f"{self.evictions} evictions"
+        )
+
+
+class CheckCache():
+    """ On disk cache of check outputs. Each entry is a JSON file named by the
+    check fingerprint. When the total size of all entries exceeds `max_size`
+    the least recently used entries are removed. The last used time of an
+    entry is its file modification time, so usage persists between runs.
+    """
+
+    def __init__(self, folder: Path, max_size: int = DEFAULT_CACHE_MAX_SIZE):
+        self.folder = Path(folder)
+        self.max_size = max_size
+        self.stats = CheckCacheStats()
+        # entry key to size in bytes, ordered from least to most recently used
+        self._entries: OrderedDict = OrderedDict()
+        self._size = 0
+        self._load_index()
+
+    @property
+    def size(self) -> int:
+        """ Total size of all cache entries in bytes """
+        return self._size
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._entries
+
+    def _entry_path(self, key: str) -> Path:
+        # first two characters used as a sub folder to avoid a single folder
+        # with a very large number of files
+        return self.folder.joinpath(key[:2], key + '.json')
+
+    def _load_index(self) -> None:
+        self.folder.mkdir(parents=True, exist_ok=True)
+        found = []
+        for path in self.folder.glob('*/*.json'):
+            try:
+                stat = path.stat()
+            except OSError:
+                continue
+            found.append((stat.st_mtime_ns, path.stem, stat.st_size))
+        found.sort()
+        for _, key, size in found:
+            self._entries[key] = size
+            self._size += size
+        logger.debug(
+            f"Check cache {self.folder} has {len(self._entries)} entries "
+            f"({self._size} bytes)")
+
+    def get(self, key: str) -> Optional[QajsonOutputs]:
+        """ Gets the cached outputs for the check fingerprint `key`, or None
+        if they are not in the cache.
+        """
+        if key not in self._entries:
+            self.stats.misses += 1
+            return None
+        path = self._entry_path(key)
+        try:
+            entry = json.loads(path.read_text())
+            # mark as most recently used
+            os.utime(path)
+        except (OSError, ValueError):
+            logger.warning(f"Removing unreadable cache entry {path}")
+            self._remove(key)
+            self.stats.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.stats.hits += 1
+        return QajsonOutputs.from_dict(entry['outputs'])
+
+    def put(self, key: str, check: QajsonCheck) -> None:
+        """ Adds the outputs of a check to the cache, and removes least
+        recently used entries if the cache exceeds its maximum size.
+        """
+        try:
+            encoded = json.dumps(
+                {'check_id': check.info.id, 'outputs': check.outputs.to_dict()})
+        except (TypeError, ValueError):
+            logger.debug(f"Outputs of check {check.info.id} are not cacheable")
+            return
+
+        size = len(encoded.encode('utf-8'))
+        if size > self.max_size:
+            return
+
+        if key in self._entries:
+            self._remove(key)
+
+        path = self._entry_path(key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        # written to a temporary file first so that an interrupted write does
+        # not leave a partial entry
+        temp_path = path.with_suffix('.tmp')
+        temp_path.write_text(encoded)
+        os.replace(str(temp_path), str(path))
+
+        self._entries[key] = size
+        self._size += size
+        self.stats.stores += 1
+        self._evict()
+
+    def _remove(self, key: str) -> None:
+        size = self._entries.pop(key)
+        self._size -= size
+        try:
+            self._entry_path(key).unlink()
+        except OSError:
+            pass
+
+    def _evict(self) -> None:
+        while self._size > self.max_size and len(self._entries) > 0:
+            key = next(iter(self._entries))
+            self._remove(key)
+            self.stats.evictions += 1
+
+    def clear(self) -> None:
+        """ Removes all entries from the cache
+        """
+        for key in list(self._entries.keys()):
+            self._remove(key)
@@ -1,14 +1,313 @@
-from typing import List
+from datetime import datetime
+from multiprocessing import resource_tracker, shared_memory
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple
+import copy
+import importlib
+import json
 import logging
 import logging.handlers
 import multiprocessing as mp
+import os
+import queue
+import sys
+import threading
+import time
+import uuid
 
-from ausseabed.qajson.model import QajsonRoot
+from ausseabed.qajson.model import QajsonRoot, QajsonQa, QajsonCheck, \
+    QajsonOutputs
+from hyo2.qax.lib.check_cache import CheckCache, DEFAULT_CACHE_MAX_SIZE
+from hyo2.qax.lib.check_journal import CheckJournal, check_fingerprint
+from hyo2.qax.lib.check_options import CheckOption, ExecutorOption
+from hyo2.qax.lib.event_stream import EventSink, EventSinkHandler, \
+    RunStartedEvent
 from hyo2.qax.lib.plugin import QaxCheckToolPlugin, QaxPlugins
 from hyo2.qax.lib.logging import setup_logging
+from hyo2.qax.lib.telemetry import CheckTelemetry, ResourceMonitor, \
+    TelemetryWriter
+from hyo2.qax.lib.scheduler import MemoryAdmission, MemoryEstimator, \
+    DEFAULT_MEMORY_FRACTION, DEFAULT_SCHEDULING_POLICY, DEFAULT_TILE_SIZE, \
+    SchedulingPolicy, \
+    ThroughputHistory, input_megabytes, order_jobs
+from hyo2.qax.lib.work_queue import WorkQueue, JOB_RUNNING, JOB_DONE, \
+    JOB_FAILED, DEFAULT_STALE_TIMEOUT
 
 logger = logging.getLogger(__name__)
 
+# data levels that may contain checks, in the order they are processed
+DATA_LEVELS = ['raw_data', 'survey_products', 'chart_adequacy']
+
+# a reference to a single QajsonCheck within a QajsonRoot. Made up of the data
+# level name and the index of the check within that data level's check list
+CheckRef = Tuple[str, int]
+
+
+def get_check(qa_json: QajsonRoot, check_ref: CheckRef) -> QajsonCheck:
+    """ Gets the QajsonCheck referenced by `check_ref`
+    """
+    data_level_name, index = check_ref
+    return qa_json.qa.get_data_level(data_level_name).checks[index]
+
+
+def get_check_refs(
+        qa_json: QajsonRoot,
+        check_tool: QaxCheckToolPlugin) -> List[CheckRef]:
+    """ Gets references to all checks in the qa_json that are implemented
+    by the given check tool.
+    """
+    check_refs = []
+    if qa_json.qa is None:
+        return check_refs
+    for data_level_name in DATA_LEVELS:
+        data_level = qa_json.qa.get_data_level(data_level_name)
+        if data_level is None:
+            continue
+        for index, check in enumerate(data_level.checks):
+            if check_tool.implements_check(check.info.id):
+                check_refs.append((data_level_name, index))
+    return check_refs
+
+
+def group_check_refs_by_files(
+        qa_json: QajsonRoot,
+        check_refs: List[CheckRef]) -> List[List[CheckRef]]:
+    """ Splits a list of check references into groups that share the same
+    input files. Order of the groups follows the first occurrence of the input
+    files in `check_refs`.
+    """
+    groups = {}
+    for check_ref in check_refs:
+        check = get_check(qa_json, check_ref)
+        files = []
+        if check.inputs is not None:
+            files = [f.path for f in check.inputs.files]
+        key = tuple(files)
+        if key not in groups:
+            groups[key] = []
+        groups[key].append(check_ref)
+    return list(groups.values())
+
+
+def build_sub_qajson(
+        qa_json: QajsonRoot,
+        check_refs: List[CheckRef]) -> QajsonRoot:
+    """ Builds a new QajsonRoot that includes only the checks referenced by
+    `check_refs`. The check objects are shared with `qa_json` (not copied).
+    """
+    root = QajsonRoot(None)
+    root.qa = QajsonQa(
+        version=qa_json.qa.version,
+        raw_data=None,
+        survey_products=None,
+    )
+    for check_ref in check_refs:
+        data_level_name, _ = check_ref
+        data_level = root.qa.get_or_add_data_level(data_level_name)
+        data_level.checks.append(get_check(qa_json, check_ref))
+    return root
+
+
+def get_sub_check_refs(check_refs: List[CheckRef]) -> List[CheckRef]:
+    """ Gets the reference to each check within a QajsonRoot created by
+    `build_sub_qajson` from the same `check_refs`.
+    """
+    positions = {}
+    sub_check_refs = []
+    for check_ref in check_refs:
+        data_level_name, _ = check_ref
+        position = positions.get(data_level_name, 0)
+        positions[data_level_name] = position + 1
+        sub_check_refs.append((data_level_name, position))
+    return sub_check_refs
+
+
+def get_sub_qajson_outputs(
+        sub_qa_json: QajsonRoot,
+        check_refs: List[CheckRef]
+) -> List[Tuple[CheckRef, QajsonOutputs]]:
+    """ Gets the outputs of each check in a QajsonRoot that was created by
+    `build_sub_qajson`, paired with the reference to the check in the
+    original QajsonRoot.
+    """
+    return [
+        (check_ref, get_check(sub_qa_json, sub_check_ref).outputs)
+        for check_ref, sub_check_ref in zip(
+            check_refs, get_sub_check_refs(check_refs))
+    ]
+
+
+def get_all_check_refs(qa_json: QajsonRoot) -> List[CheckRef]:
+    """ Gets references to all checks in the qa_json
+    """
+    check_refs = []
+    if qa_json.qa is None:
+        return check_refs
+    for data_level_name in DATA_LEVELS:
+        data_level = qa_json.qa.get_data_level(data_level_name)
+        if data_level is None:
+            continue
+        for index in range(len(data_level.checks)):
+            check_refs.append((data_level_name, index))
+    return check_refs
+
+
+def aborted_outputs(reason: str) -> QajsonOutputs:
+    """ Builds the outputs of a check that was aborted before it completed,
+    eg; because it exceeded its time budget.
+    """
+    now = datetime.now().isoformat()
+    return QajsonOutputs.from_dict({
+        "execution": {
+            "status": "aborted",
+            "start": now,
+            "end": now,
+            "error": reason
+        },
+        "files": [],
+        "messages": [reason]
+    })
+
+
+def failed_outputs(error: str) -> QajsonOutputs:
+    """ Builds the outputs of a check whose check tool raised an exception
+    """
+    now = datetime.now().isoformat()
+    return QajsonOutputs.from_dict({
+        "execution": {
+            "status": "failed",
+            "start": now,
+            "end": now,
+            "error": error
+        },
+        "files": [],
+        "messages": [error]
+    })
+
+
+# factor applied to the grid processing tile size when failed checks are
+# retried, smaller tiles reduce the memory needed to run a check
+RETRY_TILE_SIZE_FACTOR = 0.5
+
+
+def apply_check_outputs(
+        qa_json: QajsonRoot,
+        check_outputs: List[Tuple[CheckRef, QajsonOutputs]]) -> None:
+    """ Sets the outputs of each referenced check within the qa_json
+    """
+    for check_ref, outputs in check_outputs:
+        get_check(qa_json, check_ref).outputs = outputs
+
+
+class QajsonChangeTracker():
+    """ Identifies which checks have had their outputs changed since the last
+    time `changed_check_refs` was called. Plugins typically assign a new
+    QajsonOutputs object as a check progresses, so changes are identified by
+    the identity of the outputs object along with the execution status and
+    check state (to catch outputs updated in place).
+    """
+
+    def __init__(self, qa_json: Optional[QajsonRoot] = None):
+        self._previous: Dict[CheckRef, Tuple] = {}
+        if qa_json is not None:
+            # record the initial state so only subsequent changes are reported
+            self.changed_check_refs(qa_json)
+
+    def _state(self, check: QajsonCheck) -> Tuple:
+        outputs = check.outputs
+        if outputs is None:
+            return (None, None, None)
+        status = (
+            None if outputs.execution is None else outputs.execution.status
+        )
+        # the outputs object itself is held (not its id) so that the identity
+        # comparison can't be fooled by a reused id
+        return (outputs, status, outputs.check_state)
+
+    def changed_check_refs(self, qa_json: QajsonRoot) -> List[CheckRef]:
+        changed = []
+        for check_ref in get_all_check_refs(qa_json):
+            state = self._state(get_check(qa_json, check_ref))
+            previous = self._previous.get(check_ref)
+            if (
+                previous is None or
+                previous[0] is not state[0] or
+                previous[1:] != state[1:]
+            ):
+                changed.append(check_ref)
+                self._previous[check_ref] = state
+        return changed
+
+
+class CheckJob():
+    """ A unit of work that is run by a worker process. Includes the check tool
+    that will be run and references to the checks (within the executor's
+    QajsonRoot) it will be run against.
+    """
+
+    def __init__(
+            self,
+            job_id: int,
+            check_tool: QaxCheckToolPlugin,
+            check_refs: List[CheckRef]):
+        self.job_id = job_id
+        self.check_tool = check_tool
+        self.check_refs = check_refs
+        self.progress = 0.0
+        # time.monotonic when the job was given to a worker
+        self.started_at: Optional[float] = None
+        # outputs of the checks before the job was run, used to identify the
+        # checks the job completed if it fails part way through
+        self.initial_outputs: Dict[CheckRef, Optional[QajsonOutputs]] = {}
+
+    def record_initial_outputs(self, qa_json: QajsonRoot) -> None:
+        self.initial_outputs = {
+            check_ref: get_check(qa_json, check_ref).outputs
+            for check_ref in self.check_refs
+        }
+
+    def completed_check_refs(self, qa_json: QajsonRoot) -> List[CheckRef]:
+        """ Checks that this job has completed (ie; that have completed
+        outputs that were not there before the job was run)
+        """
+        completed = []
+        for check_ref in self.check_refs:
+            outputs = get_check(qa_json, check_ref).outputs
+            if (
+                outputs is not None and
+                outputs is not self.initial_outputs.get(check_ref) and
+                outputs.execution is not None and
+                outputs.execution.status == 'completed'
+            ):
+                completed.append(check_ref)
+        return completed
+
+    def changed_outputs(
+            self,
+            job_outputs: List[Tuple[CheckRef, QajsonOutputs]]
+    ) -> List[Tuple[CheckRef, QajsonOutputs]]:
+        """ Filters the outputs returned by a job to those that differ from
+        the outputs of the checks before the job was run. Outputs that were
+        passed through unchanged (eg; a copy of the outputs of a previous run)
+        are dropped so the original outputs are kept.
+        """
+        changed = []
+        for check_ref, outputs in job_outputs:
+            initial = self.initial_outputs.get(check_ref)
+            if (
+                initial is not None and outputs is not None and
+                initial.to_dict() == outputs.to_dict()
+            ):
+                continue
+            changed.append((check_ref, outputs))
+        return changed
+
+    def __str__(self):
+        return (
+            f"CheckJob ({self.job_id}, {self.check_tool.plugin_class}, "
+            f"{len(self.check_refs)} checks)"
+        )
+
 
 class CheckExecutor():
     """ Executes checks sequentially, calling a number of functions throughout
@@ -34,6 +333,31 @@ class CheckExecutor():
         # spatial outputs to write
         self.options = {}
 
+        # checkpoint journal, only used when a checkpoint file is given in
+        # the options
+        self.journal = None
+        # persistent check output cache, only used when a cache folder is given
+        # in the options
+        self.cache = None
+        # checks that have been restored or recorded during this run
+        self._recorded_check_refs = set()
+        # throughput of previously run checks, used to order jobs
+        self.history = ThroughputHistory()
+        # only used when a telemetry file is given in the options
+        self.telemetry_writer = None
+        # pool of worker processes that outlives this executor (eg; one kept
+        # warm by the CheckExecutorService). If None a pool is created for
+        # each parallel run.
+        self.worker_pool = None
+        # jobs that failed during this run (only when continuing on error),
+        # and whether they have been retried
+        self._failed_jobs: List[CheckJob] = []
+        self._retried = False
+        # only used when an event stream is given in the options
+        self.event_sink = None
+        self._event_change_tracker = None
+        self._event_log_handler = None
+
         self.check_tools = [
             QaxPlugins.instance().get_plugin(
                 self.profile_name,
@@ -42,29 +366,880 @@ class CheckExecutor():
             for check_tool_class_name in self.check_tool_class_names
         ]
 
+    def _emit(self, event) -> None:
+        """ Adds an event to the event stream, if one is being written """
+        if self.event_sink is not None:
+            self.event_sink.put(event)
+
     def _progress_callback(self, check_tool, progress):
-        print(progress)
+        self._emit(ProgressQueueItem(
+            None if check_tool is None else check_tool.plugin_class,
+            progress
+        ))
 
-    def _qajson_update_callback(self):
-        print("QAJSON Updated")
+    def _qajson_update_callback(self, check_refs: List[CheckRef] = None):
+        """ Called when the qa_json has been updated. `check_refs` is the list
+        of checks that have changed, if None the changed checks are unknown
+        (as is the case when called by a plugin)
+        """
+        if self.event_sink is None:
+            return
+        if check_refs is None:
+            check_refs = self._event_change_tracker.changed_check_refs(
+                self.qa_json)
+        if len(check_refs) == 0:
+            return
+        self._emit(QajsonPatchQueueItem([
+            (check_ref, get_check(self.qa_json, check_ref).outputs)
+            for check_ref in check_refs
+        ]))
 
     def _check_tool_started(self, check_tool, check_number, total_check_count):
-        print("Started {}".format(check_tool.name))
+        self._emit(CheckToolStartedQueueItem(
+            check_tool.plugin_class,
+            check_number,
+            total_check_count
+        ))
 
     def _increment_check_number(self):
         self.current_check_number += 1
 
     def _checks_complete(self):
-        print("all checks done")
+        self._emit(ChecksCompleteQueueItem())
 
     def _set_status(self, status: str):
         self.status = status
+        self._emit(StatusQueueItem(status))
+
+    @property
+    def workers(self) -> int:
+        if ExecutorOption.workers in self.options:
+            return self.options[ExecutorOption.workers]
+        else:
+            return 1
+
+    @property
+    def split_by_file_group(self) -> bool:
+        if ExecutorOption.split_by_file_group in self.options:
+            return self.options[ExecutorOption.split_by_file_group]
+        else:
+            return False
+
+    @property
+    def checkpoint_file(self) -> Optional[str]:
+        if ExecutorOption.checkpoint_file in self.options:
+            return self.options[ExecutorOption.checkpoint_file]
+        else:
+            return None
+
+    @property
+    def resume(self) -> bool:
+        if ExecutorOption.resume in self.options:
+            return self.options[ExecutorOption.resume]
+        else:
+            return False
+
+    @property
+    def cache_folder(self) -> Optional[str]:
+        if ExecutorOption.cache_folder in self.options:
+            return self.options[ExecutorOption.cache_folder]
+        else:
+            return None
+
+    @property
+    def cache_max_size(self) -> int:
+        if ExecutorOption.cache_max_size in self.options:
+            return self.options[ExecutorOption.cache_max_size]
+        else:
+            return DEFAULT_CACHE_MAX_SIZE
+
+    @property
+    def work_queue(self) -> Optional[str]:
+        if ExecutorOption.work_queue in self.options:
+            return self.options[ExecutorOption.work_queue]
+        else:
+            return None
+
+    @property
+    def check_timeout(self) -> Optional[float]:
+        if ExecutorOption.check_timeout in self.options:
+            return self.options[ExecutorOption.check_timeout]
+        else:
+            return None
+
+    @property
+    def run_timeout(self) -> Optional[float]:
+        if ExecutorOption.run_timeout in self.options:
+            return self.options[ExecutorOption.run_timeout]
+        else:
+            return None
+
+    @property
+    def memory_fraction(self) -> float:
+        if ExecutorOption.memory_fraction in self.options:
+            return self.options[ExecutorOption.memory_fraction]
+        else:
+            return DEFAULT_MEMORY_FRACTION
+
+    @property
+    def scheduling_policy(self) -> SchedulingPolicy:
+        if ExecutorOption.scheduling_policy in self.options:
+            return SchedulingPolicy(
+                self.options[ExecutorOption.scheduling_policy])
+        else:
+            return DEFAULT_SCHEDULING_POLICY
+
+    @property
+    def throughput_history(self) -> Optional[str]:
+        if ExecutorOption.throughput_history in self.options:
+            return self.options[ExecutorOption.throughput_history]
+        else:
+            return None
+
+    @property
+    def telemetry_file(self) -> Optional[str]:
+        if ExecutorOption.telemetry_file in self.options:
+            return self.options[ExecutorOption.telemetry_file]
+        else:
+            return None
+
+    @property
+    def telemetry_in_outputs(self) -> bool:
+        if ExecutorOption.telemetry_in_outputs in self.options:
+            return self.options[ExecutorOption.telemetry_in_outputs]
+        else:
+            return False
+
+    @property
+    def continue_on_error(self) -> bool:
+        if ExecutorOption.continue_on_error in self.options:
+            return self.options[ExecutorOption.continue_on_error]
+        else:
+            return False
+
+    @property
+    def retry_failed(self) -> bool:
+        if ExecutorOption.retry_failed in self.options:
+            return self.options[ExecutorOption.retry_failed]
+        else:
+            return False
+
+    @property
+    def event_stream(self) -> Optional[str]:
+        if ExecutorOption.event_stream in self.options:
+            return self.options[ExecutorOption.event_stream]
+        else:
+            return None
+
+    @property
+    def max_jobs_per_worker(self) -> int:
+        if ExecutorOption.max_jobs_per_worker in self.options:
+            return self.options[ExecutorOption.max_jobs_per_worker]
+        else:
+            return DEFAULT_MAX_JOBS_PER_WORKER
 
     def run(self):
+        self._failed_jobs = []
+        self._retried = False
+        self._open_event_sink()
+        try:
+            self._open_journal()
+            self._open_cache()
+            self.history = ThroughputHistory(self.throughput_history)
+            self.history.load()
+            self.telemetry_writer = None
+            if self.telemetry_file is not None:
+                self.telemetry_writer = TelemetryWriter(
+                    Path(self.telemetry_file))
+            if self.work_queue is not None:
+                self._run_distributed()
+            elif (
+                self.workers > 1 or
+                self.check_timeout is not None or
+                self.run_timeout is not None
+            ):
+                # time budgets can only be enforced when check tools are run
+                # in a worker process that can be terminated
+                self._run_parallel()
+            else:
+                self._run_sequential()
+            if self.cache is not None:
+                logger.info(f"Check cache: {self.cache.stats}")
+            self.history.save()
+        finally:
+            self._close_event_sink()
+
+    def _open_event_sink(self) -> None:
+        """ Starts writing the event stream, including the log records of the
+        run
+        """
+        if self.event_stream is None:
+            return
+        self.event_sink = EventSink(self.event_stream)
+        self._event_change_tracker = QajsonChangeTracker(self.qa_json)
+        self._event_log_handler = EventSinkHandler(self.event_sink)
+        logging.getLogger().addHandler(self._event_log_handler)
+        self._emit(RunStartedEvent(
+            sum([
+                len(get_check_refs(self.qa_json, check_tool))
+                for check_tool in self.check_tools
+            ]),
+            len(self.check_tools)
+        ))
+
+    def _close_event_sink(self) -> None:
+        if self.event_sink is None:
+            return
+        logging.getLogger().removeHandler(self._event_log_handler)
+        self.event_sink.close()
+        self.event_sink = None
+        self._event_change_tracker = None
+        self._event_log_handler = None
+
+    def _open_journal(self) -> None:
+        """ Opens the checkpoint journal. Existing journal entries are only
+        kept when resuming.
+        """
+        self.journal = None
+        self._recorded_check_refs = set()
+        if self.checkpoint_file is None:
+            return
+        self.journal = CheckJournal(Path(self.checkpoint_file))
+        if self.resume:
+            self.journal.load()
+        else:
+            self.journal.clear()
+
+    def _open_cache(self) -> None:
+        self.cache = None
+        if self.cache_folder is None:
+            return
+        self.cache = CheckCache(Path(self.cache_folder), self.cache_max_size)
+
+    @property
+    def _restores_checks(self) -> bool:
+        """ True if check outputs may be restored from the checkpoint journal
+        or the cache, rather than running the check.
+        """
+        return self.journal is not None or self.cache is not None
+
+    def _restore_checks(self, check_refs: List[CheckRef]) -> List[CheckRef]:
+        """ Restores the outputs of checks that have been recorded in the
+        checkpoint journal or check cache, and have not changed since. Returns
+        the list of checks that were not restored (and therefore still need to
+        be run).
+        """
+        use_journal = self.journal is not None and self.resume
+        if not use_journal and self.cache is None:
+            return check_refs
+        remaining = []
+        restored = []
+        for check_ref in check_refs:
+            check = get_check(self.qa_json, check_ref)
+            key = check_fingerprint(check, self.options)
+            outputs = None
+            if use_journal:
+                outputs = self.journal.get(key)
+            if outputs is None and self.cache is not None:
+                outputs = self.cache.get(key)
+            if outputs is None:
+                remaining.append(check_ref)
+            else:
+                check.outputs = outputs
+                restored.append(check_ref)
+                self._recorded_check_refs.add(check_ref)
+        if len(restored) > 0:
+            logger.info(f"Restored outputs of {len(restored)} checks")
+            self._qajson_update_callback(restored)
+        return remaining
+
+    def _record_completed(self, check_refs: List[CheckRef]) -> None:
+        """ Records checks that have completed execution in the checkpoint
+        journal and check cache. Checks already recorded during this run are
+        skipped.
+        """
+        if not self._restores_checks:
+            return
+        for check_ref in check_refs:
+            if check_ref in self._recorded_check_refs:
+                continue
+            check = get_check(self.qa_json, check_ref)
+            outputs = check.outputs
+            if (
+                outputs is None or
+                outputs.execution is None or
+                outputs.execution.status != 'completed'
+            ):
+                continue
+            key = check_fingerprint(check, self.options)
+            if self.journal is not None:
+                self.journal.record(key, check)
+            if self.cache is not None:
+                self.cache.put(key, check)
+            self._recorded_check_refs.add(check_ref)
+
+    def _predict_duration(self, check_refs: List[CheckRef]) -> float:
+        """ Predicted number of seconds to run the referenced checks
+        """
+        checks = [get_check(self.qa_json, check_ref) for check_ref in check_refs]
+        return self.history.predict(
+            [check.info.id for check in checks], input_megabytes(checks))
+
+    def _record_duration(
+            self,
+            check_refs: List[CheckRef],
+            seconds: float) -> None:
+        """ Adds the time taken to run the referenced checks to the
+        throughput history
+        """
+        checks = [get_check(self.qa_json, check_ref) for check_ref in check_refs]
+        self.history.record(
+            [check.info.id for check in checks],
+            input_megabytes(checks),
+            seconds
+        )
+
+    def _record_telemetry(
+            self,
+            check_tool: QaxCheckToolPlugin,
+            check_refs: List[CheckRef],
+            telemetry: Optional[CheckTelemetry]) -> None:
+        """ Records the resources used to run the referenced checks to the
+        telemetry file, and if enabled the outputs of each check.
+        """
+        if telemetry is None:
+            return
+        logger.debug(f"{check_tool.name} used {telemetry}")
+        records = []
+        for check_ref in check_refs:
+            check = get_check(self.qa_json, check_ref)
+            records.append(dict(
+                telemetry.to_dict(),
+                check_id=check.info.id,
+                check_name=check.info.name,
+                check_version=check.info.version,
+                check_tool=check_tool.plugin_class,
+                files=[] if check.inputs is None else [
+                    f.path for f in check.inputs.files],
+                # number of checks that were run together, and share these
+                # values
+                checks_measured=len(check_refs),
+            ))
+            if self.telemetry_in_outputs and check.outputs is not None:
+                if check.outputs.data is None:
+                    check.outputs.data = {}
+                check.outputs.data['telemetry'] = telemetry.to_dict()
+        if self.telemetry_writer is not None:
+            self.telemetry_writer.write(records)
+
+    def _order_check_tools(self) -> List[QaxCheckToolPlugin]:
+        return order_jobs(
+            self.check_tools,
+            self.scheduling_policy,
+            lambda check_tool: self._predict_duration(
+                get_check_refs(self.qa_json, check_tool))
+        )
+
+    def _build_jobs(self) -> List[CheckJob]:
+        """ Builds the list of jobs that will be run by worker processes. By
+        default there is one job per check tool, if `split_by_file_group` is
+        set then there is one job per check tool and group of input files.
+        Jobs are ordered by the scheduling policy.
+        """
+        jobs = []
+        for check_tool in self.check_tools:
+            check_refs = self._restore_checks(
+                get_check_refs(self.qa_json, check_tool))
+            if len(check_refs) == 0:
+                continue
+            check_tool.options = self.options
+            if self.split_by_file_group:
+                check_ref_groups = group_check_refs_by_files(
+                    self.qa_json, check_refs)
+            else:
+                check_ref_groups = [check_refs]
+            for check_ref_group in check_ref_groups:
+                job = CheckJob(len(jobs), check_tool, check_ref_group)
+                job.record_initial_outputs(self.qa_json)
+                jobs.append(job)
+
+        jobs = order_jobs(
+            jobs,
+            self.scheduling_policy,
+            lambda job: self._predict_duration(job.check_refs)
+        )
+        # job ids are the index of the job within the list
+        for job_id, job in enumerate(jobs):
+            job.job_id = job_id
+        return jobs
+
+    def _apply_job_outputs(
+            self,
+            job_outputs: List[Tuple[CheckRef, QajsonOutputs]]) -> None:
+        """ Merges the outputs generated by a worker back into the qa_json
+        """
+        apply_check_outputs(self.qa_json, job_outputs)
+
+    def _apply_job_update(
+            self,
+            job: CheckJob,
+            job_outputs: List[Tuple[CheckRef, QajsonOutputs]]) -> None:
+        """ Merges the outputs of checks a worker has updated while its job
+        is still running. Completed checks are recorded as they arrive, so
+        they are kept if the job later fails or is aborted.
+        """
+        self._apply_job_outputs(job_outputs)
+        check_refs = [check_ref for check_ref, _ in job_outputs]
+        self._record_completed(check_refs)
+        self._qajson_update_callback(check_refs)
+
+    def _handle_job_event(self, jobs: List[CheckJob], event) -> None:
+        if isinstance(event, JobStartedQueueItem):
+            job = jobs[event.job_id]
+            self._check_tool_started(
+                job.check_tool,
+                self.current_check_number,
+                len(jobs)
+            )
+            self._increment_check_number()
+        elif isinstance(event, JobProgressQueueItem):
+            job = jobs[event.job_id]
+            job.progress = event.progress
+            total_progress = sum([j.progress for j in jobs]) / len(jobs)
+            self._progress_callback(job.check_tool, total_progress)
+        elif isinstance(event, logging.LogRecord):
+            # log records from the worker are passed on to the handlers of
+            # this process
+            logging.getLogger(event.name).handle(event)
+
+    def _get_job_events(self, event_queue, timeout: float) -> List:
+        """ Gets all events from the worker processes, waiting up to `timeout`
+        seconds for the first event.
+        """
+        events = []
+        try:
+            events.append(event_queue.get(timeout=timeout))
+            while True:
+                events.append(event_queue.get_nowait())
+        except queue.Empty:
+            pass
+        return events
+
+    def _job_deadline(self, job: CheckJob) -> Optional[float]:
+        """ Time (as given by time.monotonic) by which a job that is started
+        now must complete.
+        """
+        if self.check_timeout is None:
+            return None
+        return time.monotonic() + self.check_timeout * len(job.check_refs)
+
+    def _fail_job(self, job: CheckJob, error: str) -> None:
+        """ Marks all checks of a job as failed, used instead of stopping the
+        run when continuing on error. The job may be retried later.
+        """
+        logger.error(
+            f"Failed to run check {job.check_tool.description}: {error}")
+        # checks that completed before the error keep their outputs
+        completed = set(job.completed_check_refs(self.qa_json))
+        job.check_refs = [
+            check_ref for check_ref in job.check_refs
+            if check_ref not in self._recorded_check_refs and
+            check_ref not in completed
+        ]
+        apply_check_outputs(
+            self.qa_json,
+            [
+                (check_ref, failed_outputs(error))
+                for check_ref in job.check_refs
+            ]
+        )
+        job.progress = 1.0
+        if len(job.check_refs) > 0:
+            self._failed_jobs.append(job)
+        self._qajson_update_callback(job.check_refs)
+
+    def _retry_options(self) -> Dict:
+        """ Options failed checks are retried with, the grid processing tile
+        size is reduced in case the check ran out of memory
+        """
+        options = dict(self.options)
+        for option in [
+            CheckOption.gridprocessing_tile_x,
+            CheckOption.gridprocessing_tile_y
+        ]:
+            tile_size = options.get(option, DEFAULT_TILE_SIZE)
+            options[option] = max(int(tile_size * RETRY_TILE_SIZE_FACTOR), 1)
+        return options
+
+    def _retry_jobs(self, first_job_id: int) -> List[CheckJob]:
+        """ Builds the jobs that retry the jobs that failed during this run.
+        Failed jobs are only retried once, and only if enabled.
+        """
+        if (
+            self._retried or
+            not self.retry_failed or
+            len(self._failed_jobs) == 0 or
+            self.is_stopped()
+        ):
+            return []
+        self._retried = True
+        options = self._retry_options()
+        retry_jobs = []
+        for job in self._failed_jobs:
+            # copied so the other jobs of the check tool keep their options
+            check_tool = copy.copy(job.check_tool)
+            check_tool.options = options
+            retry_job = CheckJob(
+                first_job_id + len(retry_jobs), check_tool, job.check_refs)
+            retry_job.record_initial_outputs(self.qa_json)
+            retry_jobs.append(retry_job)
+        logger.info(
+            f"Retrying {len(retry_jobs)} failed jobs with a tile size of "
+            f"{options[CheckOption.gridprocessing_tile_x]}")
+        self._failed_jobs = []
+        return retry_jobs
+
+    def _abort_job(self, job: CheckJob, reason: str) -> None:
+        """ Marks the checks of a job as aborted, checks the job completed
+        before it was aborted keep their outputs
+        """
+        logger.error(f"Aborted {job}: {reason}")
+        completed = set(job.completed_check_refs(self.qa_json))
+        check_refs = [
+            check_ref for check_ref in job.check_refs
+            if check_ref not in completed
+        ]
+        apply_check_outputs(
+            self.qa_json,
+            [(check_ref, aborted_outputs(reason)) for check_ref in check_refs]
+        )
+        job.progress = 1.0
+        self._qajson_update_callback(check_refs)
+
+    def _estimate_jobs_memory(
+            self,
+            admission: MemoryAdmission,
+            estimator: MemoryEstimator,
+            jobs: List[CheckJob]) -> Dict[int, int]:
+        """ Estimated memory needed by each job, keyed by job id. Estimates
+        read the header of raster input files, so are only made when the
+        memory limit is in use.
+        """
+        if not admission.enabled:
+            return {}
+        return {
+            job.job_id: estimator.checks_memory([
+                get_check(self.qa_json, check_ref)
+                for check_ref in job.check_refs
+            ])
+            for job in jobs
+        }
+
+    def _get_worker_pool(self, job_count: int) -> 'WorkerPool':
+        """ Gets the pool of worker processes jobs are run on. A pool given to
+        the executor is reused (and sized to the number of workers so that
+        it stays warm for later runs), otherwise a new pool is created.
+        """
+        preload = [check_tool.plugin_class for check_tool in self.check_tools]
+        if self.worker_pool is None:
+            return WorkerPool(
+                min(self.workers, max(job_count, 1)),
+                mp.Queue(),
+                mp.Event(),
+                max_jobs=self.max_jobs_per_worker,
+                preload=preload
+            )
+        pool = self.worker_pool
+        pool.stop_event.clear()
+        pool.max_jobs = self.max_jobs_per_worker
+        pool.preload = list(dict.fromkeys(pool.preload + preload))
+        pool.resize(self.workers)
+        return pool
+
+    def _run_parallel(self):
+        """ Runs the check tools as separate jobs within a pool of worker
+        processes. Outputs are merged into the qa_json as each job completes.
+        Worker processes running jobs that exceed their time budget (or that
+        don't respond to a stop request) are terminated and replaced.
+        """
         self._set_status("Running")
         self.stopped = False
         self.current_check_number = 1
-        for check_tool in self.check_tools:
+
+        jobs = self._build_jobs()
+        pool = self._get_worker_pool(len(jobs))
+        event_queue = pool.event_queue
+        job_stop_event = pool.stop_event
+        failed = False
+        timed_out = False
+        stop_time = None
+        run_deadline = None
+        if self.run_timeout is not None:
+            run_deadline = time.monotonic() + self.run_timeout
+
+        admission = MemoryAdmission(self.memory_fraction)
+        estimator = MemoryEstimator(self.options)
+        job_memory = self._estimate_jobs_memory(admission, estimator, jobs)
+        memory_held = False
+
+        waiting = list(jobs)
+        remaining = len(jobs)
+        try:
+            while remaining > 0:
+                if failed or self.is_stopped():
+                    # jobs not yet started are never run
+                    job_stop_event.set()
+                    remaining -= len(waiting)
+                    waiting = []
+                    if stop_time is None:
+                        stop_time = time.monotonic()
+                for worker in pool.idle_workers():
+                    running = [w.job for w in pool.busy_workers()]
+                    index = admission.select(waiting, running, job_memory)
+                    if index is None:
+                        if len(waiting) > 0 and not memory_held:
+                            # only logged once per run to avoid flooding
+                            memory_held = True
+                            logger.info(
+                                "Jobs are queued until memory is available")
+                        break
+                    job = waiting.pop(index)
+                    job.started_at = time.monotonic()
+                    worker.submit(
+                        job,
+                        build_sub_qajson(self.qa_json, job.check_refs),
+                        self._job_deadline(job)
+                    )
+
+                for event in self._get_job_events(event_queue, timeout=0.1):
+                    if isinstance(event, JobOutputsQueueItem):
+                        # updates from jobs that have been aborted are ignored
+                        if pool.worker_for_job(event.job_id) is not None:
+                            self._apply_job_update(
+                                jobs[event.job_id], event.outputs)
+                        continue
+                    if not isinstance(event, JobResultQueueItem):
+                        self._handle_job_event(jobs, event)
+                        continue
+                    worker = pool.worker_for_job(event.job_id)
+                    if worker is None:
+                        # job was aborted before the result arrived
+                        continue
+                    pool.job_finished(worker)
+                    remaining -= 1
+                    job = jobs[event.job_id]
+                    if event.error is not None and self.continue_on_error:
+                        self._fail_job(job, event.error)
+                        continue
+                    elif event.error is not None:
+                        # same as the sequential run, an error in any check
+                        # tool stops all remaining checks
+                        failed = True
+                        logger.error(
+                            f"Failed to run check {job.check_tool.description}")
+                        continue
+                    self._apply_job_outputs(event.outputs)
+                    self._record_completed(
+                        job.completed_check_refs(self.qa_json))
+                    if not self.is_stopped():
+                        self._record_duration(
+                            job.check_refs, time.monotonic() - job.started_at)
+                    self._record_telemetry(
+                        job.check_tool, job.check_refs, event.telemetry)
+                    self._qajson_update_callback(job.check_refs)
+
+                # watchdog, reclaims workers that have run over time
+                now = time.monotonic()
+                if run_deadline is not None and now > run_deadline:
+                    timed_out = True
+                    reason = (
+                        f"Check run exceeded its time budget of "
+                        f"{self.run_timeout} seconds")
+                    for job in waiting:
+                        self._abort_job(job, reason)
+                    remaining -= len(waiting)
+                    waiting = []
+                    for worker in pool.busy_workers():
+                        job = worker.job
+                        pool.replace(worker)
+                        self._abort_job(job, reason)
+                        remaining -= 1
+                    break
+                for worker in pool.busy_workers():
+                    if stop_time is not None:
+                        if now - stop_time < STOP_GRACE_PERIOD:
+                            continue
+                        reason = "Check did not respond to stop request"
+                    elif worker.deadline is not None and now > worker.deadline:
+                        reason = (
+                            f"Check exceeded its time budget of "
+                            f"{self.check_timeout} seconds")
+                    elif not worker.is_alive():
+                        reason = "Worker process exited unexpectedly"
+                    else:
+                        continue
+                    job = worker.job
+                    pool.replace(worker)
+                    self._abort_job(job, reason)
+                    remaining -= 1
+
+                if remaining == 0:
+                    retry_jobs = self._retry_jobs(len(jobs))
+                    job_memory.update(self._estimate_jobs_memory(
+                        admission, estimator, retry_jobs))
+                    jobs.extend(retry_jobs)
+                    waiting.extend(retry_jobs)
+                    remaining += len(retry_jobs)
+            for event in self._get_job_events(event_queue, timeout=0.0):
+                if not isinstance(
+                        event, (JobResultQueueItem, JobOutputsQueueItem)):
+                    self._handle_job_event(jobs, event)
+        finally:
+            if pool is self.worker_pool:
+                # workers still running a job (only if this run failed
+                # unexpectedly) would send their results to the next run
+                for worker in pool.busy_workers():
+                    pool.replace(worker)
+            else:
+                pool.close()
+
+        if timed_out:
+            self.stopped = True
+            self._set_status("Stopped")
+        elif failed:
+            self._set_status("Error")
+            self.stopped = True
+            self._progress_callback(None, 0.0)
+        elif self.is_stopped():
+            self._set_status("Stopped")
+        else:
+            self._set_status("Complete")
+            self._progress_callback(None, 1.0)
+        self._checks_complete()
+
+    def _run_distributed(self, poll_interval: float = 0.5):
+        """ Publishes the check tool jobs to the work queue, and merges the
+        outputs posted by the worker daemons into the qa_json.
+        """
+        self._set_status("Running")
+        self.stopped = False
+        self.current_check_number = 1
+
+        jobs = self._build_jobs()
+        work_queue = WorkQueue(Path(self.work_queue))
+        run_id = uuid.uuid4().hex
+        queued_jobs = {}
+        pending = set()
+
+        def submit(job: CheckJob) -> None:
+            sub_qa_json = build_sub_qajson(self.qa_json, job.check_refs)
+            id = work_queue.submit(
+                run_id,
+                job.job_id,
+                self.profile_name,
+                job.check_tool.plugin_class,
+                job.check_tool.options,
+                sub_qa_json.to_dict()
+            )
+            queued_jobs[id] = job
+            pending.add(id)
+
+        for job in jobs:
+            submit(job)
+        logger.info(f"Queued {len(jobs)} jobs in {self.work_queue}")
+
+        started = set()
+        failed = False
+        timed_out = False
+        run_deadline = None
+        if self.run_timeout is not None:
+            run_deadline = time.monotonic() + self.run_timeout
+        while len(pending) > 0:
+            if self.is_stopped():
+                work_queue.cancel(run_id)
+                break
+            if run_deadline is not None and time.monotonic() > run_deadline:
+                timed_out = True
+                work_queue.cancel(run_id)
+                reason = (
+                    f"Check run exceeded its time budget of "
+                    f"{self.run_timeout} seconds")
+                for id in pending:
+                    self._abort_job(queued_jobs[id], reason)
+                break
+            work_queue.requeue_stale(DEFAULT_STALE_TIMEOUT)
+            for status in work_queue.statuses(run_id):
+                if status.id not in pending:
+                    continue
+                job = queued_jobs[status.id]
+                if status.status in [JOB_RUNNING, JOB_DONE]:
+                    if status.id not in started:
+                        started.add(status.id)
+                        self._handle_job_event(
+                            jobs, JobStartedQueueItem(job.job_id))
+                    if status.progress != job.progress:
+                        self._handle_job_event(
+                            jobs,
+                            JobProgressQueueItem(job.job_id, status.progress))
+                if status.status == JOB_DONE:
+                    pending.remove(status.id)
+                    sub_qa_json = QajsonRoot.from_dict(
+                        work_queue.result(status.id))
+                    job_outputs = job.changed_outputs(
+                        get_sub_qajson_outputs(sub_qa_json, job.check_refs))
+                    self._apply_job_outputs(job_outputs)
+                    self._record_completed(
+                        job.completed_check_refs(self.qa_json))
+                    self._record_telemetry(
+                        job.check_tool,
+                        job.check_refs,
+                        work_queue.telemetry(status.id)
+                    )
+                    self._qajson_update_callback(job.check_refs)
+                elif status.status == JOB_FAILED and self.continue_on_error:
+                    pending.remove(status.id)
+                    self._fail_job(job, work_queue.error(status.id))
+                elif status.status == JOB_FAILED:
+                    # same as the sequential run, an error in any check tool
+                    # stops all remaining checks
+                    pending.remove(status.id)
+                    failed = True
+                    logger.error(
+                        f"Failed to run check {job.check_tool.description}: "
+                        f"{work_queue.error(status.id)}")
+            if failed:
+                work_queue.cancel(run_id)
+                break
+            if len(pending) == 0:
+                retry_jobs = self._retry_jobs(len(jobs))
+                jobs.extend(retry_jobs)
+                for job in retry_jobs:
+                    submit(job)
+            if len(pending) > 0:
+                time.sleep(poll_interval)
+
+        work_queue.remove_run(run_id)
+        work_queue.close()
+
+        if timed_out:
+            self.stopped = True
+            self._set_status("Stopped")
+        elif failed:
+            self._set_status("Error")
+            self.stopped = True
+            self._progress_callback(None, 0.0)
+        elif self.is_stopped():
+            self._set_status("Stopped")
+        else:
+            self._set_status("Complete")
+            self._progress_callback(None, 1.0)
+        self._checks_complete()
+
+    def _run_sequential(self):
+        self._set_status("Running")
+        self.stopped = False
+        self.current_check_number = 1
+        for check_tool in self._order_check_tools():
             if self.is_stopped():
                 self._set_status("Stopped")
                 self._checks_complete()
@@ -78,15 +1253,33 @@ class CheckExecutor():
 
             check_tool.options = self.options
 
+            if not self._restores_checks:
+                qa_json = self.qa_json
+                check_refs = get_check_refs(self.qa_json, check_tool)
+            else:
+                # only the checks that could not be restored are given to the
+                # check tool. The sub qajson shares its check objects with
+                # self.qa_json, so no merging is needed.
+                check_refs = self._restore_checks(
+                    get_check_refs(self.qa_json, check_tool))
+                if len(check_refs) == 0:
+                    # every check was restored, nothing left to run
+                    self._progress_callback(check_tool, 1.0)
+                    self._increment_check_number()
+                    continue
+                qa_json = build_sub_qajson(self.qa_json, check_refs)
+
+            job = CheckJob(0, check_tool, check_refs)
+            job.record_initial_outputs(self.qa_json)
             try:
-                check_tool.run(
-                    self.qa_json,
-                    self._progress_callback,
-                    self._qajson_update_callback,
-                    self.is_stopped
-                )
+                self._run_check_tool(job, qa_json)
                 self._increment_check_number()
             except Exception as ex:
+                if self.continue_on_error:
+                    logger.error(ex, exc_info=True)
+                    self._fail_job(job, str(ex))
+                    self._increment_check_number()
+                    continue
                 # catch all exceptions a check may throw and stop running checks
                 # ideally checks would catch errors before this point
                 self._set_status("Error")
@@ -97,6 +1290,8 @@ class CheckExecutor():
                 self._checks_complete()
                 return
 
+        self._retry_sequential()
+
         if self.is_stopped():
             self._set_status("Stopped")
         else:
@@ -104,6 +1299,58 @@ class CheckExecutor():
             self._progress_callback(None, 1.0)
         self._checks_complete()
 
+    def _run_check_tool(self, job: CheckJob, qa_json: QajsonRoot) -> None:
+        """ Runs the check tool of a job in this process, recording the time
+        taken and resources used. `qa_json` is either self.qa_json, or a sub
+        qajson that shares its check objects with it. Exceptions raised by
+        the check tool are passed on.
+        """
+        def qajson_update_callback():
+            # checks that have not been run yet may still have the completed
+            # outputs of a previous run
+            self._record_completed(job.completed_check_refs(self.qa_json))
+            self._qajson_update_callback()
+
+        job.started_at = time.monotonic()
+        monitor = ResourceMonitor()
+        monitor.start()
+        try:
+            job.check_tool.run(
+                qa_json,
+                self._progress_callback,
+                qajson_update_callback,
+                self.is_stopped
+            )
+        finally:
+            telemetry = monitor.stop()
+        self._record_telemetry(job.check_tool, job.check_refs, telemetry)
+        # check tools may not report their last changes (and the telemetry
+        # may have been added to the outputs)
+        self._qajson_update_callback(job.check_refs)
+        if not self.is_stopped():
+            # checks that were stopped early would skew the history
+            self._record_duration(
+                job.check_refs, time.monotonic() - job.started_at)
+        self._record_completed(job.completed_check_refs(self.qa_json))
+
+    def _retry_sequential(self) -> None:
+        """ Runs the retry jobs of a sequential run """
+        for job in self._retry_jobs(0):
+            if self.is_stopped():
+                return
+            self._check_tool_started(
+                job.check_tool,
+                self.current_check_number,
+                len(self.check_tools)
+            )
+            try:
+                # shares its check objects with self.qa_json
+                self._run_check_tool(
+                    job, build_sub_qajson(self.qa_json, job.check_refs))
+            except Exception as ex:
+                logger.error(ex, exc_info=True)
+                self._fail_job(job, str(ex))
+
     def is_stopped(self) -> bool:
         return self.stopped
 
@@ -129,6 +1376,13 @@ class ProgressQueueItem:
     def __str__(self):
         return f"ProgressQueueItem ({self.check_tool_class_name}, {self.progress})"
 
+    def to_dict(self) -> Dict:
+        return {
+            'type': 'progress',
+            'check_tool': self.check_tool_class_name,
+            'progress': self.progress,
+        }
+
 
 class CheckToolStartedQueueItem:
 
@@ -147,6 +1401,14 @@ class CheckToolStartedQueueItem:
             f"{self.check_number}/{self.total_check_count})"
         )
 
+    def to_dict(self) -> Dict:
+        return {
+            'type': 'check_tool_started',
+            'check_tool': self.check_tool_class_name,
+            'check_number': self.check_number,
+            'total_check_count': self.total_check_count,
+        }
+
 
 class StatusQueueItem:
 
@@ -156,6 +1418,9 @@ class StatusQueueItem:
     def __str__(self):
         return f"StatusQueueItem ({self.status})"
 
+    def to_dict(self) -> Dict:
+        return {'type': 'status', 'status': self.status}
+
 
 class QajsonChangedQueueItem:
 
@@ -165,6 +1430,38 @@ class QajsonChangedQueueItem:
     def __str__(self):
         return f"QajsonChangedQueueItem"
 
+    def to_dict(self) -> Dict:
+        return {'type': 'qajson_changed'}
+
+
+class QajsonPatchQueueItem:
+    """ Includes only the outputs of the checks that have changed, rather than
+    the whole QajsonRoot. Each check is identified by its data level and index
+    within that data level.
+    """
+
+    def __init__(self, check_outputs: List[Tuple[CheckRef, QajsonOutputs]]):
+        self.check_outputs = check_outputs
+
+    def apply(self, qajson: QajsonRoot) -> None:
+        """ Updates the qajson in place with the outputs of this patch
+        """
+        apply_check_outputs(qajson, self.check_outputs)
+
+    def __str__(self):
+        return f"QajsonPatchQueueItem ({len(self.check_outputs)} checks)"
+
+    def to_dict(self) -> Dict:
+        """ Summary of the patch, the outputs themselves are not included """
+        checks = []
+        for (data_level, index), outputs in self.check_outputs:
+            status = None
+            if outputs is not None and outputs.execution is not None:
+                status = outputs.execution.status
+            checks.append(
+                {'data_level': data_level, 'index': index, 'status': status})
+        return {'type': 'checks_updated', 'checks': checks}
+
 
 class ChecksCompleteQueueItem:
     """ There's no information to pass back when the checks have completed, this
@@ -175,49 +1472,749 @@ class ChecksCompleteQueueItem:
     def __str__(self):
         return "ChecksCompleteQueueItem"
 
+    def to_dict(self) -> Dict:
+        return {'type': 'checks_complete'}
 
-class MultiprocessCheckExecutor(mp.Process, CheckExecutor):
-    ''' Implementation of multiprocessing Process class for the QAX CheckExecutor.
-    Allows the checks to be processed in a background thread (to keep UI
-    responsive). Communication with parent thread is handled by the Queue object
-    passed into __init__
-    '''
+
+class JobStartedQueueItem:
+    """ Sent from a worker process when it starts running a CheckJob
+    """
+
+    def __init__(self, job_id: int):
+        self.job_id = job_id
+
+    def __str__(self):
+        return f"JobStartedQueueItem ({self.job_id})"
+
+
+class JobProgressQueueItem:
+    """ Sent from a worker process as the check tool of a CheckJob reports
+    progress
+    """
+
+    def __init__(self, job_id: int, progress: float):
+        self.job_id = job_id
+        self.progress = progress
+
+    def __str__(self):
+        return f"JobProgressQueueItem ({self.job_id}, {self.progress})"
+
+
+class JobOutputsQueueItem:
+    """ Sent from a worker process when the check tool of a CheckJob reports
+    it has updated the outputs of some of its checks (before the job has
+    finished). Only the outputs of the checks that changed are included.
+    """
+
+    def __init__(
+            self,
+            job_id: int,
+            outputs: List[Tuple[CheckRef, QajsonOutputs]]):
+        self.job_id = job_id
+        self.outputs = outputs
+
+    def __str__(self):
+        return f"JobOutputsQueueItem ({self.job_id}, {len(self.outputs)} checks)"
+
+
+class JobResultQueueItem:
+    """ Sent from a worker process when it has finished running a CheckJob.
+    Includes either the outputs of the checks the job changed, or the error
+    message if the check tool raised an exception.
+    """
+
+    def __init__(
+            self,
+            job_id: int,
+            outputs: Optional[List[Tuple[CheckRef, QajsonOutputs]]] = None,
+            error: Optional[str] = None,
+            telemetry: Optional[CheckTelemetry] = None):
+        self.job_id = job_id
+        self.outputs = outputs
+        self.error = error
+        self.telemetry = telemetry
+
+    def __str__(self):
+        return f"JobResultQueueItem ({self.job_id}, {self.error})"
+
+
+# state of the worker process, set when the worker process is initialised
+_worker_event_queue = None
+_worker_stop_event = None
+
+
+def _preload_plugin(plugin_class: str) -> None:
+    """ Imports the module of a check tool plugin class (eg;
+    `mate.qax.plugin.MateQaxPlugin`) so that the first job run by a worker
+    does not include the time taken to import the plugin and its
+    dependencies (eg; GDAL).
+    """
+    module_name = plugin_class.rsplit('.', 1)[0]
+    try:
+        importlib.import_module(module_name)
+    except Exception as ex:
+        # the error is raised again (and reported) if a job needs the plugin
+        logger.debug(f"Could not preload plugin module {module_name}: {ex}")
+
+
+def _initialise_worker(
+        event_queue: mp.Queue,
+        stop_event: mp.Event,
+        preload: List[str]) -> None:
+    """ Initialises a worker process of the CheckExecutor pool. Log records
+    are forwarded to the executor process through the event queue.
+    """
+    global _worker_event_queue, _worker_stop_event
+    _worker_event_queue = event_queue
+    _worker_stop_event = stop_event
+
+    root = logging.getLogger()
+    root.handlers = [logging.handlers.QueueHandler(event_queue)]
+
+    for plugin_class in preload:
+        _preload_plugin(plugin_class)
+
+
+def _run_job(
+        job: CheckJob,
+        sub_qa_json: QajsonRoot
+) -> List[Tuple[CheckRef, QajsonOutputs]]:
+    """ Runs the check tool of a CheckJob within a worker process, and
+    returns the outputs of the checks the check tool changed.
+    """
+    _worker_event_queue.put(JobStartedQueueItem(job.job_id))
+    change_tracker = QajsonChangeTracker(sub_qa_json)
+    # outputs of checks the check tool doesn't change are not returned, so
+    # the outputs of a previous run aren't mistaken for those of this job
+    job_change_tracker = QajsonChangeTracker(sub_qa_json)
+    # reference to each check in the executor's qa_json
+    check_refs = dict(zip(get_sub_check_refs(job.check_refs), job.check_refs))
+
+    def progress_callback(check_tool, progress):
+        _worker_event_queue.put(JobProgressQueueItem(job.job_id, progress))
+
+    def qajson_update_callback():
+        changed = change_tracker.changed_check_refs(sub_qa_json)
+        if len(changed) == 0:
+            return
+        outputs = []
+        for sub_check_ref in changed:
+            check_outputs = get_check(sub_qa_json, sub_check_ref).outputs
+            if check_outputs is not None:
+                # the queue pickles items in a background thread, so the
+                # outputs are copied in case the check tool keeps changing
+                # them in place
+                check_outputs = copy.copy(check_outputs)
+                if isinstance(check_outputs.data, dict):
+                    check_outputs.data = dict(check_outputs.data)
+            outputs.append((check_refs[sub_check_ref], check_outputs))
+        _worker_event_queue.put(JobOutputsQueueItem(job.job_id, outputs))
+
+    def is_stopped() -> bool:
+        return _worker_stop_event.is_set()
+
+    job.check_tool.run(
+        sub_qa_json,
+        progress_callback,
+        qajson_update_callback,
+        is_stopped
+    )
+    changed = set(job_change_tracker.changed_check_refs(sub_qa_json))
+    return [
+        (check_ref, outputs)
+        for (check_ref, outputs), sub_check_ref in zip(
+            get_sub_qajson_outputs(sub_qa_json, job.check_refs),
+            get_sub_check_refs(job.check_refs))
+        if sub_check_ref in changed
+    ]
+
+
+def _worker_main(
+        job_queue: mp.Queue,
+        event_queue: mp.Queue,
+        stop_event: mp.Event,
+        preload: List[str]) -> None:
+    """ Main function of a worker process, runs jobs from the job queue until
+    None is received.
+    """
+    _initialise_worker(event_queue, stop_event, preload)
+    while True:
+        item = job_queue.get()
+        if item is None:
+            return
+        job, sub_qa_json = item
+        monitor = ResourceMonitor()
+        monitor.start()
+        try:
+            outputs = _run_job(job, sub_qa_json)
+        except Exception as ex:
+            monitor.stop()
+            logger.error(ex, exc_info=True)
+            event_queue.put(JobResultQueueItem(job.job_id, error=str(ex)))
+            continue
+        event_queue.put(JobResultQueueItem(
+            job.job_id, outputs=outputs, telemetry=monitor.stop()))
+
+
+# number of seconds running jobs are given to respond to a stop request
+# before their worker process is terminated
+STOP_GRACE_PERIOD = 10.0
+
+# default number of jobs a worker process runs before it is replaced
+DEFAULT_MAX_JOBS_PER_WORKER = 50
+
+
+class WorkerProcess():
+    """ A worker process of the WorkerPool, runs one job at a time. Each
+    worker has its own job queue so the job a worker is running is always
+    known, allowing the worker to be terminated if the job hangs.
+    """
+
+    def __init__(
+            self,
+            event_queue: mp.Queue,
+            stop_event: mp.Event,
+            preload: Optional[List[str]] = None):
+        self.job_queue = mp.Queue()
+        self.process = mp.Process(
+            target=_worker_main,
+            args=(
+                self.job_queue,
+                event_queue,
+                stop_event,
+                [] if preload is None else preload
+            )
+        )
+        self.process.start()
+        self.job: Optional[CheckJob] = None
+        self.deadline: Optional[float] = None
+        # number of jobs this worker has finished
+        self.jobs_run = 0
+
+    @property
+    def is_idle(self) -> bool:
+        return self.job is None
+
+    def is_alive(self) -> bool:
+        return self.process.is_alive()
+
+    def submit(
+            self,
+            job: CheckJob,
+            sub_qa_json: QajsonRoot,
+            deadline: Optional[float]) -> None:
+        self.job = job
+        self.deadline = deadline
+        self.job_queue.put((job, sub_qa_json))
+
+    def job_finished(self) -> None:
+        self.job = None
+        self.deadline = None
+        self.jobs_run += 1
+
+    def terminate(self) -> None:
+        # the process may be terminated while holding a lock on the shared
+        # event queue (if it was putting an item on the queue) but this is
+        # very unlikely for a process that has hung within a check tool
+        self.process.terminate()
+        self.process.join()
+        self.job_queue.close()
+
+    def close(self) -> None:
+        if self.process.is_alive():
+            self.job_queue.put(None)
+            self.process.join(STOP_GRACE_PERIOD)
+        if self.process.is_alive():
+            self.terminate()
+        else:
+            self.job_queue.close()
+
+
+class WorkerPool():
+    """ Pool of worker processes. Unlike the concurrent.futures process pool,
+    individual workers can be terminated and replaced. Workers are replaced
+    once they have run `max_jobs` jobs (0 to never replace workers), and new
+    workers import the modules of the `preload` plugin classes as they start.
+    """
+
+    def __init__(
+            self,
+            size: int,
+            event_queue: mp.Queue,
+            stop_event: mp.Event,
+            max_jobs: int = DEFAULT_MAX_JOBS_PER_WORKER,
+            preload: Optional[List[str]] = None):
+        self.event_queue = event_queue
+        self.stop_event = stop_event
+        self.max_jobs = max_jobs
+        self.preload = [] if preload is None else preload
+        self.workers: List[WorkerProcess] = []
+        self.resize(size)
+
+    def _start_worker(self) -> WorkerProcess:
+        return WorkerProcess(self.event_queue, self.stop_event, self.preload)
+
+    @property
+    def size(self) -> int:
+        return len(self.workers)
+
+    def resize(self, size: int) -> None:
+        """ Starts or stops workers so the pool has `size` workers. Only idle
+        workers are stopped.
+        """
+        while len(self.workers) < size:
+            self.workers.append(self._start_worker())
+        for worker in self.idle_workers():
+            if len(self.workers) <= size:
+                break
+            self.workers.remove(worker)
+            worker.close()
+
+    def idle_workers(self) -> List[WorkerProcess]:
+        return [w for w in self.workers if w.is_idle]
+
+    def busy_workers(self) -> List[WorkerProcess]:
+        return [w for w in self.workers if not w.is_idle]
+
+    def worker_for_job(self, job_id: int) -> Optional[WorkerProcess]:
+        return next(
+            (
+                w for w in self.workers
+                if w.job is not None and w.job.job_id == job_id
+            ),
+            None
+        )
+
+    def job_finished(self, worker: WorkerProcess) -> None:
+        """ Marks the job of a worker as finished, replacing the worker if it
+        has run the maximum number of jobs.
+        """
+        worker.job_finished()
+        if self.max_jobs > 0 and worker.jobs_run >= self.max_jobs:
+            logger.debug(
+                f"Recycling worker process {worker.process.pid} after "
+                f"{worker.jobs_run} jobs")
+            worker.close()
+            index = self.workers.index(worker)
+            self.workers[index] = self._start_worker()
+
+    def replace(self, worker: WorkerProcess) -> WorkerProcess:
+        """ Terminates a worker and starts a new worker in its place
+        """
+        logger.warning(f"Terminating worker process {worker.process.pid}")
+        worker.terminate()
+        index = self.workers.index(worker)
+        self.workers[index] = self._start_worker()
+        return self.workers[index]
+
+    def close(self) -> None:
+        for worker in self.workers:
+            worker.close()
+
+
+# status values that indicate the executor has finished, these are never
+# coalesced
+TERMINAL_STATUSES = ["Complete", "Error", "Stopped"]
+
+# default maximum number of progress/status events sent per second for each
+# check tool
+DEFAULT_MAX_EVENT_RATE = 10.0
+
+
+class EventCoalescer():
+    """ Limits the rate progress and status queue items are passed to `put`.
+    Items arriving faster than `max_rate` (per check tool) are held, and a held
+    item is replaced (merged) by any newer item for the same check tool. Held
+    items are sent once the rate allows, or before any other item is sent so
+    ordering is maintained. Terminal items (progress of 1.0, end of all checks,
+    and terminal statuses) are always sent immediately.
+
+    Held items are sent when the next item is put, or when `flush_due` is
+    called. Once started, a background thread calls `flush_due` so that held
+    items are not delayed by more than the rate limit when no more items
+    arrive (eg; a check tool that reports progress infrequently).
+
+    Log records are not passed through the coalescer, they are put on the
+    queue directly by the logging handler of the executor process.
+    """
+
+    def __init__(
+            self,
+            put: Callable,
+            max_rate: float = DEFAULT_MAX_EVENT_RATE,
+            clock: Callable = time.monotonic):
+        self._put = put
+        self.min_interval = 0.0 if max_rate <= 0 else 1.0 / max_rate
+        self._clock = clock
+        # key is the check tool class name (or 'status' for status items)
+        self._last_sent: Dict[str, float] = {}
+        self._held: Dict[str, object] = {}
+
+        # counters of how events have been handled
+        self.sent_count = 0
+        # held items that were replaced by a newer item
+        self.merged_count = 0
+        # held items that were discarded as a terminal item was sent
+        self.dropped_count = 0
+
+        # items may be put by the executor and sent by the flush thread
+        self._lock = threading.RLock()
+        self._closed = threading.Event()
+        self._thread = None
+
+    def _key(self, item) -> Optional[str]:
+        """ Gets the key items are rate limited by, None indicates the item
+        is not coalesced
+        """
+        if isinstance(item, ProgressQueueItem):
+            if item.check_tool_class_name is None or item.progress >= 1.0:
+                return None
+            return item.check_tool_class_name
+        elif isinstance(item, StatusQueueItem):
+            if item.status in TERMINAL_STATUSES:
+                return None
+            return 'status'
+        return None
+
+    def _send(self, key: Optional[str], item) -> None:
+        if key is not None:
+            self._last_sent[key] = self._clock()
+        self.sent_count += 1
+        self._put(item)
+
+    def flush_due(self) -> None:
+        """ Sends held items that are now allowed by the rate limit
+        """
+        with self._lock:
+            now = self._clock()
+            for key in list(self._held.keys()):
+                if now - self._last_sent.get(key, 0.0) >= self.min_interval:
+                    self._send(key, self._held.pop(key))
+
+    def flush(self) -> None:
+        """ Sends all held items
+        """
+        with self._lock:
+            for key in list(self._held.keys()):
+                self._send(key, self._held.pop(key))
+
+    def _flush_due_items(self) -> None:
+        while not self._closed.wait(self.min_interval):
+            self.flush_due()
+
+    def start(self) -> None:
+        """ Starts the thread that sends held items once they are due """
+        if self.min_interval <= 0 or self._thread is not None:
+            # items are never held
+            return
+        self._closed.clear()
+        self._thread = threading.Thread(
+            target=self._flush_due_items, daemon=True)
+        self._thread.start()
+
+    def close(self) -> None:
+        """ Stops the flush thread, and sends all held items """
+        self._closed.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        self.flush()
+
+    def put(self, item) -> None:
+        with self._lock:
+            self._put_item(item)
+
+    def _put_item(self, item) -> None:
+        key = self._key(item)
+        if key is None:
+            if isinstance(item, (ProgressQueueItem, StatusQueueItem)):
+                # terminal item supersedes anything held for the same source
+                held_key = (
+                    'status' if isinstance(item, StatusQueueItem)
+                    else item.check_tool_class_name
+                )
+                if held_key in self._held:
+                    del self._held[held_key]
+                    self.dropped_count += 1
+            self.flush()
+            self._send(None, item)
+            return
+
+        self.flush_due()
+        now = self._clock()
+        if key in self._held:
+            self.merged_count += 1
+            self._held[key] = item
+        elif (
+            key not in self._last_sent or
+            now - self._last_sent[key] >= self.min_interval
+        ):
+            self._send(key, item)
+        else:
+            self._held[key] = item
+
+    def __str__(self):
+        return (
+            f"EventCoalescer (sent {self.sent_count}, merged "
+            f"{self.merged_count}, dropped {self.dropped_count})"
+        )
+
+
+# default size (in bytes) above which output payloads are passed via shared
+# memory
+DEFAULT_SHARED_MEMORY_THRESHOLD = 1024 * 1024
+
+# bytes at the start of each shared memory block reserved for the header, the
+# first byte is set by the receiver once it has attached to the block
+SHARED_PAYLOAD_HEADER_SIZE = 64
+
+# seconds the sender waits at the end of a run for the receiver to attach to
+# the shared memory blocks it has created, before they are freed regardless
+SHARED_MEMORY_RELEASE_TIMEOUT = 10.0
+
+
+def _attach_shared_memory(name: str) -> shared_memory.SharedMemory:
+    """ Attaches to an existing shared memory block without the resource
+    tracker of this process taking ownership of it (the block is unlinked by
+    the process that created it).
+    """
+    if sys.version_info >= (3, 13):
+        return shared_memory.SharedMemory(name=name, track=False)
+    shm = shared_memory.SharedMemory(name=name)
+    if os.name != 'nt':
+        # blocks are registered by their name including the leading slash
+        resource_tracker.unregister('/' + shm.name, 'shared_memory')
+    return shm
+
+
+class SharedPayloadHandle():
+    """ Small, pickle'able reference to a payload stored in a shared memory
+    block. Replaces the payload within the `data` of a QajsonOutputs object
+    while it is passed through the queue.
+    """
+
+    def __init__(self, name: str, size: int):
+        """ Constructor
+
+        :param str name: name of the shared memory block
+        :param int size: number of bytes of the block used by the JSON
+            encoded payload, following the header
+        """
+        self.name = name
+        self.size = size
+
+    def __str__(self):
+        return f"SharedPayloadHandle ({self.name}, {self.size})"
+
+
+class SharedMemoryTransport():
+    """ Sender side of the shared memory transport. Large dict and list
+    payloads (eg; the GeoJSON map of a check) included in the `data` of check
+    outputs are encoded as JSON into shared memory blocks and replaced with a
+    SharedPayloadHandle. All other payloads are pickled with the outputs.
+
+    The sender owns the blocks it creates. Blocks are freed once the receiver
+    (SharedPayloadStore) has attached to them, as the receiver can still read
+    the block until it closes it. Blocks the receiver has not attached to are
+    freed by `close` at the end of the run.
+    """
+
+    def __init__(self, threshold: int = DEFAULT_SHARED_MEMORY_THRESHOLD):
+        self.threshold = threshold
+        self._blocks: List[shared_memory.SharedMemory] = []
+
+    def _to_shared_memory(self, payload: bytes) -> shared_memory.SharedMemory:
+        shm = shared_memory.SharedMemory(
+            create=True, size=SHARED_PAYLOAD_HEADER_SIZE + len(payload))
+        shm.buf[:SHARED_PAYLOAD_HEADER_SIZE] = \
+            bytes(SHARED_PAYLOAD_HEADER_SIZE)
+        # the block may be larger than requested (rounded to the page size)
+        shm.buf[
+            SHARED_PAYLOAD_HEADER_SIZE:SHARED_PAYLOAD_HEADER_SIZE + len(payload)
+        ] = payload
+        self._blocks.append(shm)
+        return shm
+
+    def _free(self, shm: shared_memory.SharedMemory) -> None:
+        shm.close()
+        try:
+            shm.unlink()
+        except FileNotFoundError:
+            pass
+
+    def _free_attached(self) -> bool:
+        """ Frees the blocks the receiver has attached to, returns True if
+        all blocks have been freed
+        """
+        attached = [shm for shm in self._blocks if shm.buf[0] != 0]
+        for shm in attached:
+            self._blocks.remove(shm)
+            self._free(shm)
+        return len(self._blocks) == 0
+
+    def close(self, timeout: float = SHARED_MEMORY_RELEASE_TIMEOUT) -> None:
+        """ Frees all blocks created by this transport, waiting up to
+        `timeout` seconds for the receiver to attach to them.
+        """
+        deadline = time.monotonic() + timeout
+        while not self._free_attached() and time.monotonic() < deadline:
+            time.sleep(0.05)
+        if len(self._blocks) > 0:
+            logger.warning(
+                f"Freeing {len(self._blocks)} shared memory blocks that were "
+                "not received")
+        for shm in self._blocks:
+            self._free(shm)
+        self._blocks = []
+
+    def _pack_value(self, value: object) -> object:
+        if not isinstance(value, (dict, list)):
+            return value
+        try:
+            payload = json.dumps(value, separators=(',', ':')).encode('utf-8')
+        except (TypeError, ValueError):
+            # not JSON serialisable, the payload is pickled instead
+            return value
+        if len(payload) <= self.threshold:
+            return value
+        shm = self._to_shared_memory(payload)
+        return SharedPayloadHandle(shm.name, len(payload))
+
+    def pack_outputs(
+            self,
+            outputs: Optional[QajsonOutputs]) -> Optional[QajsonOutputs]:
+        """ Returns a copy of the outputs with large data payloads replaced by
+        handles to shared memory. The outputs passed in are not modified.
+        """
+        if len(self._blocks) > 0:
+            self._free_attached()
+        if (
+            self.threshold <= 0 or
+            outputs is None or
+            not isinstance(outputs.data, dict)
+        ):
+            return outputs
+        packed_data = {
+            key: self._pack_value(value)
+            for key, value in outputs.data.items()
+        }
+        if all(packed_data[key] is outputs.data[key] for key in packed_data):
+            # nothing was moved to shared memory
+            return outputs
+        packed = copy.copy(outputs)
+        packed.data = packed_data
+        return packed
+
+
+class SharedPayloadStore():
+    """ Receiver side of the shared memory transport. Restores payloads from
+    shared memory into check outputs. Payloads are decoded into the same
+    dicts and lists the check tool created, so the outputs can be saved with
+    the rest of the QAJSON. Shared memory blocks are closed once decoded.
+    """
+
+    def _unpack_value(self, value: object) -> object:
+        if not isinstance(value, SharedPayloadHandle):
+            return value
+        try:
+            shm = _attach_shared_memory(value.name)
+        except FileNotFoundError:
+            # the sender freed the block before it was received
+            logger.warning(f"Shared memory payload {value.name} was lost")
+            return None
+        try:
+            # tells the sender the block can be freed
+            shm.buf[0] = 1
+            end = SHARED_PAYLOAD_HEADER_SIZE + value.size
+            with shm.buf[SHARED_PAYLOAD_HEADER_SIZE:end] as payload:
+                return json.loads(str(payload, 'utf-8'))
+        finally:
+            shm.close()
+
+    def unpack_outputs(
+            self,
+            outputs: Optional[QajsonOutputs]) -> Optional[QajsonOutputs]:
+        """ Restores the payloads of outputs packed by SharedMemoryTransport
+        """
+        if outputs is None or not isinstance(outputs.data, dict):
+            return outputs
+        outputs.data = {
+            key: self._unpack_value(value)
+            for key, value in outputs.data.items()
+        }
+        return outputs
+
+    def unpack_patch(self, patch: 'QajsonPatchQueueItem') -> None:
+        patch.check_outputs = [
+            (check_ref, self.unpack_outputs(outputs))
+            for check_ref, outputs in patch.check_outputs
+        ]
+
+
+class QueueCheckExecutor(CheckExecutor):
+    """ CheckExecutor that reports execution status by putting items on a
+    queue, to be read by another process (eg; the GUI). Used by the
+    MultiprocessCheckExecutor and CheckExecutorService.
+    """
 
     def __init__(
             self,
             qa_json: QajsonRoot,
             profile_name: str,
             check_tool_class_names: List[str],
-            queue: mp.Queue):
-        super(MultiprocessCheckExecutor, self).__init__()
+            queue: Optional[mp.Queue] = None,
+            stop_event: Optional[mp.Event] = None):
         CheckExecutor.__init__(
             self,
             qa_json,
             profile_name,
             check_tool_class_names)
         self.queue = queue
-        self.stop_event = mp.Event()
+        self.stop_event = stop_event
+        self.change_tracker = QajsonChangeTracker(qa_json)
+        self.event_coalescer = None
+        self.transport = None
 
-    def _configure_log(self):
-        h = logging.handlers.QueueHandler(self.queue)
-        setup_logging()
+    @property
+    def max_event_rate(self) -> float:
+        if ExecutorOption.max_event_rate in self.options:
+            return self.options[ExecutorOption.max_event_rate]
+        else:
+            return DEFAULT_MAX_EVENT_RATE
 
-        root = logging.getLogger()
-        root.addHandler(h)
+    @property
+    def shared_memory_threshold(self) -> int:
+        if ExecutorOption.shared_memory_threshold in self.options:
+            return self.options[ExecutorOption.shared_memory_threshold]
+        else:
+            return DEFAULT_SHARED_MEMORY_THRESHOLD
+
+    def _put(self, item) -> None:
+        """ Puts an item onto the queue via the event coalescer
+        """
+        self._emit(item)
+        if self.event_coalescer is None:
+            self.queue.put(item)
+        else:
+            self.event_coalescer.put(item)
 
     def run(self):
-        self._configure_log()
-        # seems ugly, but is required
-        # expect this is related to the fact both the Process and CheckExecutor
-        # classes implement a `run` function.
-        CheckExecutor.run(self)
+        self.event_coalescer = EventCoalescer(
+            self.queue.put, self.max_event_rate)
+        self.event_coalescer.start()
+        self.transport = SharedMemoryTransport(self.shared_memory_threshold)
+        try:
+            CheckExecutor.run(self)
+        finally:
+            self.event_coalescer.close()
+            self.transport.close()
 
     def stop(self):
         self._set_status("Stopping")
         self.stop_event.set()
 
     def is_stopped(self) -> bool:
-        return self.stop_event.is_set()
+        return self.stop_event is not None and self.stop_event.is_set()
 
     def _progress_callback(self, check_tool, progress):
         # check_tool is none when all the checks have been completed
@@ -226,12 +2223,22 @@ class MultiprocessCheckExecutor(mp.Process, CheckExecutor):
             if check_tool is None else check_tool.plugin_class
         )
         progress_item = ProgressQueueItem(check_tool_str, progress)
-        self.queue.put(progress_item)
+        self._put(progress_item)
 
-    def _qajson_update_callback(self):
-        self.queue.put(
-            QajsonChangedQueueItem(self.qa_json)
-        )
+    def _qajson_update_callback(self, check_refs: List[CheckRef] = None):
+        if check_refs is None:
+            check_refs = self.change_tracker.changed_check_refs(self.qa_json)
+        if len(check_refs) == 0:
+            return
+        check_outputs = [
+            (
+                check_ref,
+                self.transport.pack_outputs(
+                    get_check(self.qa_json, check_ref).outputs)
+            )
+            for check_ref in check_refs
+        ]
+        self._put(QajsonPatchQueueItem(check_outputs))
 
     def _check_tool_started(self, check_tool, check_number, total_check_count):
         cts_item = CheckToolStartedQueueItem(
@@ -239,11 +2246,128 @@ class MultiprocessCheckExecutor(mp.Process, CheckExecutor):
             check_number,
             total_check_count
         )
-        self.queue.put(cts_item)
+        self._put(cts_item)
 
     def _checks_complete(self):
-        self.queue.put(ChecksCompleteQueueItem())
+        self._put(ChecksCompleteQueueItem())
+        if self.event_coalescer is not None:
+            logger.debug(str(self.event_coalescer))
 
     def _set_status(self, status: str):
         self.status = status
-        self.queue.put(StatusQueueItem(status))
+        self._put(StatusQueueItem(status))
+
+
+class MultiprocessCheckExecutor(mp.Process, QueueCheckExecutor):
+    ''' Implementation of multiprocessing Process class for the QAX CheckExecutor.
+    Allows the checks to be processed in a background thread (to keep UI
+    responsive). Communication with parent thread is handled by the Queue object
+    passed into __init__
+    '''
+
+    def __init__(
+            self,
+            qa_json: QajsonRoot,
+            profile_name: str,
+            check_tool_class_names: List[str],
+            queue: mp.Queue):
+        super(MultiprocessCheckExecutor, self).__init__()
+        QueueCheckExecutor.__init__(
+            self,
+            qa_json,
+            profile_name,
+            check_tool_class_names,
+            queue,
+            mp.Event())
+
+    def _configure_log(self):
+        h = logging.handlers.QueueHandler(self.queue)
+        setup_logging()
+
+        root = logging.getLogger()
+        root.addHandler(h)
+
+    def run(self):
+        self._configure_log()
+        # seems ugly, but is required
+        # expect this is related to the fact both the Process and CheckExecutor
+        # classes implement a `run` function.
+        QueueCheckExecutor.run(self)
+
+
+class RunFinishedQueueItem:
+    """ Sent by the CheckExecutorService once it has finished a run (after
+    the ChecksCompleteQueueItem, and any log records of the run) and is ready
+    for the next run.
+    """
+
+    def __str__(self):
+        return "RunFinishedQueueItem"
+
+
+class CheckExecutorService(mp.Process):
+    """ Long lived process that runs checks for a GUI session. Plugins are
+    only loaded once, and the pool of worker processes is kept warm between
+    runs so that short runs don't include the time taken to start processes
+    and import plugins. Runs are submitted as QueueCheckExecutor instances
+    and report their status on the `queue` given to this service.
+    """
+
+    def __init__(self, queue: mp.Queue):
+        super(CheckExecutorService, self).__init__()
+        self.queue = queue
+        self.requests = mp.Queue()
+        self.stop_event = mp.Event()
+
+    def submit(self, executor: QueueCheckExecutor) -> None:
+        """ Sends an executor to the service process to be run. Only one run
+        is processed at a time, later submissions wait for earlier runs to
+        finish.
+        """
+        # replaced by those of the service, and can't be sent via a queue
+        executor.queue = None
+        executor.stop_event = None
+        self.stop_event.clear()
+        self.requests.put(executor)
+
+    def stop_run(self) -> None:
+        """ Stops the current run """
+        self.queue.put(StatusQueueItem("Stopping"))
+        self.stop_event.set()
+
+    def shutdown(self) -> None:
+        """ Stops the current run (if any), then the service process and the
+        worker processes of its pool.
+        """
+        if self.is_alive():
+            self.stop_event.set()
+            self.requests.put(None)
+            self.join()
+
+    def _configure_log(self):
+        h = logging.handlers.QueueHandler(self.queue)
+        setup_logging()
+
+        root = logging.getLogger()
+        root.addHandler(h)
+
+    def run(self):
+        self._configure_log()
+        worker_pool = WorkerPool(0, mp.Queue(), mp.Event())
+        try:
+            while True:
+                executor = self.requests.get()
+                if executor is None:
+                    return
+                executor.queue = self.queue
+                executor.stop_event = self.stop_event
+                executor.worker_pool = worker_pool
+                try:
+                    executor.run()
+                except Exception as ex:
+                    logger.error(ex, exc_info=True)
+                    self.queue.put(StatusQueueItem("Error"))
+                    self.queue.put(ChecksCompleteQueueItem())
+                self.queue.put(RunFinishedQueueItem())
+        finally:
+            worker_pool.close()
@@ -0,0 +1,135 @@
+""" Checkpoint journal for check execution. The outputs of each check are
+appended to the journal file as the check completes, allowing an interrupted
+run to be resumed without re-running checks that have already completed.
+"""
+from enum import Enum
+from pathlib import Path
+from typing import Dict, Optional
+import hashlib
+import json
+import logging
+import os
+
+from ausseabed.qajson.model import QajsonCheck, QajsonOutputs
+from hyo2.qax.lib.check_options import CheckOption
+
+logger = logging.getLogger(__name__)
+
+
+def file_fingerprint(path: str) -> Dict:
+    """ Gets a description of a file that will change if the file is modified.
+    Based on the file size and modification time so it's cheap to calculate
+    for large files.
+    """
+    try:
+        stat = os.stat(path)
+    except OSError:
+        # file may not exist (eg; the check will fail), so the path alone is
+        # used.
+        return {'path': path}
+    return {
+        'path': path,
+        'size': stat.st_size,
+        'mtime_ns': stat.st_mtime_ns,
+    }
+
+
+def _option_value(value: object) -> object:
+    if isinstance(value, Enum):
+        return value.value
+    return value
+
+
+def check_fingerprint(check: QajsonCheck, options: Dict = None) -> str:
+    """ Generates a key for the check that includes the check id and version,
+    the fingerprint of all input files, the input parameter values and the
+    options passed to the check tool. Checks with the same fingerprint are
+    expected to generate the same outputs.
+    """
+    files = []
+    params = []
+    if check.inputs is not None:
+        files = [file_fingerprint(f.path) for f in check.inputs.files]
+        params = [[p.name, p.value] for p in check.inputs.params]
+
+    check_options = {}
+    if options is not None:
+        # only include options that are passed to (and may change the outputs
+        # of) the check tool.
+        check_options = {
+            k.value: _option_value(v)
+            for k, v in options.items()
+            if isinstance(k, CheckOption)
+        }
+
+    description = {
+        'id': check.info.id,
+        'version': check.info.version,
+        'files': files,
+        'params': params,
+        'options': check_options,
+    }
+    encoded = json.dumps(description, sort_keys=True, default=str)
+    return hashlib.sha256(encoded.encode('utf-8')).hexdigest()
+
+
+class CheckJournal():
+    """ Append only journal of completed check outputs, stored as JSON lines.
+    Each line includes the check fingerprint and the outputs of the check.
+    """
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self._entries: Dict[str, Dict] = {}
+
+    def load(self) -> None:
+        """ Loads existing entries from the journal file. A partially written
+        last line (eg; from a crash) is ignored.
+        """
+        self._entries = {}
+        if not self.path.exists():
+            return
+        with self.path.open() as f:
+            for line in f:
+                line = line.strip()
+                if len(line) == 0:
+                    continue
+                try:
+                    entry = json.loads(line)
+                except json.JSONDecodeError:
+                    logger.warning(f"Skipping invalid entry in {self.path}")
+                    continue
+                self._entries[entry['key']] = entry['outputs']
+        logger.info(f"Loaded {len(self._entries)} entries from {self.path}")
+
+    def clear(self) -> None:
+        """ Removes all entries from the journal
+        """
+        self._entries = {}
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.path.write_text('')
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: str) -> Optional[QajsonOutputs]:
+        """ Gets the outputs recorded for the check fingerprint `key`, or None
+        if there is no entry
+        """
+        outputs_dict = self._entries.get(key)
+        if outputs_dict is None:
+            return None
+        return QajsonOutputs.from_dict(outputs_dict)
+
+    def record(self, key: str, check: QajsonCheck) -> None:
+        """ Records the outputs of a check. Entry is written to disk before
+        this function returns.
+        """
+        outputs_dict = check.outputs.to_dict()
+        self._entries[key] = outputs_dict
+        line = json.dumps(
+            {'key': key, 'check_id': check.info.id, 'outputs': outputs_dict})
+        with self.path.open('a') as f:
+            f.write(line + '\n')
+            f.flush()
+            os.fsync(f.fileno())
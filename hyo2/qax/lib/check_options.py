@@ -8,3 +8,81 @@ class CheckOption(Enum):
 
     gridprocessing_tile_x = 'gridprocessing_tile_x'
     gridprocessing_tile_y = 'gridprocessing_tile_y'
+
+
+class ExecutorOption(Enum):
+    """ Options that change how the CheckExecutor runs the check tools. These
+    are included in the same options dictionary as the CheckOption values, but
+    are only read by the executor.
+    """
+    # number of worker processes check tools are run on. A value of 1 (or
+    # less) runs all check tools sequentially within the executor process.
+    workers = 'workers'
+    # when True the checks of each check tool are split into a separate job
+    # for each group of input files, allowing a single check tool to be run
+    # across multiple workers
+    split_by_file_group = 'split_by_file_group'
+    # maximum number of progress and status events per second, per check
+    # tool, sent from the executor process. Terminal events are always sent.
+    max_event_rate = 'max_event_rate'
+    # dict and list payloads (eg; GeoJSON maps) within check outputs `data`
+    # that are larger than this number of bytes once encoded as JSON are
+    # passed from the executor process via shared memory. A value of 0
+    # disables the use of shared memory.
+    shared_memory_threshold = 'shared_memory_threshold'
+    # path to a checkpoint journal file. When set, the outputs of each check
+    # are recorded to this file as the check completes.
+    checkpoint_file = 'checkpoint_file'
+    # when True checks with outputs in the checkpoint journal (and unchanged
+    # inputs and parameters) are restored from the journal rather than run
+    resume = 'resume'
+    # folder of the persistent check output cache. When set, the outputs of
+    # checks with unchanged inputs, parameters and version are restored from
+    # the cache rather than run.
+    cache_folder = 'cache_folder'
+    # maximum size of the check output cache in bytes
+    cache_max_size = 'cache_max_size'
+    # path to a work queue database shared with worker daemons (qax-worker).
+    # When set, the executor acts as a coordinator and jobs are run by the
+    # workers, which may be on other hosts.
+    work_queue = 'work_queue'
+    # wall clock time budget, in seconds, for each check. A job that includes
+    # several checks has a budget of this value multiplied by the number of
+    # checks. The worker process running a job that exceeds its budget is
+    # terminated and replaced, and the checks are marked as aborted.
+    check_timeout = 'check_timeout'
+    # wall clock time budget, in seconds, for the whole run. Once exceeded all
+    # remaining checks are aborted.
+    run_timeout = 'run_timeout'
+    # fraction of the memory available on this host that running jobs are
+    # expected to use. Jobs are queued (rather than started) if their
+    # estimated memory use would exceed this. A value of 0 disables the limit.
+    memory_fraction = 'memory_fraction'
+    # order jobs are started in, one of the SchedulingPolicy values (fifo,
+    # sjf or arbitrary)
+    scheduling_policy = 'scheduling_policy'
+    # path to the throughput history file used to predict check durations
+    # for the shortest job first policy. History is updated after each run.
+    throughput_history = 'throughput_history'
+    # path to a JSON lines file the resource use (wall time, CPU time, peak
+    # memory and bytes read) of each check is appended to
+    telemetry_file = 'telemetry_file'
+    # when True the resource use of each check is also included in the
+    # `telemetry` entry of the check's outputs data
+    telemetry_in_outputs = 'telemetry_in_outputs'
+    # number of jobs a worker process runs before it is replaced by a new
+    # process, limits the memory leaked by check tools. A value of 0 means
+    # workers are never replaced.
+    max_jobs_per_worker = 'max_jobs_per_worker'
+    # when True an error raised by a check tool marks its checks as failed
+    # and the remaining checks continue to run. By default an error stops
+    # the run.
+    continue_on_error = 'continue_on_error'
+    # when True (and continue_on_error is set) checks that failed are run
+    # again, once all other checks have completed, with a reduced grid
+    # processing tile size
+    retry_failed = 'retry_failed'
+    # file, or TCP socket (tcp://host:port), a JSON lines stream of the
+    # executor events (progress, status, check outputs updated and log
+    # records) is written to
+    event_stream = 'event_stream'
@@ -0,0 +1,288 @@
+""" Structured stream of check executor events. Events (progress, status,
+check tools started, check outputs updated and log records) are written as
+timestamped JSON lines to a file or socket, for monitoring long batch runs.
+The stream can be summarised (eg; throughput and ETA) while it is written.
+"""
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, TextIO, Tuple
+import json
+import logging
+import queue
+import socket
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+# maximum number of events held in memory waiting to be written, events are
+# dropped (and counted) rather than slowing down the checks
+EVENT_BUFFER_SIZE = 10000
+
+# seconds between writes of the buffered events
+FLUSH_INTERVAL = 0.5
+
+# prefix of event stream targets that are a TCP socket (eg; tcp://host:9000)
+# rather than a file
+TCP_PREFIX = 'tcp://'
+
+
+class RunStartedEvent():
+    """ Sent once at the start of a run, includes the number of checks that
+    will be run so that progress can be calculated from the stream.
+    """
+
+    def __init__(self, check_count: int, check_tool_count: int):
+        self.check_count = check_count
+        self.check_tool_count = check_tool_count
+
+    def to_dict(self) -> Dict:
+        return {
+            'type': 'run_started',
+            'check_count': self.check_count,
+            'check_tool_count': self.check_tool_count,
+        }
+
+
+def event_to_dict(event: object) -> Dict:
+    """ Converts an executor event (queue item or log record) to the dict
+    written to the event stream
+    """
+    if isinstance(event, logging.LogRecord):
+        return {
+            'type': 'log',
+            'level': event.levelname,
+            'logger': event.name,
+            'message': event.getMessage(),
+        }
+    if hasattr(event, 'to_dict'):
+        return event.to_dict()
+    return {'type': type(event).__name__}
+
+
+def _open_target(target: str) -> TextIO:
+    """ Opens the file, or connects to the socket, events are written to """
+    if target.startswith(TCP_PREFIX):
+        host, port = target[len(TCP_PREFIX):].rsplit(':', 1)
+        connection = socket.create_connection((host, int(port)))
+        return connection.makefile('w', encoding='utf-8')
+    path = Path(target)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    return path.open('a', encoding='utf-8')
+
+
+class EventSink():
+    """ Writes executor events to a file, or TCP socket (`tcp://host:port`),
+    as JSON lines. Events are buffered and written by a background thread so
+    that `put` never blocks the caller. If the buffer is full events are
+    dropped rather than slowing down the checks.
+    """
+
+    def __init__(self, target: str, buffer_size: int = EVENT_BUFFER_SIZE):
+        self.target = target
+        self._events = queue.Queue(maxsize=buffer_size)
+        self._closed = threading.Event()
+        # number of events not written as the buffer was full
+        self.dropped_count = 0
+        self.written_count = 0
+        self._stream = _open_target(target)
+        self._thread = threading.Thread(target=self._write_events, daemon=True)
+        self._thread.start()
+
+    def put(self, event: object) -> None:
+        """ Adds an event to the stream. The event is timestamped now, but
+        only converted and written later.
+        """
+        if self._closed.is_set():
+            return
+        try:
+            self._events.put_nowait((time.time(), event))
+        except queue.Full:
+            self.dropped_count += 1
+
+    def _get_pending(self) -> List[Tuple[float, object]]:
+        pending = []
+        try:
+            while True:
+                pending.append(self._events.get_nowait())
+        except queue.Empty:
+            pass
+        return pending
+
+    def _write(self, pending: List[Tuple[float, object]]) -> None:
+        lines = []
+        for timestamp, event in pending:
+            try:
+                data = event_to_dict(event)
+            except Exception as ex:
+                # an event that can't be converted must not stop the stream
+                data = {'type': 'invalid', 'error': str(ex)}
+            data['timestamp'] = datetime.fromtimestamp(timestamp).isoformat()
+            lines.append(json.dumps(data, default=str) + '\n')
+        self._stream.write(''.join(lines))
+        self._stream.flush()
+        self.written_count += len(lines)
+
+    def _write_events(self) -> None:
+        while True:
+            closed = self._closed.wait(FLUSH_INTERVAL)
+            pending = self._get_pending()
+            try:
+                if len(pending) > 0:
+                    self._write(pending)
+            except OSError as ex:
+                # eg; the socket was closed by the reader
+                logger.warning(f"Event stream {self.target} failed: {ex}")
+                self._closed.set()
+                return
+            if closed:
+                return
+
+    def close(self) -> None:
+        """ Writes any buffered events and closes the stream """
+        self._closed.set()
+        self._thread.join()
+        try:
+            self._stream.close()
+        except OSError:
+            pass
+        if self.dropped_count > 0:
+            logger.warning(
+                f"Event stream {self.target} dropped {self.dropped_count} "
+                "events")
+
+
+class EventSinkHandler(logging.Handler):
+    """ Logging handler that adds log records to an event sink """
+
+    def __init__(self, sink: EventSink, level=logging.NOTSET):
+        super(EventSinkHandler, self).__init__(level)
+        self.sink = sink
+
+    def emit(self, record: logging.LogRecord) -> None:
+        self.sink.put(record)
+
+
+def read_events(stream: TextIO, follow: bool = False) -> Iterator[Dict]:
+    """ Reads the events of an event stream. If `follow` is set the stream is
+    read as it is written (like `tail -f`) until a checks_complete event.
+    """
+    buffer = ''
+    while True:
+        line = stream.readline()
+        if line == '':
+            if not follow:
+                return
+            time.sleep(FLUSH_INTERVAL)
+            continue
+        buffer += line
+        if not buffer.endswith('\n'):
+            # partially written line
+            continue
+        try:
+            event = json.loads(buffer)
+        except ValueError:
+            event = None
+        buffer = ''
+        if event is None:
+            continue
+        yield event
+        if follow and event.get('type') == 'checks_complete':
+            return
+
+
+class EventStreamSummary():
+    """ Summary of a run (progress, throughput and ETA) calculated from its
+    event stream
+    """
+
+    def __init__(self):
+        self.status: Optional[str] = None
+        self.check_count: Optional[int] = None
+        self.started_at: Optional[datetime] = None
+        self.last_event_at: Optional[datetime] = None
+        # execution status of each check that has been updated
+        self.check_statuses: Dict[Tuple[str, int], str] = {}
+        self.current_check_tool: Optional[str] = None
+        self.error_count = 0
+        self.warning_count = 0
+
+    def update(self, event: Dict) -> None:
+        timestamp = datetime.fromisoformat(event['timestamp'])
+        if self.started_at is None:
+            self.started_at = timestamp
+        self.last_event_at = timestamp
+
+        event_type = event.get('type')
+        if event_type == 'run_started':
+            self.started_at = timestamp
+            self.check_count = event['check_count']
+            self.check_statuses = {}
+        elif event_type == 'status':
+            self.status = event['status']
+        elif event_type == 'check_tool_started':
+            self.current_check_tool = event['check_tool']
+        elif event_type == 'checks_updated':
+            for check in event['checks']:
+                key = (check['data_level'], check['index'])
+                self.check_statuses[key] = check['status']
+        elif event_type == 'log':
+            if event['level'] in ['ERROR', 'CRITICAL']:
+                self.error_count += 1
+            elif event['level'] == 'WARNING':
+                self.warning_count += 1
+
+    @property
+    def finished_checks(self) -> int:
+        """ Number of checks that have completed, failed or were aborted """
+        return len([
+            s for s in self.check_statuses.values()
+            if s in ['completed', 'failed', 'aborted']
+        ])
+
+    @property
+    def failed_checks(self) -> int:
+        return len([
+            s for s in self.check_statuses.values()
+            if s in ['failed', 'aborted']
+        ])
+
+    @property
+    def elapsed(self) -> float:
+        """ Seconds from the start of the run to the last event """
+        if self.started_at is None:
+            return 0.0
+        return (self.last_event_at - self.started_at).total_seconds()
+
+    @property
+    def throughput(self) -> Optional[float]:
+        """ Checks finished per minute """
+        if self.elapsed <= 0 or self.finished_checks == 0:
+            return None
+        return self.finished_checks / self.elapsed * 60
+
+    @property
+    def eta(self) -> Optional[float]:
+        """ Estimated seconds until all checks have finished, based on the
+        throughput so far
+        """
+        throughput = self.throughput
+        if throughput is None or self.check_count is None:
+            return None
+        remaining = max(self.check_count - self.finished_checks, 0)
+        return remaining / throughput * 60
+
+    def __str__(self):
+        total = '?' if self.check_count is None else self.check_count
+        throughput = (
+            '-' if self.throughput is None
+            else f"{self.throughput:.1f} checks/min"
+        )
+        eta = '-' if self.eta is None else f"{self.eta:.0f}s"
+        return (
+            f"{self.status or 'Not started'}: "
+            f"{self.finished_checks}/{total} checks "
+            f"({self.failed_checks} failed), elapsed {self.elapsed:.0f}s, "
+            f"throughput {throughput}, ETA {eta}, "
+            f"{self.error_count} errors, {self.warning_count} warnings"
+        )
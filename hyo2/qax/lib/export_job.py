@@ -0,0 +1,127 @@
+""" Saves and exports of the QAJSON that can be run in a worker thread (eg;
+so the user interface isn't blocked while a large project is exported).
+"""
+from pathlib import Path
+from typing import Callable, Optional
+import copy
+import logging
+import os
+import threading
+import traceback
+import uuid
+
+from ausseabed.qajson.model import QajsonRoot, QajsonQa
+from hyo2.qax.lib.plugin import QaxProfilePlugins
+from hyo2.qax.lib.qajson_util import QajsonExporter, ExportCancelled
+
+logger = logging.getLogger(__name__)
+
+# minimum change in the fraction completed before progress is reported
+PROGRESS_INTERVAL = 0.01
+
+# data levels that may contain checks
+DATA_LEVELS = ['raw_data', 'survey_products', 'chart_adequacy']
+
+
+def snapshot_qajson(qajson: QajsonRoot) -> QajsonRoot:
+    """ Copies the structure of the QAJSON down to each check, the inputs and
+    outputs of the checks are shared with `qajson`. Check runs (and the user
+    interface) replace the outputs of a check rather than changing them in
+    place, so the snapshot is unaffected by later changes and is cheap enough
+    to take on the user interface thread.
+    """
+    snapshot = QajsonRoot(None)
+    if qajson.qa is None:
+        return snapshot
+    snapshot.qa = QajsonQa(
+        version=qajson.qa.version,
+        raw_data=None,
+        survey_products=None,
+    )
+    for data_level_name in DATA_LEVELS:
+        data_level = qajson.qa.get_data_level(data_level_name)
+        if data_level is None:
+            continue
+        snapshot.qa.get_or_add_data_level(data_level_name).checks = [
+            copy.copy(check) for check in data_level.checks
+        ]
+    return snapshot
+
+
+class ExportJob():
+    """ Exports a snapshot of the QAJSON to a file with the given exporter.
+    The snapshot is taken when the job is created, so the QAJSON may be
+    changed (eg; by a check run) while the job runs in another thread.
+
+    The output is written to a temporary file that replaces `file` once the
+    export is complete, a cancelled or failed export leaves any existing
+    file unchanged.
+    """
+
+    def __init__(
+            self,
+            qajson: QajsonRoot,
+            exporter: QajsonExporter,
+            file: Path,
+            plugins: Optional[QaxProfilePlugins] = None):
+        self.qajson = snapshot_qajson(qajson)
+        self.exporter = exporter
+        self.file = Path(file)
+        self.plugins = plugins
+        self.status = "Not started"
+        # description of the error that stopped the export
+        self.error: Optional[str] = None
+        # fraction of the export completed
+        self.progress = 0.0
+        # called with the fraction completed each time it has increased by
+        # PROGRESS_INTERVAL, from the thread running the job
+        self.progress_callback: Optional[Callable[[float], None]] = None
+        self._cancel_event = threading.Event()
+
+    @property
+    def cancelled(self) -> bool:
+        return self._cancel_event.is_set()
+
+    def cancel(self) -> None:
+        """ Requests the export stops, can be called from any thread. The
+        export stops the next time the exporter reports its progress.
+        """
+        self._cancel_event.set()
+
+    def _set_progress(self, progress: float) -> None:
+        if self.cancelled:
+            raise ExportCancelled()
+        if progress < 1.0 and progress - self.progress < PROGRESS_INTERVAL:
+            return
+        self.progress = progress
+        if self.progress_callback is not None:
+            self.progress_callback(progress)
+
+    def run(self) -> None:
+        """ Runs the export in the calling thread """
+        self.status = "Running"
+        self.exporter.progress_callback = self._set_progress
+        # created by the exporter (rather than tempfile) so that it has the
+        # same permissions as any other file the exporter would write
+        temp_file = self.file.with_name(
+            f".{self.file.name}.{uuid.uuid4().hex}.part")
+        try:
+            self._set_progress(0.0)
+            self.exporter.export(self.qajson, temp_file, self.plugins)
+            # checked again as the exporter may not report its progress at
+            # the end of the export
+            if self.cancelled:
+                raise ExportCancelled()
+            os.replace(temp_file, self.file)
+            self.progress = 1.0
+            self.status = "Complete"
+        except ExportCancelled:
+            self.status = "Cancelled"
+        except Exception as ex:
+            logger.error(traceback.format_exc())
+            self.error = str(ex)
+            self.status = "Error"
+        finally:
+            self.exporter.progress_callback = None
+            if temp_file.exists():
+                temp_file.unlink()
@@ -2,7 +2,6 @@ import logging
 from typing import Optional
 
 from hyo2.qax.app import gui_settings_const
-from hyo2.qax.app.gui_settings import GuiSettings
 
 # for the purposes of logging, these namespaces are the ones
 # we classify as being part of QAX
@@ -33,6 +32,10 @@ def set_logging(
     logging.getLogger("qt").setLevel(qt_logging)
 
 def setup_logging() -> None:
+    # imported here as GuiSettings depends on Qt, and this module is also used
+    # by the headless command line interface
+    from hyo2.qax.app.gui_settings import GuiSettings
+
     log_qax_val = GuiSettings.settings().value(gui_settings_const.logging_qax)
     log_qt_val = GuiSettings.settings().value(gui_settings_const.logging_qt)
     log_other_val = GuiSettings.settings().value(gui_settings_const.logging_other)
@@ -1,10 +1,12 @@
 from pathlib import Path
 from typing import Dict, List, NoReturn, Optional, Callable, Tuple
+import functools
 import importlib
 import re
 
 from hyo2.qax.lib.config import QaxConfig, QaxConfigCheckTool, QaxConfigProfile
 from hyo2.qax.lib.check_options import CheckOption
+from hyo2.qax.lib.plugin_manifest import PluginManifest
 from ausseabed.qajson.model import QajsonRoot, QajsonQa, QajsonDataLevel, \
     QajsonParam, QajsonCheck, QajsonInfo, QajsonGroup, QajsonFile
 from ausseabed.qajson.parser import QajsonParser
@@ -18,6 +20,15 @@ included in the QAX JSON Config file.
 """
 
 
+def file_extensions(file_path: Path) -> List[str]:
+    """ Gets the extensions a file could have, longest first and in lower
+    case. eg; `Line.0001.tar.gz` has the extensions `0001.tar.gz`, `tar.gz`
+    and `gz`, so that file types with multi-part extensions can be matched.
+    """
+    parts = file_path.name.lstrip('.').lower().split('.')
+    return ['.'.join(parts[i:]) for i in range(1, len(parts))]
+
+
 class QaxFileType:
     """
     Represents a file type
@@ -55,18 +66,34 @@ class QaxFileType:
         self.group = group
         self.icon = icon
 
+    def to_dict(self) -> Dict:
+        return {
+            'name': self.name,
+            'extension': self.extension,
+            'group': self.group,
+            'icon': self.icon,
+        }
+
     def formatted_name(self):
         return "{} (*.{})".format(self.name, self.extension)
 
+    @property
+    def extension_key(self) -> str:
+        """ Extension used to match files, lower case and without a leading
+        dot
+        """
+        return self.extension.lstrip('.').lower()
+
     def supports_file(self, file_path: Path, file_group: str) -> bool:
         """ Returns True if the file_path file's extension matches
         `self.extension` and the file_group matches `self.extension`.
+        Extensions are matched ignoring case.
         """
-        extension = file_path.suffix
-        extension = extension.lstrip('.')
+        if file_group != self.group:
+            return False
         return (
-            ((extension == self.extension) or (self.extension == '*')) and
-            file_group == self.group
+            self.extension == '*' or
+            self.extension_key in file_extensions(file_path)
         )
 
     def __repr__(self):
@@ -128,12 +155,19 @@ class QaxFileGroup:
     def matching_file_type(self, path: Path) -> QaxFileType:
         """ Finds a file type with an extension that matched that of the
         given path. None will be returned if no matching file type is found.
+        The file type with the longest matching extension is used.
         """
-        extension = path.suffix
-        extension = extension.lstrip('.')
-        match = next(
-            (ft for ft in self.file_types if ft.extension == extension), None)
-        return match
+        for extension in file_extensions(path):
+            match = next(
+                (
+                    ft for ft in self.file_types
+                    if ft.extension_key == extension
+                ),
+                None
+            )
+            if match is not None:
+                return match
+        return None
 
     def add(self, file_type: QaxFileType) -> NoReturn:
         """ Adds a new file type to this group. Duplicates will not be added.
@@ -159,6 +193,42 @@ class QaxCheckReference():
     include implementation of the check.
     """
 
+    @classmethod
+    def from_dict(cls, data: Dict) -> 'QaxCheckReference':
+        return cls(
+            id=data['id'],
+            name=data['name'],
+            data_level=data['dataLevel'],
+            description=data.get('description'),
+            supported_file_types=[
+                QaxFileType.from_dict(file_type)
+                for file_type in data.get('supportedFileTypes', [])
+            ],
+            default_input_params=[
+                QajsonParam.from_dict(param)
+                for param in data.get('defaultInputParams', [])
+            ],
+            version=data.get('version'),
+            parameter_help_link=data.get('parameterHelpLink')
+        )
+
+    def to_dict(self) -> Dict:
+        return {
+            'id': self.id,
+            'name': self.name,
+            'dataLevel': self.data_level,
+            'description': self.description,
+            'supportedFileTypes': [
+                file_type.to_dict()
+                for file_type in self.supported_file_types
+            ],
+            'defaultInputParams': [
+                param.to_dict() for param in self.default_input_params
+            ],
+            'version': self.version,
+            'parameterHelpLink': self.parameter_help_link,
+        }
+
     def __init__(
             self,
             id: str,
@@ -221,6 +291,11 @@ class QaxCheckToolPlugin():
     """ Check tools must inherit this plugin class
     """
 
+    # when True the plugin is loaded once and the instance shared by all
+    # profiles that include the check tool. Only plugins that keep no state
+    # specific to a profile (or run) should set this to True.
+    shared_instance = False
+
     def __init__(self):
         # name of the check tool
         self.name = 'unknown'
@@ -229,6 +304,8 @@ class QaxCheckToolPlugin():
         self.icon = None
         self.profile = None   # QaxConfigProfile, set when plugin loaded
         self.options = {}
+        # check id -> QaxCheckReference, built from `checks` on first lookup
+        self._check_reference_index = None
 
     @property
     def spatial_outputs_qajson(self) -> bool:
@@ -392,8 +469,20 @@ class QaxCheckToolPlugin():
     def get_check_reference(self, check_id: str) -> QaxCheckReference:
         """ gets a check reference with the given id, if not found return None
         """
-        check = next((cr for cr in self.checks() if cr.id == check_id), None)
-        return check
+        if self._check_reference_index is None:
+            index = {}
+            for check_ref in self.checks():
+                # first check reference with an id is used, as with a scan
+                # of the list
+                index.setdefault(check_ref.id, check_ref)
+            self._check_reference_index = index
+        return self._check_reference_index.get(check_id)
+
+    def clear_check_reference_index(self) -> NoReturn:
+        """ Must be called if the check references returned by `checks`
+        change after the plugin has been loaded.
+        """
+        self._check_reference_index = None
 
     def checks(self) -> List[QaxCheckReference]:
         """ returns a list of checks that are provided by this check tool.
@@ -451,6 +540,26 @@ class QaxCheckToolPlugin():
         """
         raise NotImplementedError("Plugins must implement get_summary_value function")
 
+    def get_summary_values(
+            self,
+            fields: List[Tuple[str, str]],
+            filename: str,
+            qajson: QajsonRoot
+        ) -> Dict[Tuple[str, str], object]:
+        """ Gets the summary values of a file for a list of fields (section
+        name, field name tuples) in one call. Returns a dict of the values
+        keyed by the field tuple.
+
+        Calls `get_summary_value` for each field by default. Plugins should
+        override this if the values of a file are read together (eg; from
+        the same check outputs).
+        """
+        return {
+            (section_name, field_name): self.get_summary_value(
+                section_name, field_name, filename, qajson)
+            for section_name, field_name in fields
+        }
+
     def get_file_details(self, filename: str) -> str:
         """ Gets a description of the file based on how the plugin would describe the
         file. This is presented to the user in the "details" column of the file inputs
@@ -466,6 +575,8 @@ class QaxProfilePlugins():
 
     def __init__(self, plugins: List[QaxCheckToolPlugin]):
         self.plugins = plugins
+        # check id -> plugin that implements the check
+        self._check_index = _build_check_index(plugins)
 
     def update_qa_json_input_params(
             self,
@@ -482,11 +593,22 @@ class QaxProfilePlugins():
             self, check_id: str) -> Optional[QaxCheckToolPlugin]:
         """ Gets the plugin that this check belongs to or return None if not found
         """
-        for plugin in self.plugins:
-            check_ref = plugin.get_check_reference(check_id)
-            if check_ref is not None:
-                return plugin
-        return None
+        match = self._check_index.get(check_id)
+        return None if match is None else match[0]
+
+
+def _build_check_index(
+        plugins: List[QaxCheckToolPlugin]
+) -> Dict[str, Tuple[QaxCheckToolPlugin, QaxCheckReference]]:
+    """ Maps the id of each check to the plugin that implements it, and its
+    check reference. If more than one plugin implements a check the first is
+    used.
+    """
+    index = {}
+    for plugin in plugins:
+        for check_ref in plugin.checks():
+            index.setdefault(check_ref.id, (plugin, check_ref))
+    return index
 
 
 class QaxPluginError(Exception):
@@ -505,6 +627,187 @@ class QaxPluginLoadError(QaxPluginError):
         super().__init__(message)
 
 
+def _validate_plugin_class(check_tool: QaxConfigCheckTool) -> NoReturn:
+    if check_tool.plugin_class is None:
+        raise QaxPluginError(
+            "No pluginClass defined for {}".format(check_tool.name))
+
+    mod_class_bits = check_tool.plugin_class.rsplit('.', 1)
+    if len(mod_class_bits) < 2:
+        raise QaxPluginError(
+            "pluginClass is expected to be a fully qualified class "
+            "name (eg; `qax.hyo2.plugin.myplugin.MyPlugin`). "
+            "{} was provided".format(check_tool.name))
+
+
+def _import_plugin_class(plugin_class: str) -> type:
+    """ Imports the module of a plugin class and returns the class """
+    module_name, class_name = plugin_class.rsplit('.', 1)
+    try:
+        plugin_module = importlib.import_module(module_name)
+    except ModuleNotFoundError as ex:
+        raise QaxPluginLoadError(
+            "Could not load plugin module {}".format(module_name))
+
+    if not hasattr(plugin_module, class_name):
+        raise QaxPluginLoadError(
+            "Could not load plugin class {} (of module {})"
+            .format(class_name, module_name))
+
+    return getattr(plugin_module, class_name)
+
+
+def _apply_check_tool_config(
+        plugin: QaxCheckToolPlugin,
+        profile: QaxConfigProfile,
+        check_tool: QaxConfigCheckTool) -> NoReturn:
+    """ Sets the details of a plugin that are defined by the check tool of a
+    profile in the QAX config
+    """
+    plugin.plugin_class = check_tool.plugin_class
+    plugin.profile = profile
+    if check_tool.icon is not None and len(check_tool.icon) > 0:
+        plugin.icon = check_tool.icon
+    if check_tool.name is not None and len(check_tool.name) > 0:
+        plugin.name = check_tool.name
+    if check_tool.description is not None and len(
+            check_tool.description) > 0:
+        plugin.description = check_tool.description
+
+
+# plugin class -> instance shared by all profiles, see
+# QaxCheckToolPlugin.shared_instance
+_shared_plugin_instances: Dict[str, QaxCheckToolPlugin] = {}
+
+
+def _get_plugin_instance(plugin_class: str) -> QaxCheckToolPlugin:
+    """ Gets the shared instance of a plugin class, or a new instance if the
+    plugin can't be shared. The plugin module is imported if needed.
+    """
+    if plugin_class in _shared_plugin_instances:
+        return _shared_plugin_instances[plugin_class]
+    plugin_instance = _import_plugin_class(plugin_class)()
+    plugin_instance.plugin_class = plugin_class
+    if plugin_instance.shared_instance:
+        _shared_plugin_instances[plugin_class] = plugin_instance
+    return plugin_instance
+
+
+# public methods of QaxCheckToolPlugin that QaxLazyCheckToolPlugin implements
+# itself, rather than passing them to the plugin
+EAGER_METHODS = ['checks', 'run', 'clear_check_reference_index']
+
+# methods of QaxLazyCheckToolPlugin that only need the plugin to be imported
+# if the plugin overrides the QaxCheckToolPlugin implementation. Includes all
+# public methods of QaxCheckToolPlugin, so that any method a plugin overrides
+# is called on the plugin.
+LAZY_METHODS = [
+    name for name, value in vars(QaxCheckToolPlugin).items()
+    if (
+        not name.startswith('_') and
+        callable(value) and
+        name not in EAGER_METHODS
+    )
+]
+
+
+def _manifest_entry(plugin_instance: QaxCheckToolPlugin) -> Dict:
+    """ Metadata of a plugin, as stored in the plugin manifest """
+    return {
+        'name': plugin_instance.name,
+        'description': plugin_instance.description,
+        'icon': plugin_instance.icon,
+        'overrides': [
+            method for method in LAZY_METHODS
+            if (
+                getattr(type(plugin_instance), method) is not
+                getattr(QaxCheckToolPlugin, method)
+            )
+        ],
+        'checks': [
+            check_ref.to_dict() for check_ref in plugin_instance.checks()
+        ],
+    }
+
+
+class QaxLazyCheckToolPlugin(QaxCheckToolPlugin):
+    """ Stands in for a check tool plugin, using the plugin metadata from the
+    plugin manifest. The plugin is imported (and an instance created, or the
+    shared instance used) when it is first run, or when a method that the
+    plugin implements itself is called.
+    """
+
+    def __init__(self, plugin_class: str, entry: Dict):
+        super(QaxLazyCheckToolPlugin, self).__init__()
+        self.plugin_class = plugin_class
+        self.name = entry['name']
+        self.description = entry['description']
+        self.icon = entry['icon']
+        self._overrides = set(entry['overrides'])
+        self._check_references = [
+            QaxCheckReference.from_dict(check_ref)
+            for check_ref in entry['checks']
+        ]
+        self._instance = None
+
+    def __getstate__(self):
+        # the plugin is imported again if needed once unpickled (eg; in a
+        # worker process)
+        state = self.__dict__.copy()
+        state['_instance'] = None
+        return state
+
+    def __getattr__(self, name: str):
+        # only called for attributes not defined by this class, these are
+        # specific to the plugin
+        if name.startswith('_'):
+            raise AttributeError(name)
+        return getattr(self.get_instance(), name)
+
+    @property
+    def is_loaded(self) -> bool:
+        return self._instance is not None
+
+    def get_instance(self) -> QaxCheckToolPlugin:
+        """ Gets the plugin instance, importing the plugin if needed. The
+        details set by the profile and options are copied to the instance
+        as it may be shared with other profiles.
+        """
+        if self._instance is None:
+            self._instance = _get_plugin_instance(self.plugin_class)
+        self._instance.profile = self.profile
+        self._instance.name = self.name
+        self._instance.description = self.description
+        self._instance.icon = self.icon
+        self._instance.options = self.options
+        return self._instance
+
+    def checks(self) -> List[QaxCheckReference]:
+        return self._check_references
+
+    def run(self, *args, **kwargs) -> NoReturn:
+        return self.get_instance().run(*args, **kwargs)
+
+
+def _lazy_method(name: str) -> Callable:
+    """ Builds a method of QaxLazyCheckToolPlugin that calls the plugin
+    instance if the plugin overrides the method, or the QaxCheckToolPlugin
+    implementation otherwise.
+    """
+    base_method = getattr(QaxCheckToolPlugin, name)
+
+    @functools.wraps(base_method)
+    def method(self, *args, **kwargs):
+        if name in self._overrides:
+            return getattr(self.get_instance(), name)(*args, **kwargs)
+        return base_method(self, *args, **kwargs)
+    return method
+
+
+for _method_name in LAZY_METHODS:
+    setattr(QaxLazyCheckToolPlugin, _method_name, _lazy_method(_method_name))
+
+
 class QaxPlugins():
     """ Class manages plugins
     """
@@ -518,6 +821,11 @@ class QaxPlugins():
 
     def __init__(self):
         self.plugins: list[QaxCheckToolPlugin] = []
+        # (profile name, plugin class) -> plugin
+        self._plugin_index: Dict[Tuple[str, str], QaxCheckToolPlugin] = {}
+        # check id -> (plugin, check reference)
+        self._check_index: Dict[
+            str, Tuple[QaxCheckToolPlugin, QaxCheckReference]] = {}
 
     def _load_plugin(
             self,
@@ -527,42 +835,39 @@ class QaxPlugins():
         """ creates an instance of the plugin based on the `plugin_class`
         defined in the QA JSON config for the given `check_tool`
         """
-        if check_tool.plugin_class is None:
-            raise QaxPluginError(
-                "No pluginClass defined for {}".format(check_tool.name))
-
-        mod_class_bits = check_tool.plugin_class.rsplit('.', 1)
-        if len(mod_class_bits) < 2:
-            raise QaxPluginError(
-                "pluginClass is expected to be a fully qualified class "
-                "name (eg; `qax.hyo2.plugin.myplugin.MyPlugin`). "
-                "{} was provided".format(check_tool.name))
-
-        module_name, class_name = mod_class_bits
-        try:
-            plugin_module = importlib.import_module(module_name)
-        except ModuleNotFoundError as ex:
-            raise QaxPluginLoadError(
-                "Could not load plugin module {}".format(module_name))
-
-        if not hasattr(plugin_module, class_name):
-            raise QaxPluginLoadError(
-                "Could not load plugin class {} (of module {})"
-                .format(class_name, module_name))
-
-        plugin_class = getattr(plugin_module, class_name)
+        _validate_plugin_class(check_tool)
+        plugin_class = _import_plugin_class(check_tool.plugin_class)
         plugin_instance = plugin_class()
-        plugin_instance.plugin_class = check_tool.plugin_class
-        plugin_instance.profile = profile
-        if check_tool.icon is not None and len(check_tool.icon) > 0:
-            plugin_instance.icon = check_tool.icon
-        if check_tool.name is not None and len(check_tool.name) > 0:
-            plugin_instance.name = check_tool.name
-        if check_tool.description is not None and len(
-                check_tool.description) > 0:
-            plugin_instance.description = check_tool.description
+        _apply_check_tool_config(plugin_instance, profile, check_tool)
         return plugin_instance
 
+    def _load_lazy_plugin(
+            self,
+            profile: QaxConfigProfile,
+            check_tool: QaxConfigCheckTool,
+            manifest: Optional[PluginManifest],
+            entries: Dict[str, Dict]
+    ) -> 'QaxLazyCheckToolPlugin':
+        """ creates a plugin that is only imported when first run. Its
+        metadata is read from the manifest, or if the plugin isn't in the
+        manifest (or has changed) from the plugin itself. `entries` holds
+        the metadata already read during this load.
+        """
+        _validate_plugin_class(check_tool)
+        plugin_class = check_tool.plugin_class
+        entry = entries.get(plugin_class)
+        if entry is None and manifest is not None:
+            entry = manifest.get(plugin_class)
+        if entry is None:
+            entry = _manifest_entry(_get_plugin_instance(plugin_class))
+            if manifest is not None:
+                manifest.set(plugin_class, entry)
+        entries[plugin_class] = entry
+
+        plugin = QaxLazyCheckToolPlugin(plugin_class, entry)
+        _apply_check_tool_config(plugin, profile, check_tool)
+        return plugin
+
     def get_plugin(
             self,
             profile_name: str,
@@ -572,26 +877,21 @@ class QaxPlugins():
         class name string (as included in QAX config) and the profile name.
         Will return None if no matching plugin found.
         """
-        match = next(
-            (
-                p
-                for p in self.plugins
-                if (
-                    p.plugin_class == check_tool_class and
-                    p.profile.name == profile_name)
-            ),
-            None
-        )
-        return match
+        return self._plugin_index.get((profile_name, check_tool_class))
 
     def get_plugin_for_check(self, check_id: str) -> Optional[QaxCheckToolPlugin]:
         """ Gets the plugin that this check belongs to or return None if not found
         """
-        for plugin in self.plugins:
-            check_ref = plugin.get_check_reference(check_id)
-            if check_ref is not None:
-                return plugin
-        return None
+        match = self._check_index.get(check_id)
+        return None if match is None else match[0]
+
+    def get_check_reference(
+            self, check_id: str) -> Optional[QaxCheckReference]:
+        """ Gets the reference of a check implemented by any of the plugins,
+        or None if not found
+        """
+        match = self._check_index.get(check_id)
+        return None if match is None else match[1]
 
     def get_profile_plugins(
             self, profile: QaxConfigProfile) -> QaxProfilePlugins:
@@ -605,12 +905,39 @@ class QaxPlugins():
             plugins.append(plugin)
         return QaxProfilePlugins(plugins)
 
-    def load(self, config: QaxConfig) -> NoReturn:
-        """ Loads plugins defined in `config`
+    def _build_indexes(self) -> NoReturn:
+        """ Builds the indexes used to look up plugins, must be called
+        whenever `plugins` changes.
         """
+        self._plugin_index = {}
+        for plugin in self.plugins:
+            # first matching plugin is used, as with a scan of the list
+            self._plugin_index.setdefault(
+                (plugin.profile.name, plugin.plugin_class), plugin)
+        self._check_index = _build_check_index(self.plugins)
+
+    def load(
+            self,
+            config: QaxConfig,
+            manifest: Optional[PluginManifest] = None) -> NoReturn:
+        """ Loads plugins defined in `config`, replacing any plugins that
+        were previously loaded. Plugin modules are imported when a plugin is
+        first run, unless their metadata isn't included in the `manifest`
+        (or no manifest is given). Any metadata that was read from the
+        plugins is added to the manifest.
+        """
+        if manifest is not None:
+            manifest.load()
+        plugins = []
+        entries = {}
         for profile in config.profiles:
             for check_tool in profile.check_tools:
-                plugin = self._load_plugin(profile, check_tool)
-                self.plugins.append(plugin)
+                plugin = self._load_lazy_plugin(
+                    profile, check_tool, manifest, entries)
+                plugins.append(plugin)
+        if manifest is not None:
+            manifest.save()
+        self.plugins = plugins
+        self._build_indexes()
 
         QaxPlugins._instance = self
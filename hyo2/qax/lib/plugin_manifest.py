@@ -0,0 +1,172 @@
+""" Cache of check tool plugin metadata (checks, file types, default
+parameters). Allows the user interface to be built without importing the
+plugin modules (and their dependencies, eg; GDAL), plugins are imported when
+first run.
+"""
+from pathlib import Path
+from typing import Dict, Optional
+import functools
+import importlib.metadata
+import importlib.util
+import json
+import logging
+import os
+
+logger = logging.getLogger(__name__)
+
+# incremented when the format of the manifest entries changes, entries of
+# other versions are ignored (and rebuilt)
+MANIFEST_VERSION = 3
+
+
+def _module_file(module_name: str) -> Optional[Path]:
+    """ Finds the source file of a module without importing it, or any of
+    its parent packages. Returns None if the file can't be found (eg; the
+    module is not installed, or is frozen).
+    """
+    parts = module_name.split('.')
+    try:
+        spec = importlib.util.find_spec(parts[0])
+    except (ImportError, ValueError):
+        return None
+    if spec is None:
+        return None
+    module_file = None if spec.origin is None else Path(spec.origin)
+    locations = list(spec.submodule_search_locations or [])
+    for part in parts[1:]:
+        module_file = None
+        package_locations = []
+        for location in locations:
+            package = Path(location, part)
+            if package.joinpath('__init__.py').is_file():
+                module_file = package.joinpath('__init__.py')
+                package_locations = [str(package)]
+                break
+            if Path(location, part + '.py').is_file():
+                module_file = Path(location, part + '.py')
+                break
+            if package.is_dir():
+                # namespace package
+                package_locations.append(str(package))
+        locations = package_locations
+    if module_file is None or not module_file.is_file():
+        return None
+    return module_file
+
+
+@functools.lru_cache()
+def _package_distributions() -> Dict[str, list]:
+    """ Top level package name -> names of the distributions providing it """
+    return importlib.metadata.packages_distributions()
+
+
+def _distribution_version(module_name: str) -> Optional[str]:
+    """ Versions of the installed distributions that provide the top level
+    package of a module (namespace packages may be provided by several), or
+    None if no distribution is found.
+    """
+    top_level = module_name.split('.')[0]
+    versions = []
+    distributions = set(_package_distributions().get(top_level, []))
+    for distribution in sorted(distributions):
+        try:
+            versions.append(
+                f"{distribution}=={importlib.metadata.version(distribution)}")
+        except importlib.metadata.PackageNotFoundError:
+            continue
+    if len(versions) == 0:
+        return None
+    return ','.join(versions)
+
+
+def _app_version() -> Optional[str]:
+    from hyo2.qax import __version__
+    return None if __version__ == 'unknown' else f"hyo2.qax=={__version__}"
+
+
+def module_stamp(plugin_class: str) -> Optional[str]:
+    """ Identifies the version of the module that defines a plugin class,
+    based on the path and modification time of its source file. A manifest
+    entry is only used while the stamp of the plugin module is unchanged.
+
+    If the module has no source file (eg; it is frozen into the QAX
+    executable) the version of the distribution that installed it is used,
+    or if that isn't known the version of QAX the module was bundled with.
+    """
+    module_name = plugin_class.rsplit('.', 1)[0]
+    module_file = _module_file(module_name)
+    if module_file is not None:
+        return (
+            f"{MANIFEST_VERSION}:{module_file}:"
+            f"{os.path.getmtime(module_file)}"
+        )
+    version = _distribution_version(module_name)
+    if version is None:
+        version = _app_version()
+    if version is None:
+        return None
+    return f"{MANIFEST_VERSION}:{module_name}:{version}"
+
+
+class PluginManifest():
+    """ Stores the metadata of each plugin class (identified by its fully
+    qualified class name) in a JSON file.
+    """
+
+    def __init__(self, path: Path):
+        self.path = path
+        # plugin class -> manifest entry
+        self.entries: Dict[str, Dict] = {}
+        self.changed = False
+
+    def load(self) -> None:
+        """ Loads the manifest file, a missing or invalid file is treated as
+        an empty manifest.
+        """
+        self.entries = {}
+        self.changed = False
+        if not self.path.exists():
+            return
+        try:
+            with self.path.open(encoding='utf-8') as file:
+                self.entries = json.load(file)
+        except (OSError, ValueError) as ex:
+            logger.warning(f"Could not read plugin manifest {self.path}: {ex}")
+
+    def save(self) -> None:
+        """ Writes the manifest file if any entries have changed """
+        if not self.changed:
+            return
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            temp_path = self.path.with_name(self.path.name + '.tmp')
+            with temp_path.open('w', encoding='utf-8') as file:
+                json.dump(self.entries, file, indent=2)
+            os.replace(temp_path, self.path)
+            self.changed = False
+        except OSError as ex:
+            # the plugins are imported again on the next start
+            logger.warning(
+                f"Could not write plugin manifest {self.path}: {ex}")
+
+    def get(self, plugin_class: str) -> Optional[Dict]:
+        """ Gets the entry of a plugin class, or None if there is no entry or
+        the plugin module has changed since it was written.
+        """
+        entry = self.entries.get(plugin_class)
+        if entry is None:
+            return None
+        stamp = module_stamp(plugin_class)
+        if stamp is None or entry.get('stamp') != stamp:
+            return None
+        return entry
+
+    def set(self, plugin_class: str, entry: Dict) -> None:
+        stamp = module_stamp(plugin_class)
+        if stamp is None:
+            # entry could never be matched to the module
+            if self.entries.pop(plugin_class, None) is not None:
+                self.changed = True
+            return
+        self.entries[plugin_class] = dict(entry, stamp=stamp)
+        self.changed = True
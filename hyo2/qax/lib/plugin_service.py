@@ -1,22 +1,169 @@
 from pathlib import Path
+from typing import Dict, List, Optional, Tuple
 
-from hyo2.qax.lib.plugin import QaxPlugins, QaxCheckToolPlugin, QaxFileGroup
+from hyo2.qax.lib.plugin import QaxPlugins, QaxCheckToolPlugin, \
+    QaxCheckReference, QaxFileGroup, QaxFileType, file_extensions
 
 """
 Offers plugin related capability as a service that can be injected into
 other classes
 """
+
+
+class FileTypeRegistry:
+    """
+    Index of the file types supported by a list of plugins, built once so
+    that files can be classified without going through every plugin (and
+    its file groups and checks) for each file. Extensions are matched ignoring
+    case, and the longest matching extension is used (eg; `tar.gz` over `gz`).
+    """
+
+    def __init__(self, plugins: list[QaxCheckToolPlugin]) -> None:
+        self.plugins = plugins
+        # all file groups of all plugins, in plugin order
+        self.file_groups: list[QaxFileGroup] = []
+        # extension -> (file group name, file type), in plugin order
+        self._file_types: Dict[str, List[Tuple[str, QaxFileType]]] = {}
+        # extension -> (file group name, check) of the checks supporting it
+        self._checks: Dict[str, List[Tuple[str, QaxCheckReference]]] = {}
+        # file group name -> checks that support all files of the group
+        self._wildcard_checks: Dict[str, List[QaxCheckReference]] = {}
+        # extension -> index of the first plugin with a check supporting it
+        self._plugin_indexes: Dict[str, int] = {}
+        # index of the first plugin with a check supporting any file
+        self._wildcard_plugin_index: Optional[int] = None
+
+        for plugin_index, plugin in enumerate(plugins):
+            self._add_plugin(plugin_index, plugin)
+
+    def _add_plugin(
+            self, plugin_index: int, plugin: QaxCheckToolPlugin) -> None:
+        file_groups = plugin.get_file_groups()
+        self.file_groups.extend(file_groups)
+        for file_group in file_groups:
+            for file_type in file_group.file_types:
+                if file_type.extension == '*':
+                    continue
+                self._file_types.setdefault(file_type.extension_key, []) \
+                    .append((file_group.name, file_type))
+
+        # checks are indexed for all their file types, but only file types
+        # of the plugin's own file groups are used to find the plugin of a file
+        group_names = set([fg.name for fg in file_groups])
+        for check in plugin.checks():
+            for file_type in check.supported_file_types:
+                plugin_file_type = file_type.group in group_names
+                if file_type.extension == '*':
+                    self._wildcard_checks.setdefault(file_type.group, []) \
+                        .append(check)
+                    if plugin_file_type and \
+                            self._wildcard_plugin_index is None:
+                        self._wildcard_plugin_index = plugin_index
+                    continue
+                extension = file_type.extension_key
+                self._checks.setdefault(extension, []) \
+                    .append((file_type.group, check))
+                if plugin_file_type:
+                    self._plugin_indexes.setdefault(extension, plugin_index)
+
+    def _matching_extension(
+            self, filename: str, index: Dict) -> Optional[str]:
+        """ Longest extension of the file that is included in `index` """
+        return next(
+            (e for e in file_extensions(Path(filename)) if e in index),
+            None
+        )
+
+    def file_types(self, filename: str) -> List[Tuple[str, QaxFileType]]:
+        """
+        Gets the file types (and the name of their file group) that match
+        the file's extension
+        """
+        extension = self._matching_extension(filename, self._file_types)
+        if extension is None:
+            return []
+        return self._file_types[extension]
+
+    def file_group(self, filename: str) -> Optional[str]:
+        """
+        Gets the name of the file group of the first file type that matches
+        the file's extension, or None if no file type matches
+        """
+        file_types = self.file_types(filename)
+        if len(file_types) == 0:
+            return None
+        return file_types[0][0]
+
+    def supporting_checks(
+            self,
+            filename: str,
+            file_group: str) -> List[QaxCheckReference]:
+        """
+        Gets the checks that support the file when included in `file_group`
+        """
+        checks = list(self._wildcard_checks.get(file_group, []))
+        for extension in file_extensions(Path(filename)):
+            for group_name, check in self._checks.get(extension, []):
+                if group_name == file_group and check not in checks:
+                    checks.append(check)
+        return checks
+
+    def checks_supporting_files(
+            self,
+            files: List[Tuple[Path, str]]) -> List[QaxCheckReference]:
+        """
+        Gets the checks that support all of the files (path and file group),
+        same as filtering the checks with `QaxCheckReference.supports_files`.
+        The checks supporting each combination of extension and file group
+        are only looked up once, so files of the same type add little cost.
+        """
+        supported: Optional[List[QaxCheckReference]] = None
+        looked_up = set()
+        for file_path, file_group in files:
+            # the supporting checks only depend on the indexed extensions
+            extensions = tuple([
+                e for e in file_extensions(Path(file_path))
+                if e in self._checks
+            ])
+            key = (extensions, file_group)
+            if key in looked_up:
+                continue
+            looked_up.add(key)
+            file_checks = self.supporting_checks(str(file_path), file_group)
+            if supported is None:
+                supported = file_checks
+            else:
+                ids = set([c.id for c in file_checks])
+                supported = [c for c in supported if c.id in ids]
+            if len(supported) == 0:
+                break
+        return [] if supported is None else supported
+
+    def plugin_for_file(self, filename: str) -> Optional[QaxCheckToolPlugin]:
+        """
+        Gets the first plugin that has a check supporting the file, in any
+        file group
+        """
+        indexes = [
+            self._plugin_indexes[extension]
+            for extension in file_extensions(Path(filename))
+            if extension in self._plugin_indexes
+        ]
+        if self._wildcard_plugin_index is not None:
+            indexes.append(self._wildcard_plugin_index)
+        if len(indexes) == 0:
+            return None
+        return self.plugins[min(indexes)]
+
+
 class PluginService:
 
     def __init__(self, plugins: list[QaxCheckToolPlugin]) -> None:
         self.plugins = plugins
+        self.file_type_registry = FileTypeRegistry(plugins)
 
     def get_all_file_groups(self) -> list[QaxFileGroup]:
-        all:list[QaxFileGroup] = []
-        for plugin in self.plugins:
-            for file_group in plugin.get_file_groups():
-                all.append(file_group)
-        return all
+        return list(self.file_type_registry.file_groups)
 
     def get_all_file_group_names(self) -> list[str]:
         all = self.get_all_file_groups()
@@ -32,19 +179,13 @@ class PluginService:
         its name (extension). If no matching filegroup is found
         then 'Unknown' is returned
         """
-        for plugin in self.plugins:
-            for file_group in plugin.get_file_groups():
-                ft = file_group.matching_file_type(Path(filename))
-                if ft is not None:
-                    return file_group.name
-        
-        return 'Unknown'
+        file_group = self.file_type_registry.file_group(filename)
+        if file_group is None:
+            return 'Unknown'
+        return file_group
 
     def get_file_details(self, filename: str) -> str:
-        for plugin in self.plugins:
-            for file_group in plugin.get_file_groups():
-                for check_ref in plugin.checks():
-                    if check_ref.supports_file(Path(filename), file_group.name):
-                        return plugin.get_file_details(filename)
-
-        return ""
+        plugin = self.file_type_registry.plugin_for_file(filename)
+        if plugin is None:
+            return ""
+        return plugin.get_file_details(filename)
@@ -1,63 +1,62 @@
-from ausseabed.qajson.model import QajsonRoot, QajsonCheck
+from ausseabed.qajson.model import QajsonRoot, QajsonCheck, QajsonFile
 from ausseabed.qajson.parser import QajsonParser
 from ausseabed.qajson.utils import qajson_valid
+from collections import OrderedDict
 from pathlib import Path
 from PySide2 import QtCore
-from typing import Optional, NoReturn, List
+from typing import Dict, Hashable, Optional, NoReturn, List, Tuple
 import json
 import logging
 import traceback
 
 from hyo2.qax.lib.config import QaxConfigProfile
 from hyo2.qax.lib.plugin import QaxPlugins
-from hyo2.qax.lib.qajson_util import QajsonExcelExporter
+from hyo2.qax.lib.export_job import ExportJob
+from hyo2.qax.lib.qajson_util import QajsonExcelExporter, QajsonExporter, \
+    QajsonJsonExporter
 
 
 logger = logging.getLogger(__name__)
 
 
+# identifies a check by its data level and index within that data level
+CheckRef = Tuple[str, int]
+
+# data levels included in the summary, in order
+SUMMARY_DATA_LEVELS = ['raw_data', 'survey_products', 'chart_adequacy']
+
+
+class _SummarisedCheck():
+    """ Contribution of a single check to a QaCheckSummary. Taken when the
+    check is added, as the check may be updated in place before the summary
+    is told it has changed.
+    """
+
+    def __init__(self, check: QajsonCheck):
+        self.check = check
+        self.files = []
+        if check.inputs is not None and check.inputs.files is not None:
+            self.files = list(check.inputs.files)
+        outputs = check.outputs
+        self.executed = outputs is not None and outputs.execution is not None
+        self.failed_execution = \
+            self.executed and outputs.execution.status == 'failed'
+        self.failed_check_state = \
+            self.executed and outputs.check_state == 'fail'
+        self.warning_check_state = \
+            self.executed and outputs.check_state == 'warning'
+
+
 class QaCheckSummary():
     """ Class defines properties that make up a summary of a single QA
     check that may have been run multiple times.
     """
 
-    @classmethod
-    def __process_check_summary(
-            cls,
-            data_level: str,
-            check: QajsonCheck,
-            summaries: dict) -> NoReturn:
-        # a name and id tuple is used to reference the summaries
-        nid = (check.info.id, check.info.name)
-        if nid in summaries:
-            summary = summaries[nid]
-        else:
-            summary = QaCheckSummary(
-                id=check.info.id, name=check.info.name,
-                version=check.info.version, data_level=data_level)
-            summaries[nid] = summary
-
-        summary.add_check(check)
-
     @classmethod
     def get_summary(cls, qa_json: QajsonRoot) -> List['QaCheckSummary']:
         """ Builds a list of check summaries from the qa json object
         """
-        summaries = {}  # tuple of check id and name used as key
-        if qa_json.qa is not None:
-            for check in qa_json.qa.raw_data.checks:
-                QaCheckSummary.__process_check_summary(
-                    'raw_data', check, summaries)
-            for check in qa_json.qa.survey_products.checks:
-                QaCheckSummary.__process_check_summary(
-                    'survey_products', check, summaries)
-
-            if qa_json.qa.chart_adequacy is not None:
-                for check in qa_json.qa.chart_adequacy.checks:
-                    QaCheckSummary.__process_check_summary(
-                        'chart_adequacy', check, summaries)
-
-        return list(summaries.values())
+        return QaCheckSummaryIndex(qa_json).summaries
 
     def __init__(self, id: str, name: str, version: str, data_level: str):
         """ Constructor
@@ -74,31 +73,96 @@ class QaCheckSummary():
         self.data_level = data_level
         self.total_executions = 0
         self.failed_executions = 0
-        self.failed_execution_files = []
         self.failed_check_state = 0
-        self.failed_check_state_files = []
         self.warning_check_state = 0
-        self.warning_check_state_files = []
 
-        # collection of checks that make up this summary
-        self.checks = []
+        # the checks that make up this summary, by a key that identifies
+        # each check (eg; its CheckRef), in the order they were added
+        self._checks: Dict[Hashable, _SummarisedCheck] = OrderedDict()
+        # input files of the checks in each state, by the same key. Updated
+        # along with the counts so only the changed checks are visited.
+        self._failed_execution_files: Dict[Hashable, List[QajsonFile]] = \
+            OrderedDict()
+        self._failed_check_state_files: Dict[Hashable, List[QajsonFile]] = \
+            OrderedDict()
+        self._warning_check_state_files: Dict[Hashable, List[QajsonFile]] = \
+            OrderedDict()
 
-    def add_check(self, check) -> None:
-        """ Adds a check to this summary
-        """
-        self.checks.append(check)
+    @property
+    def checks(self) -> List[QajsonCheck]:
+        return [sc.check for sc in self._checks.values()]
+
+    @property
+    def failed_execution_files(self) -> List[QajsonFile]:
+        return [
+            f for files in self._failed_execution_files.values()
+            for f in files
+        ]
 
-        if (check.outputs is not None and check.outputs.execution is not None):
+    @property
+    def failed_check_state_files(self) -> List[QajsonFile]:
+        return [
+            f for files in self._failed_check_state_files.values()
+            for f in files
+        ]
+
+    @property
+    def warning_check_state_files(self) -> List[QajsonFile]:
+        return [
+            f for files in self._warning_check_state_files.values()
+            for f in files
+        ]
+
+    def __len__(self) -> int:
+        return len(self._checks)
+
+    def _add(self, key: Hashable, summarised: _SummarisedCheck) -> None:
+        self._checks[key] = summarised
+        if summarised.executed:
             self.total_executions += 1
-            if check.outputs.execution.status == 'failed':
-                self.failed_executions += 1
-                self.failed_execution_files.extend(check.inputs.files)
-            if check.outputs.check_state == 'fail':
-                self.failed_check_state += 1
-                self.failed_check_state_files.extend(check.inputs.files)
-            if check.outputs.check_state == 'warning':
-                self.warning_check_state += 1
-                self.warning_check_state_files.extend(check.inputs.files)
+        if summarised.failed_execution:
+            self.failed_executions += 1
+            self._failed_execution_files[key] = summarised.files
+        if summarised.failed_check_state:
+            self.failed_check_state += 1
+            self._failed_check_state_files[key] = summarised.files
+        if summarised.warning_check_state:
+            self.warning_check_state += 1
+            self._warning_check_state_files[key] = summarised.files
+
+    def _remove(self, key: Hashable) -> None:
+        """ Removes the contribution of a check, but not its position in
+        `_checks` (so a replaced check keeps its position)
+        """
+        summarised = self._checks[key]
+        if summarised.executed:
+            self.total_executions -= 1
+        if summarised.failed_execution:
+            self.failed_executions -= 1
+            del self._failed_execution_files[key]
+        if summarised.failed_check_state:
+            self.failed_check_state -= 1
+            del self._failed_check_state_files[key]
+        if summarised.warning_check_state:
+            self.warning_check_state -= 1
+            del self._warning_check_state_files[key]
+
+    def add_check(self, check: QajsonCheck, key: Hashable = None) -> None:
+        """ Adds a check to this summary. A check added with the same `key`
+        as an existing check replaces it (keeping its position), if no key is
+        given the check is always added.
+        """
+        if key is None:
+            key = object()
+        if key in self._checks:
+            self._remove(key)
+        self._add(key, _SummarisedCheck(check))
+
+    def remove_check(self, key: Hashable) -> None:
+        """ Removes the check added with `key` from this summary """
+        if key in self._checks:
+            self._remove(key)
+            del self._checks[key]
 
     def __repr__(self) -> str:
         return (
@@ -112,6 +176,81 @@ class QaCheckSummary():
             self.failed_check_state)
 
 
+class QaCheckSummaryIndex():
+    """ Summaries of the checks in a QAJSON, one QaCheckSummary for each
+    check id and name. Once built the summaries are updated for only the
+    checks that have changed (eg; as the outputs of a check run are
+    received) rather than being rebuilt from all checks.
+    """
+
+    def __init__(self, qa_json: Optional[QajsonRoot] = None):
+        self.qa_json = None
+        # (check id, check name) -> summary, in the order the checks were
+        # found in the QAJSON
+        self._summaries: Dict[Tuple[str, str], QaCheckSummary] = \
+            OrderedDict()
+        # check ref -> key of the summary that includes the check
+        self._check_summaries: Dict[CheckRef, Tuple[str, str]] = {}
+        if qa_json is not None:
+            self.rebuild(qa_json)
+
+    @property
+    def summaries(self) -> List[QaCheckSummary]:
+        return list(self._summaries.values())
+
+    def rebuild(self, qa_json: Optional[QajsonRoot]) -> None:
+        """ Builds the summaries of all checks in `qa_json` """
+        self.qa_json = qa_json
+        self._summaries = OrderedDict()
+        self._check_summaries = {}
+        if qa_json is None or qa_json.qa is None:
+            return
+        for data_level_name in SUMMARY_DATA_LEVELS:
+            data_level = qa_json.qa.get_data_level(data_level_name)
+            if data_level is None:
+                continue
+            for index in range(len(data_level.checks)):
+                self._update_check((data_level_name, index))
+
+    def update_checks(self, check_refs: List[CheckRef]) -> None:
+        """ Updates the summaries of the checks that have changed. Only
+        changes to existing checks are supported, the index must be rebuilt
+        if checks are added to or removed from the QAJSON.
+        """
+        for check_ref in check_refs:
+            self._update_check(check_ref)
+
+    def _remove_check(self, check_ref: CheckRef) -> None:
+        summary_key = self._check_summaries.pop(check_ref, None)
+        if summary_key is None:
+            return
+        summary = self._summaries[summary_key]
+        summary.remove_check(check_ref)
+        if len(summary) == 0:
+            del self._summaries[summary_key]
+
+    def _update_check(self, check_ref: CheckRef) -> None:
+        data_level_name, index = check_ref
+        data_level = self.qa_json.qa.get_data_level(data_level_name)
+        if data_level is None or index >= len(data_level.checks):
+            self._remove_check(check_ref)
+            return
+        check = data_level.checks[index]
+
+        summary_key = (check.info.id, check.info.name)
+        if self._check_summaries.get(check_ref, summary_key) != summary_key:
+            # check has been replaced by a different check
+            self._remove_check(check_ref)
+        summary = self._summaries.get(summary_key)
+        if summary is None:
+            summary = QaCheckSummary(
+                id=check.info.id, name=check.info.name,
+                version=check.info.version, data_level=data_level_name)
+            self._summaries[summary_key] = summary
+        summary.add_check(check, key=check_ref)
+        self._check_summaries[check_ref] = summary_key
+
+
 # inherits from QObject to support signals
 class QAXProject(QtCore.QObject):
     """ Class represents the current QAX project as configured by the user.
@@ -126,6 +265,10 @@ class QAXProject(QtCore.QObject):
 
         self._qa_json = None  # QajsonRoot
         self._qa_json_path = None
+        # summary of the checks in the qa json, rebuilt when next needed
+        # after the qa json is set
+        self._summary_index = QaCheckSummaryIndex()
+        self._summary_index_valid = False
 
         self._profile = None
 
@@ -136,6 +279,19 @@ class QAXProject(QtCore.QObject):
     @qa_json.setter
     def qa_json(self, value: Optional[QajsonRoot]) -> NoReturn:
         self._qa_json = value
+        # the qa json may have been changed in place, so the summary is
+        # rebuilt even if it's the same object
+        self._summary_index_valid = False
+        self.qa_json_changed.emit(self._qa_json)
+
+    def update_checks(self, check_refs: List[CheckRef]) -> NoReturn:
+        """ Notifies the project that the checks referenced by `check_refs`
+        have been changed in place (eg; by a check run). Only the summaries
+        of these checks are updated, rather than all checks as is done when
+        the qa json is set.
+        """
+        if self._summary_index_valid:
+            self._summary_index.update_checks(check_refs)
         self.qa_json_changed.emit(self._qa_json)
 
     @property
@@ -184,13 +340,37 @@ class QAXProject(QtCore.QObject):
             logging.error(traceback.format_exc())
             return False
 
+    def save_job(self) -> ExportJob:
+        """ Creates a job that saves a snapshot of the QA JSON, see
+        `save_qa_json`. The job is run by the caller (eg; in a worker thread).
+        """
+        path = self.get_qa_json_path()
+        if self.qa_json_path is None or str(path) != str(self.qa_json_path):
+            self.qa_json_path = path
+        logger.debug("save json to {}".format(path))
+        return ExportJob(self.qa_json, QajsonJsonExporter(), Path(path))
+
+    def export_job(
+            self,
+            exporter: QajsonExporter,
+            output_file: Path) -> ExportJob:
+        """ Creates a job that exports a snapshot of the QA JSON using the
+        plugins of the current profile. The job is run by the caller.
+        """
+        profile_plugins = QaxPlugins.instance().get_profile_plugins(self.profile)
+        return ExportJob(
+            self.qa_json, exporter, output_file, plugins=profile_plugins)
+
     def open_qa_json(self) -> NoReturn:
         path = self.qa_json_path
         qajsonparser = QajsonParser(path)
         self.qa_json = qajsonparser.root
 
     def get_summary(self) -> List[QaCheckSummary]:
-        return QaCheckSummary.get_summary(self.qa_json)
+        if not self._summary_index_valid:
+            self._summary_index.rebuild(self.qa_json)
+            self._summary_index_valid = True
+        return self._summary_index.summaries
 
     def is_qajson_valid(self) -> bool:
         ''' Checks if the qa json object is valid. This may return false if the
@@ -0,0 +1,168 @@
+""" Builds QAJSON objects from a list of input files, a profile and a
+specification without requiring the QAX user interface. Follows the same logic
+used by the user interface (refer to `QAXWidget._build_qa_json`).
+"""
+from pathlib import Path
+from typing import Callable, List, Optional
+
+from ausseabed.qajson.model import QajsonRoot, QajsonQa, QajsonFile, \
+    QajsonParam
+from ausseabed.qajson.parser import QajsonParser
+
+from hyo2.qax.lib.config import QaxConfig, QaxConfigProfile, \
+    QaxConfigSpecification
+from hyo2.qax.lib.plugin import QaxPlugins, QaxCheckReference
+from hyo2.qax.lib.plugin_service import PluginService
+
+
+def get_profile(profile_name: str) -> Optional[QaxConfigProfile]:
+    """ Gets the profile from the loaded QaxConfig with the given name, or None
+    if no matching profile exists.
+    """
+    return next(
+        (p for p in QaxConfig.instance().profiles if p.name == profile_name),
+        None
+    )
+
+
+def get_specification(
+        profile: QaxConfigProfile,
+        specification_name: Optional[str]
+) -> Optional[QaxConfigSpecification]:
+    """ Gets the specification of the profile with the given name. If no name
+    is given the first specification is used (same as the user interface).
+    """
+    if specification_name is None:
+        if len(profile.specifications) == 0:
+            return None
+        return profile.specifications[0]
+    return next(
+        (s for s in profile.specifications if s.name == specification_name),
+        None
+    )
+
+
+def get_profile_checks(profile: QaxConfigProfile) -> List[QaxCheckReference]:
+    """ Gets all the checks implemented by the plugins of a profile
+    """
+    profile_plugins = QaxPlugins.instance().get_profile_plugins(profile)
+    checks = []
+    for plugin in profile_plugins.plugins:
+        checks.extend(plugin.checks())
+    return checks
+
+
+def get_specification_checks(
+        profile: QaxConfigProfile,
+        specification: QaxConfigSpecification) -> List[QaxCheckReference]:
+    """ Gets the checks of the profile that are included in the
+    specification. Checks are matched by id, or name if no id is given.
+    """
+    selected = []
+    for check in get_profile_checks(profile):
+        match = next(
+            (
+                c for c in specification.checks
+                if c.checkId == check.id or
+                (c.checkId is None and c.checkName == check.name)
+            ),
+            None
+        )
+        if match is not None:
+            selected.append(check)
+    return selected
+
+
+def get_check_params(
+        check: QaxCheckReference,
+        specification: Optional[QaxConfigSpecification]
+) -> List[QajsonParam]:
+    """ Gets the input parameters for a check. These are the check's default
+    parameters, with values replaced by those given in the specification.
+    """
+    spec_values = {}
+    if specification is not None:
+        config_check = specification.get_config_check(check.id)
+        if config_check is not None:
+            spec_values = {p.name: p.value for p in config_check.parameters}
+
+    params = []
+    for default_param in check.default_input_params:
+        value = spec_values.get(default_param.name, default_param.value)
+        params.append(QajsonParam(name=default_param.name, value=value))
+    return params
+
+
+def group_files(
+        plugin_service: PluginService,
+        filenames: List[str],
+        single_dataset: bool = False) -> List[List[QajsonFile]]:
+    """ Identifies the file type of each file and groups them into datasets.
+    By default each file is included in its own dataset, if `single_dataset` is
+    True all files are included in one. Files of an unknown type are skipped.
+    """
+    files = []
+    for filename in filenames:
+        file_type = plugin_service.identify_file_group(filename)
+        if file_type == 'Unknown':
+            continue
+        files.append(QajsonFile(filename, file_type, None))
+
+    if single_dataset:
+        return [files] if len(files) > 0 else []
+    return [[f] for f in files]
+
+
+def build_qajson(
+        plugin_service: PluginService,
+        grouped_files: List[List[QajsonFile]],
+        checks: List[QaxCheckReference],
+        specification: Optional[QaxConfigSpecification],
+        check_params: Optional[
+            Callable[[QaxCheckReference], List[QajsonParam]]] = None
+) -> QajsonRoot:
+    """ Builds a QA JSON root object that includes each check for every group
+    of files the check supports. The input parameters of each check are read
+    from the `specification`, unless a `check_params` function is given that
+    returns them for a check (as done by the user interface).
+    """
+    if check_params is None:
+        def check_params(check: QaxCheckReference) -> List[QajsonParam]:
+            return get_check_params(check, specification)
+
+    root = QajsonRoot(None)
+
+    # assume schema naming convention is
+    #  `some_path/v0.1.2/qa.schema.json` or similar
+    last_path = QajsonParser.schema_paths()[-1]
+    version = last_path.parent.name[1:]
+    root.qa = QajsonQa(
+        version=version,
+        raw_data=None,
+        survey_products=None,
+    )
+    root.qa.get_or_add_data_level('raw_data')
+    root.qa.get_or_add_data_level('survey_products')
+
+    registry = plugin_service.file_type_registry
+    for file_group_list in grouped_files:
+        paths_and_types = [
+            (Path(f.path), f.file_type) for f in file_group_list]
+        supported_ids = set([
+            c.id for c in registry.checks_supporting_files(paths_and_types)
+        ])
+
+        for check in checks:
+            if check.id in supported_ids:
+                data_level = root.qa.get_or_add_data_level(check.data_level)
+                plugin = QaxPlugins.instance().get_plugin_for_check(check.id)
+                qajson_check = plugin.add_check(data_level, check)
+                qajson_inputs = qajson_check.get_or_add_inputs()
+                qajson_inputs.files.extend(file_group_list)
+
+    for check in checks:
+        plugin = QaxPlugins.instance().get_plugin_for_check(check.id)
+        plugin.update_qa_json_input_params(
+            root, check.id, check_params(check))
+
+    return root
@@ -2,10 +2,15 @@
 user interface
 """
 from collections import OrderedDict
+from datetime import datetime
 from pathlib import Path
-from typing import List, TypeVar, Optional, Tuple
+from typing import Callable, Dict, Iterator, List, TypeVar, Optional, \
+    TextIO, Tuple, Type
+import csv
+import importlib.util
+import json
+import tempfile
 
-import pandas as pd
 import xlsxwriter
 
 from ausseabed.qajson.model import QajsonRoot, QajsonInfo
@@ -222,49 +227,77 @@ class QajsonTableSummary():
             section = self.template_file_summary.get_or_add_section("header")
             section.get_or_add_field(field_name)
 
+        # (section name, field name) -> plugin that provides the field value,
+        # the first plugin to include a field provides its value
+        self.field_plugins: Dict[Tuple[str, str], QaxCheckToolPlugin] = {}
+
         # now loop through the check results that we have in the qajson
         # to find the other fields that should be included
+        plugins = []
         for _, check in self.check_summaries.items():
             qajson_check_info = check.check_info
             plugin = self.plugins.get_plugin_for_check(qajson_check_info.id)
-            if plugin is not None:
-                sd_list = plugin.get_summary_details(self.qajson)
-                for section_name, field_name in sd_list:
-                    section = self.template_file_summary.get_or_add_section(
-                        section_name)
-                    section.get_or_add_field(field_name)
-
-    def __get_plugin(self, field_name: str, section_name: str) -> Optional[QaxCheckToolPlugin]:
-        """ Gets a plugin that provides this field value
+            # many checks share a plugin, only get its summary details once
+            if plugin is not None and plugin not in plugins:
+                plugins.append(plugin)
+        for plugin in plugins:
+            sd_list = plugin.get_summary_details(self.qajson)
+            for section_name, field_name in sd_list:
+                section = self.template_file_summary.get_or_add_section(
+                    section_name)
+                section.get_or_add_field(field_name)
+                self.field_plugins.setdefault(
+                    (section_name, field_name), plugin)
+
+    def _get_plugin_fields(
+            self
+    ) -> List[Tuple[QaxCheckToolPlugin, List[Tuple[str, str]]]]:
+        """ Groups the fields of the template by the plugin that provides
+        their values
         """
-        for _, check in self.check_summaries.items():
-            qajson_check_info = check.check_info
-            plugin = self.plugins.get_plugin_for_check(qajson_check_info.id)
-            if plugin is not None:
-                sd_list = plugin.get_summary_details(self.qajson)
-                for p_section_name, p_field_name in sd_list:
-                    if p_section_name == section_name and p_field_name == field_name:
-                        return plugin
-        return None
-
-    def _get_field_value(self, field_name: str, section_name: str, filename: str) -> object:
-        plugin = self.__get_plugin(field_name, section_name)
-        if plugin is None:
-            return "no plugin"
-        value = plugin.get_summary_value(section_name, field_name, filename, self.qajson)
-        return value
+        plugin_fields = OrderedDict()
+        for section in self.template_file_summary.sections:
+            for field in section.fields:
+                key = (section.name, field.name)
+                plugin = self.field_plugins.get(key)
+                if plugin is None:
+                    continue
+                plugin_fields.setdefault(id(plugin), (plugin, []))[1] \
+                    .append(key)
+        return list(plugin_fields.values())
 
+    def _get_field_values(
+            self,
+            plugin_fields: List[
+                Tuple[QaxCheckToolPlugin, List[Tuple[str, str]]]],
+            filename: str) -> Dict[Tuple[str, str], object]:
+        """ Gets the values of all fields for a file, with one call to each
+        plugin
+        """
+        values = {}
+        for plugin, fields in plugin_fields:
+            values.update(
+                plugin.get_summary_values(fields, filename, self.qajson))
+        return values
 
-    def build(self) -> None:
-        self.file_summaries: List[QajsonFileSummary] = []
+    def iter_file_summaries(self) -> Iterator[QajsonFileSummary]:
+        """ Generates the summary of each file in turn, unlike `build` the
+        summaries are not kept.
+        """
+        plugin_fields = self._get_plugin_fields()
         for filename in self.all_files:
             new_summary = self.template_file_summary.clone()
             new_summary.filename = filename
-            self.file_summaries.append(new_summary)
+            values = self._get_field_values(plugin_fields, filename)
             for section in new_summary.sections:
                 for field in section.fields:
-                    value = self._get_field_value(field.name, section.name, filename)
-                    field.value = value
+                    field.value = values.get(
+                        (section.name, field.name), "no plugin")
+            yield new_summary
+
+    def build(self) -> None:
+        self.file_summaries: List[QajsonFileSummary] = list(
+            self.iter_file_summaries())
 
 
 
@@ -289,6 +322,12 @@ class QajsonTableSummary():
 
 
 
+class ExportCancelled(Exception):
+    """ Raised (by the progress callback of an exporter) to stop an export
+    """
+    pass
+
+
 class QajsonExporter():
 
     def __init__(self) -> None:
@@ -298,20 +337,110 @@ class QajsonExporter():
         self.description = None
         # extension of the filename the exporter generates
         self.extension = None
+        # called with the fraction (0.0 to 1.0) of the export that has been
+        # completed. May raise ExportCancelled to stop the export.
+        self.progress_callback: Optional[Callable[[float], None]] = None
+
+    def _progress(self, fraction: float) -> None:
+        if self.progress_callback is not None:
+            self.progress_callback(fraction)
 
-    def export(qajson: QajsonRoot, file: Path) -> None:
+    def export(
+            self,
+            qajson: QajsonRoot,
+            file: Path,
+            plugins: Optional[QaxProfilePlugins] = None
+        ) -> None:
         """ Exports the `qajson` object to the `file`
         """
-        raise NotImplemented("Export function must be overwritten")
+        raise NotImplementedError("Export function must be overwritten")
+
+
+# number of files (columns) held in memory by the constant memory Excel
+# exporter, the values of each block are written to a temporary file
+COLUMN_BLOCK_SIZE = 500
+
+# format of the header row, matches that used by pandas
+HEADER_FORMAT = {
+    'bold': True,
+    'border': 1,
+    'align': 'center',
+    'valign': 'top',
+}
+
+
+def _json_value(value: object) -> object:
+    """ Converts summary values that can't be serialised to JSON (eg; numpy
+    numbers) when writing them to a temporary file
+    """
+    if hasattr(value, 'item'):
+        return value.item()
+    return str(value)
+
+
+class _ColumnBlockSpool():
+    """ Stores the columns of the summary table in blocks of
+    COLUMN_BLOCK_SIZE files, in temporary files. Each block is written one
+    row per line so that the table can then be read back row by row (as
+    required by xlsxwriter's constant memory mode) holding only one row of
+    each block in memory.
+    """
+
+    def __init__(self, folder: Path, block_size: int = COLUMN_BLOCK_SIZE):
+        self.folder = folder
+        self.block_size = block_size
+        self.block_files: List[Path] = []
+        self.column_count = 0
+        self._columns: List[List[object]] = []
+
+    def add(self, column: List[object]) -> None:
+        self._columns.append(column)
+        self.column_count += 1
+        if len(self._columns) >= self.block_size:
+            self.flush()
+
+    def flush(self) -> None:
+        if len(self._columns) == 0:
+            return
+        block_file = self.folder.joinpath(f'block_{len(self.block_files)}')
+        with block_file.open('w', encoding='utf-8') as file:
+            for row in zip(*self._columns):
+                file.write(json.dumps(list(row), default=_json_value) + '\n')
+        self.block_files.append(block_file)
+        self._columns = []
+
+    def rows(self) -> Iterator[List[object]]:
+        """ Reads the table back one row at a time """
+        self.flush()
+        files: List[TextIO] = [
+            block_file.open(encoding='utf-8')
+            for block_file in self.block_files
+        ]
+        try:
+            for lines in zip(*files):
+                row = []
+                for line in lines:
+                    row.extend(json.loads(line))
+                yield row
+        finally:
+            for file in files:
+                file.close()
 
 
 class QajsonExcelExporter(QajsonExporter):
 
-    def __init__(self) -> None:
+    def __init__(self, constant_memory: bool = True) -> None:
+        """
+        :param bool constant_memory: stream the summary of each file to the
+            workbook (using xlsxwriter's constant memory mode) rather than
+            building the table in memory with pandas. Supports summaries of
+            a large number of files in bounded memory.
+        """
         super().__init__()
         self.name = "Microsoft Excel"
         self.description = "Save QAJSON to Microsoft Excel workbook"
         self.extension = "xlsx"
+        self.constant_memory = constant_memory
 
     def _get_safe_shortname(self, file_summary: QajsonFileSummary, existing_data: List) -> str:
         """ Ensures there are no duplicate short names included in the orderedDict
@@ -333,10 +462,12 @@ class QajsonExcelExporter(QajsonExporter):
     def _generate_summary_dataframe(
             self,
             tableSummary: QajsonTableSummary
-        ) -> pd.DataFrame:
+        ) -> 'pd.DataFrame':
         """ Generate pandas data frame including summary data for all the
         checks and files in this tableSummary
         """
+        import pandas as pd
+
         processed_summaries = []
 
         data = OrderedDict()
@@ -351,7 +482,23 @@ class QajsonExcelExporter(QajsonExporter):
         df = pd.DataFrame(data)
         return df
 
-    def _write_formatted_file(self, dataFrame: pd.DataFrame, tableSummary: QajsonTableSummary, output_file: Path) -> None:
+    def _format_worksheet(
+            self,
+            workbook: xlsxwriter.Workbook,
+            worksheet: xlsxwriter.workbook.Worksheet,
+            column_count: int) -> None:
+        firstColumnStyle = workbook.add_format({'text_wrap': True})
+        worksheet.set_column(0,0, width=25, cell_format=firstColumnStyle)
+
+        # set width of remaining columns that include data
+        worksheet.set_column(1, column_count + 1, width=30)
+
+        # freeze top two rows and first column
+        worksheet.freeze_panes(2, 1)
+
+    def _write_formatted_file(self, dataFrame: 'pd.DataFrame', tableSummary: QajsonTableSummary, output_file: Path) -> None:
+        import pandas as pd
+
         writer = pd.ExcelWriter(
             output_file,
             engine='xlsxwriter'
@@ -368,17 +515,81 @@ class QajsonExcelExporter(QajsonExporter):
                 # +1 to row index because excel is 1 based indexing
                 worksheet.set_row(rowIndex + 1, None, sectionStyle)
 
-        firstColumnStyle = workbook.add_format({'text_wrap': True})
-        worksheet.set_column(0,0, width=25, cell_format=firstColumnStyle)
-
-        # set width of remaining columns that include data
-        worksheet.set_column(1, len(tableSummary.file_summaries) + 1, width=30)
-
-        # freeze top two rows and first column
-        worksheet.freeze_panes(2, 1)
+        self._format_worksheet(
+            workbook, worksheet, len(tableSummary.file_summaries))
 
         writer.close()
 
+    def _write_cell(
+            self,
+            worksheet: xlsxwriter.workbook.Worksheet,
+            row: int,
+            column: int,
+            value: object,
+            cell_format=None) -> None:
+        if value is None:
+            return
+        try:
+            worksheet.write(row, column, value, cell_format)
+        except TypeError:
+            # value of a type xlsxwriter doesn't support
+            worksheet.write_string(row, column, str(value), cell_format)
+
+    def _write_streaming_file(
+            self,
+            tableSummary: QajsonTableSummary,
+            output_file: Path) -> None:
+        """ Writes the summary of each file to the workbook as it is
+        generated, without holding the whole table in memory. The columns
+        (files) are spooled to temporary files in blocks, and then written
+        to the workbook row by row as required by the constant memory mode.
+        """
+        row_labels = tableSummary.template_file_summary.row_labels()
+        file_count = max(len(tableSummary.all_files), 1)
+        with tempfile.TemporaryDirectory() as temp_dir:
+            spool = _ColumnBlockSpool(Path(temp_dir))
+            # number of preceding files with the same short name
+            short_name_counts: Dict[str, int] = {}
+            for index, file_summary in enumerate(
+                    tableSummary.iter_file_summaries()):
+                # getting the summary values takes most of the export time
+                self._progress(0.9 * index / file_count)
+                short_name = file_summary.summary_heading_label
+                count = short_name_counts.get(short_name, 0)
+                short_name_counts[short_name] = count + 1
+                if count > 0:
+                    short_name = f"{short_name} ({count})"
+                spool.add([short_name] + file_summary.row_values())
+
+            workbook = xlsxwriter.Workbook(
+                str(output_file), {'constant_memory': True})
+            worksheet = workbook.add_worksheet('Sheet1')
+            header_style = workbook.add_format(HEADER_FORMAT)
+            # apply a blue background color to each of the section header
+            # rows
+            sectionStyle = workbook.add_format({'bg_color': 'B4C6E7'})
+            self._format_worksheet(workbook, worksheet, spool.column_count)
+
+            labels = [''] + [label for label, _ in row_labels]
+            rows = spool.rows()
+            if spool.column_count == 0:
+                # only the labels are written when there are no files
+                rows = ([] for _ in labels)
+            for rowIndex, (label, values) in enumerate(zip(labels, rows)):
+                self._progress(0.9 + 0.1 * rowIndex / len(labels))
+                cell_format = None
+                if rowIndex == 0:
+                    cell_format = header_style
+                elif row_labels[rowIndex - 1][1]:
+                    worksheet.set_row(rowIndex, None, sectionStyle)
+                self._write_cell(worksheet, rowIndex, 0, label, cell_format)
+                for columnIndex, value in enumerate(values):
+                    self._write_cell(
+                        worksheet, rowIndex, columnIndex + 1, value,
+                        cell_format)
+            workbook.close()
+        self._progress(1.0)
+
     def export(
             self,
             qajson: QajsonRoot,
@@ -392,10 +603,305 @@ class QajsonExcelExporter(QajsonExporter):
         tableSummary.initialise_check_list()
         tableSummary.initialise_file_list()
         tableSummary.build_template()
-        tableSummary.build()
 
+        if self.constant_memory:
+            self._write_streaming_file(tableSummary, output_file=file)
+            return
+
+        tableSummary.build()
+        self._progress(0.5)
         df = self._generate_summary_dataframe(tableSummary)
         self._write_formatted_file(df, tableSummary, output_file=file)
+        self._progress(1.0)
+
+
+# columns of the long format check results table, in order. Each is a
+# (name, type) tuple where the type is one of 'category' (strings with few
+# distinct values, dictionary encoded), 'string', 'float' or 'int'
+CHECK_RESULT_COLUMNS = [
+    ('data_level', 'category'),
+    ('check_id', 'category'),
+    ('check_name', 'category'),
+    ('check_version', 'category'),
+    ('input_file', 'category'),
+    ('file_type', 'category'),
+    ('parameters', 'category'),
+    ('status', 'category'),
+    ('check_state', 'category'),
+    ('start', 'string'),
+    ('end', 'string'),
+    ('duration', 'float'),
+    ('error', 'string'),
+    ('count', 'float'),
+    ('percentage', 'float'),
+    ('message_count', 'int'),
+    ('wall_time', 'float'),
+    ('cpu_time', 'float'),
+    ('peak_rss', 'int'),
+]
+
+# number of rows written to each Parquet row group
+ROW_GROUP_SIZE = 10000
+
+
+def _number(value: object) -> Optional[float]:
+    if isinstance(value, bool) or not isinstance(value, (int, float)):
+        return None
+    return value
+
+
+def _duration(start: Optional[str], end: Optional[str]) -> Optional[float]:
+    """ Seconds between two ISO format times """
+    if start is None or end is None:
+        return None
+    try:
+        return (
+            datetime.fromisoformat(end) - datetime.fromisoformat(start)
+        ).total_seconds()
+    except (TypeError, ValueError):
+        return None
+
+
+def _check_parameters(check) -> str:
+    """ Parameters of a check as a JSON string with sorted names, so that
+    checks run with the same parameters have the same value
+    """
+    params = []
+    if check.inputs is not None and check.inputs.params is not None:
+        params = [(p.name, p.value) for p in check.inputs.params]
+    return json.dumps(
+        dict(sorted(params, key=lambda p: p[0])), default=str)
+
+
+def iter_check_results(qajson: QajsonRoot) -> Iterator[Dict]:
+    """ Generates the results of the checks in `qajson` as a long format
+    table, one row (dict keyed by the CHECK_RESULT_COLUMNS names) per data
+    level, check, input file and parameter set. Checks that have not been
+    run are included with no outputs.
+    """
+    for dl_name in ['raw_data', 'survey_products', 'chart_adequacy']:
+        dl = qajson.qa.get_data_level(dl_name)
+        if dl is None:
+            continue
+        for check in dl.checks:
+            row = {
+                'data_level': dl_name,
+                'check_id': check.info.id,
+                'check_name': check.info.name,
+                'check_version': check.info.version,
+                'parameters': _check_parameters(check),
+            }
+            outputs = {}
+            if check.outputs is not None:
+                outputs = check.outputs.to_dict()
+            execution = outputs.get('execution') or {}
+            data = outputs.get('data') or {}
+            telemetry = data.get('telemetry') or {}
+            messages = outputs.get('messages') or []
+            row.update({
+                'status': execution.get('status'),
+                'check_state': outputs.get('check_state'),
+                'start': execution.get('start'),
+                'end': execution.get('end'),
+                'duration': _duration(
+                    execution.get('start'), execution.get('end')),
+                'error': execution.get('error'),
+                'count': _number(outputs.get('count')),
+                'percentage': _number(outputs.get('percentage')),
+                'message_count': len(messages) if outputs else None,
+                'wall_time': _number(telemetry.get('wall_time')),
+                'cpu_time': _number(telemetry.get('cpu_time')),
+                'peak_rss': _number(telemetry.get('peak_rss')),
+            })
+
+            files = []
+            if check.inputs is not None and check.inputs.files is not None:
+                files = check.inputs.files
+            if len(files) == 0:
+                yield dict(row, input_file=None, file_type=None)
+            for input_file in files:
+                yield dict(
+                    row,
+                    input_file=input_file.path,
+                    file_type=input_file.file_type
+                )
+
+
+def count_check_results(qajson: QajsonRoot) -> int:
+    """ Number of rows `iter_check_results` generates for `qajson` """
+    count = 0
+    for dl_name in ['raw_data', 'survey_products', 'chart_adequacy']:
+        dl = qajson.qa.get_data_level(dl_name)
+        if dl is None:
+            continue
+        for check in dl.checks:
+            files = []
+            if check.inputs is not None and check.inputs.files is not None:
+                files = check.inputs.files
+            count += max(len(files), 1)
+    return count
+
+
+class QajsonCsvExporter(QajsonExporter):
+    """ Writes the check results as a long format table (see
+    `iter_check_results`) to a CSV file, one row at a time.
+    """
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.name = "CSV"
+        self.description = "Save check results to a CSV file, one row per " \
+            "check and input file"
+        self.extension = "csv"
+
+    def export(
+            self,
+            qajson: QajsonRoot,
+            file: Path,
+            plugins: Optional[QaxProfilePlugins] = None
+        ) -> None:
+        """ Writes the check results of the QAJSON to a CSV file """
+        names = [name for name, _ in CHECK_RESULT_COLUMNS]
+        row_count = max(count_check_results(qajson), 1)
+        with open(file, 'w', newline='', encoding='utf-8') as csv_file:
+            writer = csv.writer(csv_file)
+            writer.writerow(names)
+            for index, row in enumerate(iter_check_results(qajson)):
+                self._progress(index / row_count)
+                writer.writerow([
+                    '' if row[name] is None else row[name] for name in names
+                ])
+        self._progress(1.0)
+
+
+class QajsonParquetExporter(QajsonExporter):
+    """ Writes the check results as a long format table (see
+    `iter_check_results`) to a Parquet file. Columns with few distinct
+    values are dictionary encoded. Requires pyarrow.
+    """
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.name = "Parquet"
+        self.description = "Save check results to a Parquet file, one row " \
+            "per check and input file"
+        self.extension = "parquet"
+
+    @staticmethod
+    def _schema() -> 'pa.Schema':
+        import pyarrow as pa
+
+        types = {
+            'category': pa.dictionary(pa.int32(), pa.string()),
+            'string': pa.string(),
+            'float': pa.float64(),
+            'int': pa.int64(),
+        }
+        return pa.schema([
+            (name, types[column_type])
+            for name, column_type in CHECK_RESULT_COLUMNS
+        ])
+
+    def _write_row_group(self, writer, schema, rows: List[Dict]) -> None:
+        import pyarrow as pa
+
+        arrays = []
+        for (name, column_type), field in zip(CHECK_RESULT_COLUMNS, schema):
+            values = [row[name] for row in rows]
+            if column_type == 'category':
+                array = pa.array(values, type=pa.string()).dictionary_encode()
+            elif column_type == 'int':
+                array = pa.array(
+                    [None if v is None else int(v) for v in values],
+                    type=field.type)
+            else:
+                array = pa.array(values, type=field.type)
+            arrays.append(array)
+        writer.write_table(pa.Table.from_arrays(arrays, schema=schema))
+
+    def export(
+            self,
+            qajson: QajsonRoot,
+            file: Path,
+            plugins: Optional[QaxProfilePlugins] = None
+        ) -> None:
+        """ Writes the check results of the QAJSON to a Parquet file, in row
+        groups of ROW_GROUP_SIZE rows
+        """
+        try:
+            import pyarrow.parquet as pq
+        except ImportError:
+            raise RuntimeError(
+                "Parquet export requires pyarrow (pip install pyarrow)")
+
+        schema = self._schema()
+        row_count = max(count_check_results(qajson), 1)
+        with pq.ParquetWriter(str(file), schema) as writer:
+            rows = []
+            for index, row in enumerate(iter_check_results(qajson)):
+                self._progress(index / row_count)
+                rows.append(row)
+                if len(rows) >= ROW_GROUP_SIZE:
+                    self._write_row_group(writer, schema, rows)
+                    rows = []
+            if len(rows) > 0:
+                self._write_row_group(writer, schema, rows)
+        self._progress(1.0)
+
+
+class QajsonJsonExporter(QajsonExporter):
+    """ Writes the QAJSON itself, as done when the QAJSON is saved """
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.name = "QAJSON"
+        self.description = "Save QAJSON"
+        self.extension = "json"
+
+    def export(
+            self,
+            qajson: QajsonRoot,
+            file: Path,
+            plugins: Optional[QaxProfilePlugins] = None
+        ) -> None:
+        """ Writes the QAJSON to a JSON file """
+        qajson_dict = qajson.to_dict()
+        self._progress(0.5)
+        with open(file, 'w') as json_file:
+            json.dump(qajson_dict, json_file, indent=4)
+        self._progress(1.0)
+
+
+# exporters included in the user interface, by the fully qualified name of
+# their class, in the order they were registered
+_exporter_classes: Dict[str, Type[QajsonExporter]] = OrderedDict()
+
+
+def register_exporter(
+        exporter_class: Type[QajsonExporter]
+    ) -> Type[QajsonExporter]:
+    """ Adds an exporter to those offered by the user interface. Can be used
+    as a class decorator. Registering a class again replaces it (eg; when its
+    module is reloaded).
+    """
+    key = f"{exporter_class.__module__}.{exporter_class.__qualname__}"
+    _exporter_classes[key] = exporter_class
+    return exporter_class
+
+
+def unregister_exporter(exporter_class: Type[QajsonExporter]) -> None:
+    key = f"{exporter_class.__module__}.{exporter_class.__qualname__}"
+    _exporter_classes.pop(key, None)
+
 
+def get_exporters() -> List[QajsonExporter]:
+    """ Gets a new instance of each registered exporter """
+    return [exporter_class() for exporter_class in _exporter_classes.values()]
 
 
+register_exporter(QajsonExcelExporter)
+register_exporter(QajsonCsvExporter)
+# pyarrow is optional (see the Parquet extra), and is only imported when the
+# export is run
+if importlib.util.find_spec('pyarrow') is not None:
+    register_exporter(QajsonParquetExporter)
@@ -0,0 +1,285 @@
+""" Decides when, and in what order, the jobs of a check run are started.
+Jobs are ordered by a scheduling policy, and only started while the memory
+they are expected to use fits within the memory available on this host.
+"""
+from enum import Enum
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+import json
+import logging
+import os
+import random
+
+import psutil
+
+from ausseabed.qajson.model import QajsonCheck
+from hyo2.qax.lib.check_options import CheckOption
+
+logger = logging.getLogger(__name__)
+
+# default fraction of the available memory that running jobs may use
+DEFAULT_MEMORY_FRACTION = 0.8
+
+# tile size used by the grid checks when no tile size option is given. Same
+# as the default of the settings dialog.
+DEFAULT_TILE_SIZE = 40000
+
+# grid checks hold several arrays the size of a tile (eg; the input bands,
+# masks, and intermediate results) so the memory needed to read a tile is
+# multiplied by this factor
+RASTER_MEMORY_FACTOR = 3.0
+
+# raster file extensions whose memory use is estimated from the raster
+# dimensions rather than the file size
+RASTER_EXTENSIONS = ['.tif', '.tiff', '.bag']
+
+# bytes per pixel of the GDAL data type names
+GDAL_DATA_TYPE_SIZES = {
+    'Byte': 1,
+    'Int8': 1,
+    'UInt16': 2,
+    'Int16': 2,
+    'UInt32': 4,
+    'Int32': 4,
+    'UInt64': 8,
+    'Int64': 8,
+    'Float32': 4,
+    'Float64': 8,
+    'CInt16': 4,
+    'CInt32': 8,
+    'CFloat32': 8,
+    'CFloat64': 16,
+}
+
+
+def raster_memory(
+        file_info: 'RasterFileInfo',
+        tile_x: int,
+        tile_y: int) -> int:
+    """ Estimated number of bytes needed to process a raster one tile at a
+    time
+    """
+    pixel_size = sum([
+        GDAL_DATA_TYPE_SIZES.get(band.data_type, 8)
+        for band in file_info.bands
+    ])
+    pixels = min(file_info.size_x, tile_x) * min(file_info.size_y, tile_y)
+    return int(pixels * pixel_size * RASTER_MEMORY_FACTOR)
+
+
+class MemoryEstimator():
+    """ Estimates the memory used when running checks. Estimates are cached
+    for each input file, as a file is typically the input of several checks.
+    """
+
+    def __init__(self, options: Dict):
+        self.tile_x = options.get(
+            CheckOption.gridprocessing_tile_x, DEFAULT_TILE_SIZE)
+        self.tile_y = options.get(
+            CheckOption.gridprocessing_tile_y, DEFAULT_TILE_SIZE)
+        self._file_estimates: Dict[str, int] = {}
+
+    def file_memory(self, path: str) -> int:
+        """ Estimated number of bytes needed to process a single input file.
+        Rasters are estimated from their dimensions, band data types and the
+        grid processing tile size. Other files (eg; GSF, ALL) are read
+        progressively so the file size is used as an upper bound.
+        """
+        if path in self._file_estimates:
+            return self._file_estimates[path]
+
+        estimate = 0
+        if os.path.isfile(path):
+            estimate = os.path.getsize(path)
+            if Path(path).suffix.lower() in RASTER_EXTENSIONS:
+                # imported here as it loads GDAL, which is not needed unless
+                # there are rasters to estimate
+                from hyo2.qax.lib.data import RasterFileInfo
+                file_info = RasterFileInfo()
+                file_info.open(path)
+                if file_info.valid:
+                    estimate = raster_memory(
+                        file_info, self.tile_x, self.tile_y)
+        self._file_estimates[path] = estimate
+        return estimate
+
+    def check_memory(self, check: QajsonCheck) -> int:
+        """ Estimated number of bytes needed to run a check. All input files of
+        a check may be open at the same time.
+        """
+        if check.inputs is None:
+            return 0
+        return sum([self.file_memory(f.path) for f in check.inputs.files])
+
+    def checks_memory(self, checks: List[QajsonCheck]) -> int:
+        """ Estimated number of bytes needed to run a list of checks within a
+        single check tool. Check tools run one check (or group of checks that
+        share input files) at a time, so this is the largest estimate of the
+        individual checks.
+        """
+        return max([self.check_memory(c) for c in checks], default=0)
+
+
+class MemoryAdmission():
+    """ Decides if a job can be started based on the estimated memory use of
+    the jobs already running, and the memory available on this host. A
+    `memory_fraction` of 0 (or less) disables the memory limit.
+    """
+
+    def __init__(self, memory_fraction: float = DEFAULT_MEMORY_FRACTION):
+        self.memory_fraction = memory_fraction
+
+    @property
+    def enabled(self) -> bool:
+        """ False if the memory limit is disabled, in which case no memory
+        estimates are needed
+        """
+        return self.memory_fraction > 0
+
+    def memory_limit(self, running_memory: int) -> int:
+        """ Memory the running jobs may use. The memory reported as available
+        already excludes the memory used by the running jobs, so their
+        estimates are added back.
+        """
+        available = psutil.virtual_memory().available
+        return int(self.memory_fraction * (available + running_memory))
+
+    def select(
+            self,
+            waiting: List,
+            running: List,
+            memory: Dict[int, int]) -> Optional[int]:
+        """ Gets the index of the first waiting job that can be started, or
+        None if no job fits in the available memory. `memory` is the estimate
+        of each job, keyed by job id. A job can always be started when no
+        other jobs are running, otherwise a job that needs more memory than
+        is available would never run.
+        """
+        if len(waiting) == 0:
+            return None
+        if len(running) == 0 or not self.enabled:
+            return 0
+        running_memory = sum([memory[job.job_id] for job in running])
+        limit = self.memory_limit(running_memory)
+        for index, job in enumerate(waiting):
+            if running_memory + memory[job.job_id] <= limit:
+                return index
+        return None
+
+
+class SchedulingPolicy(Enum):
+    """ Order in which jobs are started
+    """
+    # no particular order, jobs are shuffled
+    arbitrary = 'arbitrary'
+    # order of the check tools given to the executor
+    fifo = 'fifo'
+    # shortest job first, based on the duration predicted from the
+    # throughput history
+    sjf = 'sjf'
+
+
+DEFAULT_SCHEDULING_POLICY = SchedulingPolicy.fifo
+
+# throughput (MB/s) assumed for checks that have no history
+DEFAULT_THROUGHPUT = 10.0
+
+# weight given to the latest throughput measurement of a check, older
+# measurements decay so the history follows changes in plugin performance
+THROUGHPUT_WEIGHT = 0.3
+
+
+def input_megabytes(checks: List[QajsonCheck]) -> float:
+    """ Total size, in MB, of the input files of a list of checks. Files that
+    are the input of multiple checks are only counted once.
+    """
+    paths = set()
+    for check in checks:
+        if check.inputs is None:
+            continue
+        paths.update([f.path for f in check.inputs.files])
+    total = 0
+    for path in paths:
+        if os.path.isfile(path):
+            total += os.path.getsize(path)
+    return total / (1024 * 1024)
+
+
+class ThroughputHistory():
+    """ Record of the throughput (MB of input processed per second) of each
+    check, used to predict how long checks will take to run. If a path is
+    given the history is persisted to a JSON file.
+    """
+
+    def __init__(self, path: Optional[Path] = None):
+        self.path = None if path is None else Path(path)
+        # check id to throughput in MB/s
+        self.throughputs: Dict[str, float] = {}
+
+    def load(self) -> None:
+        if self.path is None or not self.path.exists():
+            return
+        try:
+            self.throughputs = json.loads(self.path.read_text())
+        except (OSError, ValueError):
+            logger.warning(f"Could not read throughput history {self.path}")
+            self.throughputs = {}
+
+    def save(self) -> None:
+        if self.path is None:
+            return
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.path.write_text(json.dumps(self.throughputs, indent=4))
+
+    def record(
+            self,
+            check_ids: List[str],
+            megabytes: float,
+            seconds: float) -> None:
+        """ Records the time taken to run a group of checks (eg; a job) that
+        processed `megabytes` of input. The throughput is attributed to each
+        of the checks.
+        """
+        if seconds <= 0 or megabytes <= 0:
+            return
+        throughput = megabytes / seconds
+        for check_id in set(check_ids):
+            previous = self.throughputs.get(check_id)
+            if previous is None:
+                self.throughputs[check_id] = throughput
+            else:
+                self.throughputs[check_id] = (
+                    THROUGHPUT_WEIGHT * throughput +
+                    (1 - THROUGHPUT_WEIGHT) * previous
+                )
+
+    def predict(self, check_ids: List[str], megabytes: float) -> float:
+        """ Predicted number of seconds to run a group of checks that will
+        process `megabytes` of input. Checks are assumed to share the input
+        so the slowest throughput of the checks is used.
+        """
+        throughputs = [
+            self.throughputs.get(check_id, DEFAULT_THROUGHPUT)
+            for check_id in set(check_ids)
+        ]
+        throughput = min(throughputs, default=DEFAULT_THROUGHPUT)
+        return megabytes / throughput
+
+
+def order_jobs(
+        jobs: List,
+        policy: SchedulingPolicy,
+        predict_duration: Callable) -> List:
+    """ Orders a list of jobs (or check tools) based on the scheduling policy.
+    `predict_duration` is only called for the shortest job first policy, and
+    must return the predicted duration of a job.
+    """
+    if policy == SchedulingPolicy.arbitrary:
+        ordered = list(jobs)
+        random.shuffle(ordered)
+        return ordered
+    elif policy == SchedulingPolicy.sjf:
+        # sort is stable, so jobs with the same duration remain in fifo order
+        return sorted(jobs, key=predict_duration)
+    else:
+        return list(jobs)
@@ -0,0 +1,149 @@
+""" Resource use (telemetry) of check execution. Check tools are measured
+as they run, and the results are recorded against each check so that slow
+checks, and regressions after plugin upgrades, can be identified.
+"""
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional
+import json
+import logging
+import threading
+import time
+
+import psutil
+
+logger = logging.getLogger(__name__)
+
+# interval, in seconds, at which memory use is sampled to find the peak
+SAMPLE_INTERVAL = 0.5
+
+
+class CheckTelemetry():
+    """ Resource use of a single check tool run (eg; a job). Where a run
+    includes multiple checks each check is given the same values.
+    """
+
+    def __init__(
+            self,
+            wall_time: float,
+            cpu_time: float,
+            peak_rss: int,
+            bytes_read: Optional[int]):
+        # seconds
+        self.wall_time = wall_time
+        # seconds of user and system time, including child processes
+        self.cpu_time = cpu_time
+        # bytes, includes child processes
+        self.peak_rss = peak_rss
+        # bytes read from storage, None if not supported by the platform
+        self.bytes_read = bytes_read
+
+    def to_dict(self) -> Dict:
+        return {
+            'wall_time': self.wall_time,
+            'cpu_time': self.cpu_time,
+            'peak_rss': self.peak_rss,
+            'bytes_read': self.bytes_read,
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> 'CheckTelemetry':
+        return cls(
+            data['wall_time'],
+            data['cpu_time'],
+            data['peak_rss'],
+            data['bytes_read']
+        )
+
+    def __repr__(self):
+        return (
+            f"wall {self.wall_time:.1f}s, cpu {self.cpu_time:.1f}s, "
+            f"peak rss {self.peak_rss / (1024 * 1024):.0f}MB"
+        )
+
+
+class ResourceMonitor():
+    """ Measures the resources used by this process (and its children)
+    between calls to `start` and `stop`. Peak memory is sampled by a
+    background thread as the operating system only reports the peak for the
+    lifetime of a process.
+    """
+
+    def __init__(self, interval: float = SAMPLE_INTERVAL):
+        self.interval = interval
+        self.process = psutil.Process()
+        self._stop_event = threading.Event()
+        self._thread = None
+        self._peak_rss = 0
+
+    def _cpu_time(self) -> float:
+        times = self.process.cpu_times()
+        return (
+            times.user + times.system +
+            times.children_user + times.children_system
+        )
+
+    def _bytes_read(self) -> Optional[int]:
+        # io counters are not available on all platforms (eg; macOS)
+        if not hasattr(self.process, 'io_counters'):
+            return None
+        try:
+            return self.process.io_counters().read_bytes
+        except (psutil.AccessDenied, NotImplementedError):
+            return None
+
+    def _rss(self) -> int:
+        rss = self.process.memory_info().rss
+        try:
+            for child in self.process.children(recursive=True):
+                rss += child.memory_info().rss
+        except (psutil.NoSuchProcess, psutil.AccessDenied):
+            pass
+        return rss
+
+    def _sample(self) -> None:
+        while not self._stop_event.wait(self.interval):
+            self._peak_rss = max(self._peak_rss, self._rss())
+
+    def start(self) -> None:
+        self._start_wall = time.monotonic()
+        self._start_cpu = self._cpu_time()
+        self._start_read = self._bytes_read()
+        self._peak_rss = self._rss()
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._sample, daemon=True)
+        self._thread.start()
+
+    def stop(self) -> CheckTelemetry:
+        self._stop_event.set()
+        self._thread.join()
+        self._peak_rss = max(self._peak_rss, self._rss())
+
+        bytes_read = None
+        end_read = self._bytes_read()
+        if self._start_read is not None and end_read is not None:
+            bytes_read = end_read - self._start_read
+        return CheckTelemetry(
+            wall_time=time.monotonic() - self._start_wall,
+            cpu_time=self._cpu_time() - self._start_cpu,
+            peak_rss=self._peak_rss,
+            bytes_read=bytes_read
+        )
+
+
+class TelemetryWriter():
+    """ Appends telemetry records to a JSON lines (sidecar) file, one record
+    per check.
+    """
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+
+    def write(self, records: List[Dict]) -> None:
+        if len(records) == 0:
+            return
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        timestamp = datetime.now().isoformat()
+        with self.path.open('a') as f:
+            for record in records:
+                f.write(json.dumps(dict(record, timestamp=timestamp)) + '\n')
@@ -0,0 +1,429 @@
+""" Work queue shared between a coordinator (a CheckExecutor) and worker
+daemons that may be running on other hosts. The queue is a SQLite database,
+so it only needs to be stored on a file system all hosts can access (eg; the
+shared survey mount).
+
+Each job includes the QAJSON of the checks to be run, the check tool that
+runs them and the check options. Workers claim pending jobs, run the check
+tool and post the updated QAJSON back to the queue.
+"""
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+import json
+import logging
+import os
+import socket
+import sqlite3
+import threading
+import time
+
+from ausseabed.qajson.model import QajsonRoot
+from hyo2.qax.lib.check_options import CheckOption
+from hyo2.qax.lib.plugin import QaxCheckToolPlugin, QaxPlugins
+from hyo2.qax.lib.telemetry import CheckTelemetry, ResourceMonitor
+
+logger = logging.getLogger(__name__)
+
+# job status values
+JOB_PENDING = 'pending'
+JOB_RUNNING = 'running'
+JOB_DONE = 'done'
+JOB_FAILED = 'failed'
+JOB_CANCELLED = 'cancelled'
+
+# interval at which workers update the heartbeat of the job they are running
+HEARTBEAT_INTERVAL = 10.0
+# running jobs with no heartbeat for this number of seconds are assumed to
+# have been abandoned by their worker (eg; host crashed) and are requeued
+DEFAULT_STALE_TIMEOUT = 120.0
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    run_id TEXT NOT NULL,
+    job_id INTEGER NOT NULL,
+    profile_name TEXT NOT NULL,
+    check_tool_class TEXT NOT NULL,
+    options TEXT NOT NULL,
+    qajson TEXT NOT NULL,
+    status TEXT NOT NULL,
+    worker TEXT,
+    progress REAL NOT NULL DEFAULT 0.0,
+    updated_at REAL NOT NULL,
+    result TEXT,
+    telemetry TEXT,
+    error TEXT
+);
+CREATE INDEX IF NOT EXISTS jobs_status ON jobs (status, id);
+CREATE INDEX IF NOT EXISTS jobs_run ON jobs (run_id);
+"""
+
+
+def encode_options(options: Dict) -> str:
+    """ Encodes the options passed to check tools as JSON. Only CheckOption
+    values are included, executor options are not used by the workers.
+    """
+    return json.dumps({
+        k.value: v for k, v in options.items() if isinstance(k, CheckOption)
+    })
+
+
+def decode_options(encoded: str) -> Dict:
+    return {CheckOption(k): v for k, v in json.loads(encoded).items()}
+
+
+def default_worker_id() -> str:
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+class WorkItem():
+    """ A job claimed from the work queue by a worker
+    """
+
+    def __init__(
+            self,
+            id: int,
+            profile_name: str,
+            check_tool_class: str,
+            options: Dict,
+            qajson: Dict):
+        self.id = id
+        self.profile_name = profile_name
+        self.check_tool_class = check_tool_class
+        self.options = options
+        self.qajson = qajson
+
+    def __str__(self):
+        return f"WorkItem ({self.id}, {self.check_tool_class})"
+
+
+class WorkItemStatus():
+    """ Status of a job as seen by the coordinator
+    """
+
+    def __init__(self, id: int, job_id: int, status: str, progress: float):
+        self.id = id
+        self.job_id = job_id
+        self.status = status
+        self.progress = progress
+
+
+class WorkQueue():
+    """ SQLite backed queue of check jobs. Each process (or thread) should
+    create its own WorkQueue instance.
+    """
+
+    def __init__(self, path: Path, timeout: float = 60.0):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        # autocommit mode, transactions are started explicitly where a read
+        # and a write must be atomic
+        self._connection = sqlite3.connect(
+            str(self.path), timeout=timeout, isolation_level=None)
+        self._connection.executescript(_SCHEMA)
+
+    def close(self) -> None:
+        self._connection.close()
+
+    def submit(
+            self,
+            run_id: str,
+            job_id: int,
+            profile_name: str,
+            check_tool_class: str,
+            options: Dict,
+            qajson: Dict) -> int:
+        """ Adds a job to the queue, returns the id of the queued job
+        """
+        cursor = self._connection.execute(
+            "INSERT INTO jobs (run_id, job_id, profile_name, "
+            "check_tool_class, options, qajson, status, updated_at) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+            (
+                run_id, job_id, profile_name, check_tool_class,
+                encode_options(options), json.dumps(qajson), JOB_PENDING,
+                time.time()
+            )
+        )
+        return cursor.lastrowid
+
+    def claim(self, worker_id: str) -> Optional[WorkItem]:
+        """ Claims the oldest pending job, or returns None if there are no
+        pending jobs.
+        """
+        # an immediate transaction takes the write lock before reading, so
+        # two workers can't claim the same job
+        self._connection.execute("BEGIN IMMEDIATE")
+        try:
+            row = self._connection.execute(
+                "SELECT id, profile_name, check_tool_class, options, qajson "
+                "FROM jobs WHERE status = ? ORDER BY id LIMIT 1",
+                (JOB_PENDING,)
+            ).fetchone()
+            if row is not None:
+                self._connection.execute(
+                    "UPDATE jobs SET status = ?, worker = ?, updated_at = ? "
+                    "WHERE id = ?",
+                    (JOB_RUNNING, worker_id, time.time(), row[0])
+                )
+            self._connection.execute("COMMIT")
+        except Exception:
+            self._connection.execute("ROLLBACK")
+            raise
+
+        if row is None:
+            return None
+        id, profile_name, check_tool_class, options, qajson = row
+        return WorkItem(
+            id,
+            profile_name,
+            check_tool_class,
+            decode_options(options),
+            json.loads(qajson)
+        )
+
+    def _update_running(
+            self,
+            id: int,
+            worker_id: str,
+            sql: str,
+            params: tuple) -> bool:
+        """ Updates a job only if it is still running, and was claimed by the
+        worker. Returns False if the job has been cancelled, or requeued (and
+        possibly claimed by another worker).
+        """
+        cursor = self._connection.execute(
+            f"UPDATE jobs SET {sql}, updated_at = ? WHERE id = ? "
+            "AND status = ? AND worker = ?",
+            params + (time.time(), id, JOB_RUNNING, worker_id)
+        )
+        return cursor.rowcount == 1
+
+    def heartbeat(self, id: int, worker_id: str) -> bool:
+        return self._update_running(
+            id, worker_id, "progress = progress", ())
+
+    def set_progress(self, id: int, worker_id: str, progress: float) -> bool:
+        return self._update_running(
+            id, worker_id, "progress = ?", (progress,))
+
+    def complete(
+            self,
+            id: int,
+            worker_id: str,
+            qajson: Dict,
+            telemetry: Optional[CheckTelemetry] = None) -> bool:
+        return self._update_running(
+            id,
+            worker_id,
+            "status = ?, progress = 1.0, result = ?, telemetry = ?",
+            (
+                JOB_DONE,
+                json.dumps(qajson),
+                None if telemetry is None else json.dumps(telemetry.to_dict())
+            )
+        )
+
+    def fail(self, id: int, worker_id: str, error: str) -> bool:
+        return self._update_running(
+            id, worker_id, "status = ?, error = ?", (JOB_FAILED, error))
+
+    def is_running(self, id: int) -> bool:
+        row = self._connection.execute(
+            "SELECT status FROM jobs WHERE id = ?", (id,)).fetchone()
+        return row is not None and row[0] == JOB_RUNNING
+
+    def cancel(self, run_id: str) -> None:
+        """ Cancels all pending and running jobs of a run. Workers stop running
+        cancelled jobs the next time the check tool checks if it is stopped.
+        """
+        self._connection.execute(
+            "UPDATE jobs SET status = ?, updated_at = ? "
+            "WHERE run_id = ? AND status IN (?, ?)",
+            (JOB_CANCELLED, time.time(), run_id, JOB_PENDING, JOB_RUNNING)
+        )
+
+    def requeue_stale(self, stale_timeout: float) -> int:
+        """ Returns running jobs that have not had a heartbeat within the
+        timeout to the pending state. Returns the number of jobs requeued.
+        """
+        cursor = self._connection.execute(
+            "UPDATE jobs SET status = ?, worker = NULL, progress = 0.0 "
+            "WHERE status = ? AND updated_at < ?",
+            (JOB_PENDING, JOB_RUNNING, time.time() - stale_timeout)
+        )
+        if cursor.rowcount > 0:
+            logger.warning(f"Requeued {cursor.rowcount} abandoned jobs")
+        return cursor.rowcount
+
+    def statuses(self, run_id: str) -> List[WorkItemStatus]:
+        rows = self._connection.execute(
+            "SELECT id, job_id, status, progress FROM jobs WHERE run_id = ? "
+            "ORDER BY id",
+            (run_id,)
+        ).fetchall()
+        return [WorkItemStatus(*row) for row in rows]
+
+    def result(self, id: int) -> Dict:
+        """ Gets the QAJSON posted by the worker that completed a job
+        """
+        row = self._connection.execute(
+            "SELECT result FROM jobs WHERE id = ?", (id,)).fetchone()
+        return json.loads(row[0])
+
+    def telemetry(self, id: int) -> Optional[CheckTelemetry]:
+        """ Gets the resources used by the worker to run a job
+        """
+        row = self._connection.execute(
+            "SELECT telemetry FROM jobs WHERE id = ?", (id,)).fetchone()
+        if row is None or row[0] is None:
+            return None
+        return CheckTelemetry.from_dict(json.loads(row[0]))
+
+    def error(self, id: int) -> Optional[str]:
+        row = self._connection.execute(
+            "SELECT error FROM jobs WHERE id = ?", (id,)).fetchone()
+        return None if row is None else row[0]
+
+    def remove_run(self, run_id: str) -> None:
+        """ Removes all jobs of a run from the queue
+        """
+        self._connection.execute(
+            "DELETE FROM jobs WHERE run_id = ?", (run_id,))
+
+
+def _get_plugin(profile_name: str, check_tool_class: str) -> QaxCheckToolPlugin:
+    return QaxPlugins.instance().get_plugin(profile_name, check_tool_class)
+
+
+class _Heartbeat(threading.Thread):
+    """ Updates the heartbeat of a job while it runs, so the coordinator
+    knows the worker is still alive when the check tool doesn't report
+    progress for a long time.
+    """
+
+    def __init__(self, path: Path, id: int, worker_id: str):
+        super(_Heartbeat, self).__init__(daemon=True)
+        self.path = path
+        self.id = id
+        self.worker_id = worker_id
+        self.finished = threading.Event()
+        self.cancelled = threading.Event()
+
+    def run(self):
+        # sqlite connections can't be shared between threads
+        work_queue = WorkQueue(self.path)
+        try:
+            while not self.finished.wait(HEARTBEAT_INTERVAL):
+                if not work_queue.heartbeat(self.id, self.worker_id):
+                    self.cancelled.set()
+                    return
+        finally:
+            work_queue.close()
+
+
+class QueueWorker():
+    """ Pulls jobs from the work queue and runs them. `get_plugin` returns the
+    check tool for a profile name and check tool class name, by default this
+    is taken from the loaded QAX plugins.
+    """
+
+    def __init__(
+            self,
+            path: Path,
+            worker_id: Optional[str] = None,
+            get_plugin: Callable = _get_plugin):
+        self.path = Path(path)
+        self.worker_id = default_worker_id() if worker_id is None \
+            else worker_id
+        self.get_plugin = get_plugin
+        self.work_queue = WorkQueue(self.path)
+        self.stopped = False
+        self.jobs_run = 0
+
+    def stop(self) -> None:
+        self.stopped = True
+
+    def run_once(self) -> bool:
+        """ Claims and runs a single job. Returns False if there were no
+        pending jobs.
+        """
+        item = self.work_queue.claim(self.worker_id)
+        if item is None:
+            return False
+        logger.info(f"Worker {self.worker_id} running {item}")
+
+        heartbeat = _Heartbeat(self.path, item.id, self.worker_id)
+        heartbeat.start()
+
+        def progress_callback(check_tool, progress):
+            if not self.work_queue.set_progress(
+                    item.id, self.worker_id, progress):
+                heartbeat.cancelled.set()
+
+        def qajson_update_callback():
+            # the qajson is posted back once the job completes
+            pass
+
+        def is_stopped() -> bool:
+            return self.stopped or heartbeat.cancelled.is_set()
+
+        try:
+            check_tool = self.get_plugin(
+                item.profile_name, item.check_tool_class)
+            if check_tool is None:
+                raise RuntimeError(
+                    f"Check tool {item.check_tool_class} is not available in "
+                    f"profile {item.profile_name}")
+            check_tool.options = item.options
+            qa_json = QajsonRoot.from_dict(item.qajson)
+            monitor = ResourceMonitor()
+            monitor.start()
+            try:
+                check_tool.run(
+                    qa_json,
+                    progress_callback,
+                    qajson_update_callback,
+                    is_stopped
+                )
+            finally:
+                telemetry = monitor.stop()
+            if not self.work_queue.complete(
+                    item.id, self.worker_id, qa_json.to_dict(), telemetry):
+                logger.warning(
+                    f"Discarded the result of {item}, the job was cancelled "
+                    "or requeued")
+        except Exception as ex:
+            logger.error(f"Failed to run {item}")
+            logger.error(ex, exc_info=True)
+            self.work_queue.fail(item.id, self.worker_id, str(ex))
+        finally:
+            heartbeat.finished.set()
+            heartbeat.join()
+        self.jobs_run += 1
+        return True
+
+    def run(
+            self,
+            poll_interval: float = 1.0,
+            idle_timeout: Optional[float] = None,
+            max_jobs: Optional[int] = None) -> None:
+        """ Runs jobs until stopped. If `idle_timeout` is given the worker
+        will also stop once no jobs have been available for this number of
+        seconds, and if `max_jobs` is given once it has run this number of
+        jobs.
+        """
+        idle_since = time.monotonic()
+        while not self.stopped:
+            if max_jobs is not None and self.jobs_run >= max_jobs:
+                break
+            if self.run_once():
+                idle_since = time.monotonic()
+                continue
+            if (
+                idle_timeout is not None and
+                time.monotonic() - idle_since > idle_timeout
+            ):
+                break
+            time.sleep(poll_interval)
+        self.work_queue.close()
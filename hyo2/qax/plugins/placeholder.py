@@ -13,6 +13,9 @@ class PlaceholderQaxPlugin(QaxCheckToolPlugin):
 
     supported_file_types = []
 
+    # has no checks, and keeps no state
+    shared_instance = True
+
     def __init__(self):
         super(PlaceholderQaxPlugin, self).__init__()
 
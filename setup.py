@@ -46,11 +46,14 @@ setup(
         "setuptools_scm",
     ],
     install_requires=[
+        "click",
         "jsonschema",
+        "psutil",
     ],
     extras_require={
         "QCTools": ["hyo2.qc"],
         "Mate": ["hyo2.mate"],
+        "Parquet": ["pyarrow"],
     },
     python_requires='>=3.5',
     entry_points={
@@ -58,6 +61,9 @@ setup(
             'qax = hyo2.qax.app.gui:gui',
         ],
         "console_scripts": [
+            'qax-run = hyo2.qax.app.cli:main',
+            'qax-worker = hyo2.qax.app.cli:worker_main',
+            'qax-events = hyo2.qax.app.cli:events_main',
         ],
     },
     test_suite="tests",
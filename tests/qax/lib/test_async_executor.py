@@ -0,0 +1,67 @@
+import asyncio
+import time
+import unittest
+
+from ausseabed.qajson.model import QajsonRoot
+from hyo2.qax.lib.async_executor import AsyncCheckExecutor
+from hyo2.qax.lib.check_executor import ChecksCompleteQueueItem, \
+    StatusQueueItem
+from hyo2.qax.lib.check_options import ExecutorOption
+
+from tests.qax.lib.test_check_executor import _qa_json_dict, \
+    StateCheckToolPlugin, HangingCheckToolPlugin
+
+
+class TestAsyncCheckExecutor(unittest.TestCase):
+
+    def _build_executor(self, workers: int) -> AsyncCheckExecutor:
+        qa_json = QajsonRoot.from_dict(_qa_json_dict())
+        executor = AsyncCheckExecutor(
+            qa_json,
+            'test profile',
+            [],
+            {ExecutorOption.workers: workers}
+        )
+        executor.process.check_tools = [
+            StateCheckToolPlugin("1", "pass"),
+            StateCheckToolPlugin("2", "fail"),
+        ]
+        return executor
+
+    def test_run(self):
+        executor = self._build_executor(workers=2)
+
+        async def run():
+            task = asyncio.create_task(executor.run())
+            events = [event async for event in executor.events()]
+            return await task, events
+
+        qa_json, events = asyncio.run(run())
+        self.assertEqual(executor.status, "Complete")
+        self.assertEqual(
+            [c.outputs.check_state for c in qa_json.qa.survey_products.checks],
+            ["pass", "fail", "pass", "fail"]
+        )
+        self.assertTrue(
+            any([isinstance(e, ChecksCompleteQueueItem) for e in events]))
+        self.assertIn(
+            "Complete",
+            [e.status for e in events if isinstance(e, StatusQueueItem)]
+        )
+
+    def test_cancel(self):
+        executor = self._build_executor(workers=2)
+        executor.process.check_tools[1] = HangingCheckToolPlugin("2", "fail")
+
+        async def run():
+            task = asyncio.create_task(executor.run())
+            await asyncio.sleep(1.0)
+            task.cancel()
+            with self.assertRaises(asyncio.CancelledError):
+                await task
+
+        start = time.monotonic()
+        asyncio.run(run())
+        self.assertEqual(executor.status, "Stopped")
+        self.assertFalse(executor.process.is_alive())
+        self.assertLess(time.monotonic() - start, 60)
@@ -0,0 +1,60 @@
+from pathlib import Path
+import tempfile
+import unittest
+
+from ausseabed.qajson.model import QajsonRoot
+from hyo2.qax.lib.check_cache import CheckCache
+from hyo2.qax.lib.check_executor import get_check
+from hyo2.qax.lib.check_journal import check_fingerprint
+
+from tests.qax.lib.test_check_executor import _qa_json_dict, \
+    StateCheckToolPlugin
+
+
+class TestCheckCache(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.cache_folder = Path(self.temp_dir.name)
+        self.qa_json = QajsonRoot.from_dict(_qa_json_dict())
+        StateCheckToolPlugin("1", "pass").run(
+            self.qa_json, lambda p, v: None, lambda: None)
+        self.check_a = get_check(self.qa_json, ('survey_products', 0))
+        self.check_b = get_check(self.qa_json, ('survey_products', 2))
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def test_get_put(self):
+        cache = CheckCache(self.cache_folder)
+        key = check_fingerprint(self.check_a)
+        self.assertIsNone(cache.get(key))
+        cache.put(key, self.check_a)
+        self.assertEqual(cache.get(key).check_state, "pass")
+        self.assertEqual(cache.stats.hits, 1)
+        self.assertEqual(cache.stats.misses, 1)
+        self.assertEqual(cache.stats.stores, 1)
+
+        # entries persist between instances
+        cache = CheckCache(self.cache_folder)
+        self.assertEqual(len(cache), 1)
+        self.assertEqual(cache.get(key).check_state, "pass")
+
+    def test_lru_eviction(self):
+        cache = CheckCache(self.cache_folder)
+        key_a = check_fingerprint(self.check_a)
+        key_b = check_fingerprint(self.check_b)
+        cache.put(key_a, self.check_a)
+        entry_size = cache.size
+
+        # room for two entries only
+        cache.max_size = entry_size * 2
+        cache.put(key_b, self.check_b)
+        # use entry a so that b is the least recently used
+        cache.get(key_a)
+        cache.put('c' * 64, self.check_a)
+
+        self.assertIn(key_a, cache)
+        self.assertNotIn(key_b, cache)
+        self.assertEqual(cache.stats.evictions, 1)
+        self.assertLessEqual(cache.size, cache.max_size)
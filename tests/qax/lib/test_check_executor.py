@@ -0,0 +1,705 @@
+from pathlib import Path
+from typing import Callable, List, NoReturn
+import json
+import multiprocessing as mp
+import tempfile
+import time
+import unittest
+
+from ausseabed.qajson.model import QajsonRoot, QajsonOutputs
+from hyo2.qax.lib.check_executor import CheckExecutor, build_sub_qajson, \
+    get_check_refs, get_sub_qajson_outputs, group_check_refs_by_files, \
+    QajsonChangeTracker, QajsonPatchQueueItem, get_check, EventCoalescer, \
+    ProgressQueueItem, StatusQueueItem, SharedMemoryTransport, \
+    SharedPayloadHandle, SharedPayloadStore, WorkerPool
+from hyo2.qax.lib.check_options import CheckOption, ExecutorOption
+from hyo2.qax.lib.plugin import QaxCheckToolPlugin, QaxCheckReference, \
+    QaxFileType
+
+
+def _qa_json_dict() -> dict:
+    def check(check_id: str, path: str) -> dict:
+        return {
+            "info": {
+                "id": check_id,
+                "name": f"check {check_id}",
+                "version": "1",
+                "group": {"id": "", "name": ""}
+            },
+            "inputs": {
+                "files": [
+                    {"path": path, "file_type": "Survey DTMs"}
+                ]
+            }
+        }
+
+    return {
+        "qa": {
+            "version": "0.1.4",
+            "raw_data": {"checks": []},
+            "survey_products": {
+                "checks": [
+                    check("1", "file1.tif"),
+                    check("2", "file1.tif"),
+                    check("1", "file2.tif"),
+                    check("2", "file2.tif"),
+                ]
+            }
+        }
+    }
+
+
+class StateCheckToolPlugin(QaxCheckToolPlugin):
+    """ Test plugin that sets the check_state of each check it implements to
+    a fixed value
+    """
+
+    supported_file_types = [
+        QaxFileType(
+            name="GeoTIFF file",
+            extension="tif",
+            group="Survey DTMs"
+        )
+    ]
+
+    def __init__(self, check_id: str, check_state: str):
+        super(StateCheckToolPlugin, self).__init__()
+        self.name = f'State check {check_id}'
+        self.plugin_class = f'StateCheckToolPlugin{check_id}'
+        self.check_state = check_state
+        self._check_references = [
+            QaxCheckReference(
+                id=check_id,
+                name=f"check {check_id}",
+                data_level="survey_products",
+                supported_file_types=StateCheckToolPlugin.supported_file_types
+            )
+        ]
+
+    def checks(self) -> List[QaxCheckReference]:
+        return self._check_references
+
+    def run(
+            self,
+            qajson: QajsonRoot,
+            progress_callback: Callable = None,
+            qajson_update_callback: Callable = None,
+            is_stopped: Callable = None
+    ) -> NoReturn:
+        checks = self._get_qajson_checks(qajson)
+        for i, check in enumerate(checks):
+            check.outputs = QajsonOutputs.from_dict({
+                "execution": {"status": "completed"},
+                "files": [],
+                "check_state": self.check_state
+            })
+            progress_callback(self, (i + 1) / len(checks))
+        qajson_update_callback()
+
+    def stop(self):
+        pass
+
+
+class HangingCheckToolPlugin(StateCheckToolPlugin):
+    """ Test plugin that never completes, and ignores stop requests
+    """
+
+    def run(
+            self,
+            qajson: QajsonRoot,
+            progress_callback: Callable = None,
+            qajson_update_callback: Callable = None,
+            is_stopped: Callable = None
+    ) -> NoReturn:
+        while True:
+            time.sleep(0.1)
+
+
+class TileSizeCheckToolPlugin(StateCheckToolPlugin):
+    """ Test plugin that raises an error unless the grid processing tile size
+    is below a limit
+    """
+
+    def __init__(self, check_id: str, check_state: str, max_tile_size: int):
+        super(TileSizeCheckToolPlugin, self).__init__(check_id, check_state)
+        self.max_tile_size = max_tile_size
+
+    def run(
+            self,
+            qajson: QajsonRoot,
+            progress_callback: Callable = None,
+            qajson_update_callback: Callable = None,
+            is_stopped: Callable = None
+    ) -> NoReturn:
+        tile_size = self.gridprocessing_tile_x
+        if tile_size is None or tile_size > self.max_tile_size:
+            raise MemoryError(f"Tile size {tile_size} is too large")
+        super(TileSizeCheckToolPlugin, self).run(
+            qajson, progress_callback, qajson_update_callback, is_stopped)
+
+
+class PartialCheckToolPlugin(StateCheckToolPlugin):
+    """ Test plugin that completes the first of its checks, and then raises
+    an error
+    """
+
+    def run(
+            self,
+            qajson: QajsonRoot,
+            progress_callback: Callable = None,
+            qajson_update_callback: Callable = None,
+            is_stopped: Callable = None
+    ) -> NoReturn:
+        check = self._get_qajson_checks(qajson)[0]
+        check.outputs = QajsonOutputs.from_dict({
+            "execution": {"status": "completed"},
+            "files": [],
+            "check_state": self.check_state
+        })
+        qajson_update_callback()
+        raise RuntimeError("Failed after the first check")
+
+
+class FirstCheckToolPlugin(StateCheckToolPlugin):
+    """ Test plugin that reports an update before it starts, and then only
+    completes the first of its checks
+    """
+
+    def run(
+            self,
+            qajson: QajsonRoot,
+            progress_callback: Callable = None,
+            qajson_update_callback: Callable = None,
+            is_stopped: Callable = None
+    ) -> NoReturn:
+        qajson_update_callback()
+        check = self._get_qajson_checks(qajson)[0]
+        check.outputs = QajsonOutputs.from_dict({
+            "execution": {"status": "completed"},
+            "files": [],
+            "check_state": self.check_state
+        })
+        qajson_update_callback()
+
+
+class PartialHangingCheckToolPlugin(StateCheckToolPlugin):
+    """ Test plugin that completes the first of its checks, and then never
+    completes
+    """
+
+    def run(
+            self,
+            qajson: QajsonRoot,
+            progress_callback: Callable = None,
+            qajson_update_callback: Callable = None,
+            is_stopped: Callable = None
+    ) -> NoReturn:
+        check = self._get_qajson_checks(qajson)[0]
+        check.outputs = QajsonOutputs.from_dict({
+            "execution": {"status": "completed"},
+            "files": [],
+            "check_state": self.check_state
+        })
+        qajson_update_callback()
+        while True:
+            time.sleep(0.1)
+
+
+class TestCheckExecutor(unittest.TestCase):
+
+    def _build_executor(
+            self,
+            workers: int,
+            split_by_file_group: bool = False) -> CheckExecutor:
+        qa_json = QajsonRoot.from_dict(_qa_json_dict())
+        executor = CheckExecutor(qa_json, 'test profile', [])
+        executor.check_tools = [
+            StateCheckToolPlugin("1", "pass"),
+            StateCheckToolPlugin("2", "fail"),
+        ]
+        executor.options = {
+            ExecutorOption.workers: workers,
+            ExecutorOption.split_by_file_group: split_by_file_group,
+        }
+        return executor
+
+    def _check_states(self, executor: CheckExecutor) -> List[str]:
+        return [
+            check.outputs.check_state
+            for check in executor.qa_json.qa.survey_products.checks
+        ]
+
+    def test_get_check_refs(self):
+        qa_json = QajsonRoot.from_dict(_qa_json_dict())
+        check_refs = get_check_refs(qa_json, StateCheckToolPlugin("2", "pass"))
+        self.assertEqual(
+            check_refs, [('survey_products', 1), ('survey_products', 3)])
+
+    def test_group_check_refs_by_files(self):
+        qa_json = QajsonRoot.from_dict(_qa_json_dict())
+        check_refs = [('survey_products', i) for i in range(4)]
+        groups = group_check_refs_by_files(qa_json, check_refs)
+        self.assertEqual(
+            groups,
+            [
+                [('survey_products', 0), ('survey_products', 1)],
+                [('survey_products', 2), ('survey_products', 3)],
+            ]
+        )
+
+    def test_sub_qajson(self):
+        qa_json = QajsonRoot.from_dict(_qa_json_dict())
+        check_refs = [('survey_products', 2), ('survey_products', 3)]
+        sub_qa_json = build_sub_qajson(qa_json, check_refs)
+        self.assertEqual(len(sub_qa_json.qa.survey_products.checks), 2)
+
+        outputs = get_sub_qajson_outputs(sub_qa_json, check_refs)
+        self.assertEqual([ref for ref, _ in outputs], check_refs)
+
+    def test_run_sequential(self):
+        executor = self._build_executor(workers=1)
+        executor.run()
+        self.assertEqual(executor.status, "Complete")
+        self.assertEqual(
+            self._check_states(executor), ["pass", "fail", "pass", "fail"])
+
+    def test_run_sequential_reports_updates(self):
+        executor = self._build_executor(workers=1)
+        updated = []
+        executor._qajson_update_callback = \
+            lambda check_refs=None: updated.extend(check_refs or [])
+        executor.run()
+        # the checks of each check tool are reported once it finishes, even
+        # if the check tool doesn't report its changes
+        self.assertEqual(
+            sorted(set(updated)),
+            [("survey_products", i) for i in range(4)])
+
+    def test_run_parallel(self):
+        executor = self._build_executor(workers=2)
+        executor.run()
+        self.assertEqual(executor.status, "Complete")
+        self.assertEqual(
+            self._check_states(executor), ["pass", "fail", "pass", "fail"])
+
+    def test_run_parallel_split_by_file_group(self):
+        executor = self._build_executor(workers=4, split_by_file_group=True)
+        self.assertEqual(len(executor._build_jobs()), 4)
+        executor.run()
+        self.assertEqual(executor.status, "Complete")
+        self.assertEqual(
+            self._check_states(executor), ["pass", "fail", "pass", "fail"])
+
+    def test_resume(self):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            checkpoint_file = str(Path(temp_dir).joinpath('journal.jsonl'))
+            executor = self._build_executor(workers=1)
+            executor.options[ExecutorOption.checkpoint_file] = checkpoint_file
+            executor.run()
+            self.assertEqual(len(executor.journal), 4)
+
+            executor = self._build_executor(workers=2)
+            executor.options[ExecutorOption.checkpoint_file] = checkpoint_file
+            executor.options[ExecutorOption.resume] = True
+            # all checks are restored from the journal, so no jobs are run
+            executor._open_journal()
+            self.assertEqual(len(executor._build_jobs()), 0)
+            executor.run()
+            self.assertEqual(executor.status, "Complete")
+            self.assertEqual(
+                self._check_states(executor), ["pass", "fail", "pass", "fail"])
+
+    def test_cache(self):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            executor = self._build_executor(workers=1)
+            executor.options[ExecutorOption.cache_folder] = temp_dir
+            executor.run()
+            self.assertEqual(executor.cache.stats.misses, 4)
+            self.assertEqual(executor.cache.stats.stores, 4)
+
+            executor = self._build_executor(workers=1)
+            executor.options[ExecutorOption.cache_folder] = temp_dir
+            executor.run()
+            self.assertEqual(executor.cache.stats.hits, 4)
+            self.assertEqual(executor.cache.stats.stores, 0)
+            self.assertEqual(
+                self._check_states(executor), ["pass", "fail", "pass", "fail"])
+
+    def test_previous_outputs_not_recorded(self):
+        for workers in [1, 2]:
+            with tempfile.TemporaryDirectory() as temp_dir:
+                checkpoint_file = str(
+                    Path(temp_dir).joinpath('journal.jsonl'))
+                executor = self._build_executor(workers=workers)
+                executor.check_tools[0] = FirstCheckToolPlugin("1", "pass")
+                executor.options[ExecutorOption.checkpoint_file] = \
+                    checkpoint_file
+                # outputs of a previous run, included in an opened qajson
+                for check in executor.qa_json.qa.survey_products.checks:
+                    check.outputs = QajsonOutputs.from_dict({
+                        "execution": {"status": "completed"},
+                        "files": [],
+                        "check_state": "previous"
+                    })
+                executor.run()
+                self.assertEqual(executor.status, "Complete")
+                self.assertEqual(
+                    self._check_states(executor),
+                    ["pass", "fail", "previous", "fail"])
+
+                # only the outputs of this run are journaled
+                self.assertEqual(len(executor.journal), 3)
+                executor = self._build_executor(workers=1)
+                executor.options[ExecutorOption.checkpoint_file] = \
+                    checkpoint_file
+                executor.options[ExecutorOption.resume] = True
+                executor._open_journal()
+                self.assertEqual(
+                    executor._restore_checks(
+                        [("survey_products", i) for i in range(4)]),
+                    [("survey_products", 2)])
+                checks = executor.qa_json.qa.survey_products.checks
+                self.assertEqual(checks[0].outputs.check_state, "pass")
+
+    def test_check_timeout(self):
+        executor = self._build_executor(workers=2)
+        executor.check_tools[1] = HangingCheckToolPlugin("2", "fail")
+        executor.options[ExecutorOption.check_timeout] = 0.5
+        executor.run()
+        self.assertEqual(executor.status, "Complete")
+
+        checks = executor.qa_json.qa.survey_products.checks
+        self.assertEqual(checks[0].outputs.check_state, "pass")
+        self.assertEqual(checks[1].outputs.execution.status, "aborted")
+        self.assertIn("time budget", checks[1].outputs.execution.error)
+
+    def test_run_timeout(self):
+        executor = self._build_executor(workers=1)
+        executor.check_tools[0] = HangingCheckToolPlugin("1", "pass")
+        executor.options[ExecutorOption.run_timeout] = 0.5
+        executor.run()
+        self.assertEqual(executor.status, "Stopped")
+        self.assertEqual(
+            [
+                check.outputs.execution.status
+                for check in executor.qa_json.qa.survey_products.checks
+            ],
+            ["aborted"] * 4
+        )
+
+    def test_telemetry(self):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            telemetry_file = Path(temp_dir).joinpath('telemetry.jsonl')
+            executor = self._build_executor(workers=2)
+            executor.options[ExecutorOption.telemetry_file] = \
+                str(telemetry_file)
+            executor.options[ExecutorOption.telemetry_in_outputs] = True
+            executor.run()
+
+            lines = telemetry_file.read_text().strip().split('\n')
+            self.assertEqual(len(lines), 4)
+            for check in executor.qa_json.qa.survey_products.checks:
+                self.assertIn('wall_time', check.outputs.data['telemetry'])
+
+    def test_continue_on_error(self):
+        for workers in [1, 2]:
+            executor = self._build_executor(workers=workers)
+            executor.check_tools[0] = TileSizeCheckToolPlugin("1", "pass", 0)
+            executor.options[ExecutorOption.continue_on_error] = True
+            executor.run()
+            self.assertEqual(executor.status, "Complete")
+
+            checks = executor.qa_json.qa.survey_products.checks
+            self.assertEqual(checks[0].outputs.execution.status, "failed")
+            self.assertIn("too large", checks[0].outputs.execution.error)
+            self.assertEqual(checks[1].outputs.check_state, "fail")
+            self.assertEqual(checks[3].outputs.check_state, "fail")
+
+    def test_continue_on_error_keeps_completed(self):
+        for workers in [1, 2]:
+            executor = self._build_executor(workers=workers)
+            executor.check_tools[0] = PartialCheckToolPlugin("1", "pass")
+            executor.options[ExecutorOption.continue_on_error] = True
+            executor.run()
+            self.assertEqual(executor.status, "Complete")
+
+            checks = executor.qa_json.qa.survey_products.checks
+            self.assertEqual(checks[0].outputs.execution.status, "completed")
+            self.assertEqual(checks[0].outputs.check_state, "pass")
+            self.assertEqual(checks[2].outputs.execution.status, "failed")
+            self.assertEqual(checks[3].outputs.check_state, "fail")
+
+    def test_abort_keeps_completed(self):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            checkpoint_file = str(Path(temp_dir).joinpath('checkpoint.jsonl'))
+            executor = self._build_executor(workers=2)
+            executor.check_tools[0] = \
+                PartialHangingCheckToolPlugin("1", "pass")
+            executor.options[ExecutorOption.check_timeout] = 0.5
+            executor.options[ExecutorOption.checkpoint_file] = checkpoint_file
+            executor.run()
+
+            checks = executor.qa_json.qa.survey_products.checks
+            self.assertEqual(checks[0].outputs.execution.status, "completed")
+            self.assertEqual(checks[2].outputs.execution.status, "aborted")
+            self.assertEqual(checks[3].outputs.check_state, "fail")
+
+            # the check completed by the aborted job was journaled, and is
+            # not run again when resumed
+            executor = self._build_executor(workers=1)
+            executor.check_tools[0] = HangingCheckToolPlugin("1", "pass")
+            executor.options[ExecutorOption.checkpoint_file] = checkpoint_file
+            executor.options[ExecutorOption.resume] = True
+            executor._open_journal()
+            self.assertEqual(
+                executor._restore_checks(
+                    get_check_refs(executor.qa_json, executor.check_tools[0])),
+                [("survey_products", 2)])
+
+    def test_retry_failed(self):
+        for workers in [1, 2]:
+            executor = self._build_executor(workers=workers)
+            executor.check_tools[0] = \
+                TileSizeCheckToolPlugin("1", "pass", 1000)
+            executor.options[ExecutorOption.continue_on_error] = True
+            executor.options[ExecutorOption.retry_failed] = True
+            executor.options[CheckOption.gridprocessing_tile_x] = 2000
+            executor.options[CheckOption.gridprocessing_tile_y] = 2000
+            executor.run()
+            self.assertEqual(executor.status, "Complete")
+            self.assertEqual(
+                self._check_states(executor),
+                ["pass", "fail", "pass", "fail"]
+            )
+
+    def test_reused_worker_pool(self):
+        pool = WorkerPool(0, mp.Queue(), mp.Event())
+        try:
+            executor = self._build_executor(workers=2)
+            executor.worker_pool = pool
+            executor.options[ExecutorOption.max_jobs_per_worker] = 0
+            executor.run()
+            self.assertEqual(executor.status, "Complete")
+            self.assertEqual(pool.size, 2)
+            pids = [w.process.pid for w in pool.workers]
+
+            # workers are still running, and are used by the next run
+            executor = self._build_executor(workers=2)
+            executor.worker_pool = pool
+            executor.options[ExecutorOption.max_jobs_per_worker] = 0
+            executor.run()
+            self.assertEqual(
+                self._check_states(executor), ["pass", "fail", "pass", "fail"])
+            self.assertEqual([w.process.pid for w in pool.workers], pids)
+            self.assertEqual(sum([w.jobs_run for w in pool.workers]), 4)
+        finally:
+            pool.close()
+
+    def test_worker_recycling(self):
+        pool = WorkerPool(0, mp.Queue(), mp.Event())
+        try:
+            executor = self._build_executor(workers=1, split_by_file_group=True)
+            executor.worker_pool = pool
+            executor.options[ExecutorOption.max_jobs_per_worker] = 1
+            executor.options[ExecutorOption.check_timeout] = 60
+            executor.run()
+            self.assertEqual(executor.status, "Complete")
+            self.assertEqual(
+                self._check_states(executor), ["pass", "fail", "pass", "fail"])
+            # each worker is replaced after running a single job
+            self.assertEqual(pool.size, 1)
+            self.assertEqual(pool.workers[0].jobs_run, 0)
+        finally:
+            pool.close()
+
+    def test_change_tracker(self):
+        qa_json = QajsonRoot.from_dict(_qa_json_dict())
+        tracker = QajsonChangeTracker(qa_json)
+        self.assertEqual(tracker.changed_check_refs(qa_json), [])
+
+        plugin = StateCheckToolPlugin("2", "fail")
+        plugin.run(qa_json, lambda p, v: None, lambda: None)
+        self.assertEqual(
+            tracker.changed_check_refs(qa_json),
+            [('survey_products', 1), ('survey_products', 3)]
+        )
+        self.assertEqual(tracker.changed_check_refs(qa_json), [])
+
+    def test_patch(self):
+        qa_json = QajsonRoot.from_dict(_qa_json_dict())
+        other_qa_json = QajsonRoot.from_dict(_qa_json_dict())
+        StateCheckToolPlugin("1", "pass").run(
+            qa_json, lambda p, v: None, lambda: None)
+
+        check_refs = get_check_refs(qa_json, StateCheckToolPlugin("1", "pass"))
+        patch = QajsonPatchQueueItem([
+            (check_ref, get_check(qa_json, check_ref).outputs)
+            for check_ref in check_refs
+        ])
+        patch.apply(other_qa_json)
+        self.assertEqual(
+            other_qa_json.qa.survey_products.checks[2].outputs.check_state,
+            "pass"
+        )
+
+
+class TestEventCoalescer(unittest.TestCase):
+
+    def setUp(self):
+        self.now = 0.0
+        self.sent = []
+        self.coalescer = EventCoalescer(
+            self.sent.append, max_rate=2.0, clock=lambda: self.now)
+
+    def test_rate_limit(self):
+        for i in range(10):
+            self.coalescer.put(ProgressQueueItem('a', i / 10))
+        # first item is sent, the remainder are merged into a single held item
+        self.assertEqual(len(self.sent), 1)
+        self.assertEqual(self.coalescer.merged_count, 8)
+
+        self.now = 1.0
+        self.coalescer.put(ProgressQueueItem('b', 0.5))
+        self.assertEqual(
+            [(i.check_tool_class_name, i.progress) for i in self.sent],
+            [('a', 0.0), ('a', 0.9), ('b', 0.5)]
+        )
+
+    def test_terminal_items_pass(self):
+        self.coalescer.put(StatusQueueItem("Running"))
+        self.coalescer.put(ProgressQueueItem('a', 0.1))
+        self.coalescer.put(ProgressQueueItem('a', 0.2))
+        self.coalescer.put(ProgressQueueItem('a', 1.0))
+        self.coalescer.put(StatusQueueItem("Stopping"))
+        self.coalescer.put(StatusQueueItem("Complete"))
+
+        self.assertEqual(self.coalescer.dropped_count, 2)
+        self.assertEqual(
+            [str(i) for i in self.sent],
+            [
+                "StatusQueueItem (Running)",
+                "ProgressQueueItem (a, 0.1)",
+                "ProgressQueueItem (a, 1.0)",
+                "StatusQueueItem (Complete)",
+            ]
+        )
+
+    def test_flush_due(self):
+        self.coalescer.put(ProgressQueueItem('a', 0.1))
+        self.coalescer.put(ProgressQueueItem('a', 0.2))
+        self.coalescer.flush_due()
+        self.assertEqual(len(self.sent), 1)
+
+        # held item is sent once due, without another item being put
+        self.now = 0.5
+        self.coalescer.flush_due()
+        self.assertEqual(
+            [i.progress for i in self.sent], [0.1, 0.2])
+
+    def test_flush_thread(self):
+        sent = []
+        coalescer = EventCoalescer(sent.append, max_rate=20.0)
+        coalescer.start()
+        try:
+            coalescer.put(ProgressQueueItem('a', 0.1))
+            coalescer.put(ProgressQueueItem('a', 0.2))
+            deadline = time.monotonic() + 5.0
+            while len(sent) < 2 and time.monotonic() < deadline:
+                time.sleep(0.01)
+        finally:
+            coalescer.close()
+        self.assertEqual([i.progress for i in sent], [0.1, 0.2])
+
+
+class TestSharedMemoryTransport(unittest.TestCase):
+
+    feature_collection = {"type": "FeatureCollection", "features": [
+        {"type": "Feature", "properties": {"id": i}}
+        for i in range(100)
+    ]}
+
+    def test_round_trip(self):
+        outputs = QajsonOutputs.from_dict({
+            "execution": {"status": "completed"},
+            "files": [],
+            "data": {
+                "map": self.feature_collection,
+                "fliers": [[i, i * 0.5] for i in range(100)],
+                "summary": {"count": 3},
+                "count": 3
+            }
+        })
+        transport = SharedMemoryTransport(threshold=256)
+        packed = transport.pack_outputs(outputs)
+
+        # the original outputs are not modified
+        self.assertIs(outputs.data['map'], self.feature_collection)
+        # only payloads above the threshold are passed via shared memory
+        self.assertIsInstance(packed.data['map'], SharedPayloadHandle)
+        self.assertIsInstance(packed.data['fliers'], SharedPayloadHandle)
+        self.assertEqual(packed.data['summary'], {"count": 3})
+        self.assertEqual(packed.data['count'], 3)
+
+        store = SharedPayloadStore()
+        unpacked = store.unpack_outputs(packed)
+        self.assertEqual(unpacked.data['map'], self.feature_collection)
+        self.assertEqual(unpacked.data['fliers'], outputs.data['fliers'])
+
+        # blocks are freed by the sender once received
+        transport.close(timeout=0.0)
+        self.assertEqual(len(transport._blocks), 0)
+
+    def test_save_unpacked_patch(self):
+        qa_json = QajsonRoot.from_dict(_qa_json_dict())
+        outputs = QajsonOutputs.from_dict({
+            "execution": {"status": "completed"},
+            "files": [],
+            "data": {"map": self.feature_collection}
+        })
+        transport = SharedMemoryTransport(threshold=256)
+        patch = QajsonPatchQueueItem(
+            [(('survey_products', 0), transport.pack_outputs(outputs))])
+
+        SharedPayloadStore().unpack_patch(patch)
+        patch.apply(qa_json)
+        transport.close(timeout=0.0)
+
+        # the qajson can be saved once the shared memory has been freed
+        saved = json.loads(json.dumps(qa_json.to_dict()))
+        self.assertEqual(
+            saved['qa']['survey_products']['checks'][0]['outputs']['data'],
+            {"map": self.feature_collection})
+
+    def test_not_serialisable(self):
+        outputs = QajsonOutputs.from_dict({
+            "execution": {"status": "completed"},
+            "files": [],
+            "data": {"raw": [object()] * 1024}
+        })
+        transport = SharedMemoryTransport(threshold=256)
+        packed = transport.pack_outputs(outputs)
+        self.assertIs(packed, outputs)
+
+    def test_close_frees_blocks_not_received(self):
+        outputs = QajsonOutputs.from_dict({
+            "execution": {"status": "completed"},
+            "files": [],
+            "data": {"map": self.feature_collection}
+        })
+        transport = SharedMemoryTransport(threshold=256)
+        packed = transport.pack_outputs(outputs)
+        transport.close(timeout=0.0)
+
+        store = SharedPayloadStore()
+        unpacked = store.unpack_outputs(packed)
+        self.assertIsNone(unpacked.data['map'])
+
+    def test_below_threshold(self):
+        outputs = QajsonOutputs.from_dict({
+            "execution": {"status": "completed"},
+            "files": [],
+            "data": {"map": {"type": "FeatureCollection", "features": []}}
+        })
+        transport = SharedMemoryTransport(threshold=1024)
+        packed = transport.pack_outputs(outputs)
+        self.assertIs(packed, outputs)
@@ -0,0 +1,58 @@
+from pathlib import Path
+import tempfile
+import unittest
+
+from ausseabed.qajson.model import QajsonRoot
+from hyo2.qax.lib.check_executor import get_check
+from hyo2.qax.lib.check_journal import CheckJournal, check_fingerprint
+from hyo2.qax.lib.check_options import CheckOption, ExecutorOption
+
+from tests.qax.lib.test_check_executor import _qa_json_dict, \
+    StateCheckToolPlugin
+
+
+class TestCheckJournal(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.journal_path = Path(self.temp_dir.name).joinpath('journal.jsonl')
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def test_check_fingerprint(self):
+        qa_json = QajsonRoot.from_dict(_qa_json_dict())
+        check_a = get_check(qa_json, ('survey_products', 0))
+        check_b = get_check(qa_json, ('survey_products', 2))
+        self.assertNotEqual(
+            check_fingerprint(check_a), check_fingerprint(check_b))
+
+        # executor options do not change the outputs of a check
+        self.assertEqual(
+            check_fingerprint(check_a),
+            check_fingerprint(check_a, {ExecutorOption.workers: 4})
+        )
+        self.assertNotEqual(
+            check_fingerprint(check_a),
+            check_fingerprint(check_a, {CheckOption.gridprocessing_tile_x: 10})
+        )
+
+    def test_round_trip(self):
+        qa_json = QajsonRoot.from_dict(_qa_json_dict())
+        StateCheckToolPlugin("1", "pass").run(
+            qa_json, lambda p, v: None, lambda: None)
+        check = get_check(qa_json, ('survey_products', 0))
+        key = check_fingerprint(check)
+
+        journal = CheckJournal(self.journal_path)
+        journal.clear()
+        journal.record(key, check)
+        # simulate a partially written entry
+        with self.journal_path.open('a') as f:
+            f.write('{"key": "abc", "outp')
+
+        journal = CheckJournal(self.journal_path)
+        journal.load()
+        self.assertEqual(len(journal), 1)
+        self.assertEqual(journal.get(key).check_state, "pass")
+        self.assertIsNone(journal.get('abc'))
@@ -0,0 +1,102 @@
+from pathlib import Path
+import logging
+import tempfile
+import unittest
+
+from ausseabed.qajson.model import QajsonRoot
+from hyo2.qax.lib.check_executor import CheckExecutor, StatusQueueItem
+from hyo2.qax.lib.check_options import ExecutorOption
+from hyo2.qax.lib.event_stream import EventSink, EventStreamSummary, \
+    RunStartedEvent, read_events
+
+from tests.qax.lib.test_check_executor import _qa_json_dict, \
+    StateCheckToolPlugin
+
+
+class TestEventSink(unittest.TestCase):
+
+    def test_round_trip(self):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            events_file = Path(temp_dir).joinpath('events.jsonl')
+            sink = EventSink(str(events_file))
+            sink.put(RunStartedEvent(4, 2))
+            sink.put(StatusQueueItem("Running"))
+            sink.put(logging.LogRecord(
+                'qax', logging.WARNING, __file__, 1, "low %s", ('memory',),
+                None))
+            sink.close()
+            self.assertEqual(sink.written_count, 3)
+            self.assertEqual(sink.dropped_count, 0)
+
+            with events_file.open() as stream:
+                events = list(read_events(stream))
+        self.assertEqual(
+            [e['type'] for e in events], ['run_started', 'status', 'log'])
+        self.assertEqual(events[1]['status'], "Running")
+        self.assertEqual(events[2]['message'], "low memory")
+        self.assertIn('timestamp', events[0])
+
+    def test_full_buffer(self):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            events_file = Path(temp_dir).joinpath('events.jsonl')
+            sink = EventSink(str(events_file), buffer_size=2)
+            for _ in range(10):
+                sink.put(StatusQueueItem("Running"))
+            sink.close()
+        self.assertGreater(sink.dropped_count, 0)
+        self.assertEqual(sink.written_count + sink.dropped_count, 10)
+
+
+class TestEventStreamSummary(unittest.TestCase):
+
+    def test_throughput_and_eta(self):
+        summary = EventStreamSummary()
+        summary.update({
+            'type': 'run_started', 'check_count': 4, 'check_tool_count': 2,
+            'timestamp': '2021-03-01T10:00:00'})
+        summary.update({
+            'type': 'checks_updated',
+            'checks': [
+                {'data_level': 'survey_products', 'index': 0,
+                 'status': 'completed'},
+                {'data_level': 'survey_products', 'index': 1,
+                 'status': 'failed'},
+            ],
+            'timestamp': '2021-03-01T10:01:00'})
+
+        self.assertEqual(summary.finished_checks, 2)
+        self.assertEqual(summary.failed_checks, 1)
+        self.assertAlmostEqual(summary.throughput, 2.0)
+        self.assertAlmostEqual(summary.eta, 60.0)
+
+
+class TestExecutorEventStream(unittest.TestCase):
+
+    def test_run(self):
+        for workers in [1, 2]:
+            with tempfile.TemporaryDirectory() as temp_dir:
+                events_file = Path(temp_dir).joinpath('events.jsonl')
+                qa_json = QajsonRoot.from_dict(_qa_json_dict())
+                executor = CheckExecutor(qa_json, 'test profile', [])
+                executor.check_tools = [
+                    StateCheckToolPlugin("1", "pass"),
+                    StateCheckToolPlugin("2", "fail"),
+                ]
+                executor.options = {
+                    ExecutorOption.workers: workers,
+                    ExecutorOption.event_stream: str(events_file),
+                }
+                executor.run()
+
+                with events_file.open() as stream:
+                    events = list(read_events(stream))
+            types = [e['type'] for e in events]
+            self.assertEqual(types[0], 'run_started')
+            self.assertIn('checks_updated', types)
+            self.assertIn('checks_complete', types)
+
+            summary = EventStreamSummary()
+            for event in events:
+                summary.update(event)
+            self.assertEqual(summary.check_count, 4)
+            self.assertEqual(summary.finished_checks, 4)
@@ -0,0 +1,86 @@
+from pathlib import Path
+import csv
+import json
+import tempfile
+import unittest
+
+from ausseabed.qajson.model import QajsonRoot, QajsonOutputs
+from hyo2.qax.lib.export_job import ExportJob
+from hyo2.qax.lib.qajson_util import QajsonCsvExporter, QajsonExporter, \
+    QajsonJsonExporter
+
+from tests.qax.lib.test_check_executor import _qa_json_dict
+
+
+class FailingExporter(QajsonExporter):
+
+    def export(self, qajson, file, plugins=None):
+        with open(file, 'w') as output:
+            output.write("partial")
+        raise RuntimeError("export failed")
+
+
+class TestExportJob(unittest.TestCase):
+
+    def _read_csv(self, file: Path):
+        with file.open(newline='') as csv_file:
+            return list(csv.DictReader(csv_file))
+
+    def test_export(self):
+        qajson = QajsonRoot.from_dict(_qa_json_dict())
+        with tempfile.TemporaryDirectory() as temp_dir:
+            output_file = Path(temp_dir).joinpath('results.csv')
+            job = ExportJob(qajson, QajsonCsvExporter(), output_file)
+            progress = []
+            job.progress_callback = progress.append
+
+            # changes made after the job is created are not exported
+            checks = qajson.qa.get_data_level("survey_products").checks
+            checks.pop()
+            checks[0].outputs = QajsonOutputs.from_dict({
+                "execution": {"status": "completed"},
+                "files": [],
+                "check_state": "fail"
+            })
+
+            job.run()
+            self.assertEqual(job.status, "Complete")
+            rows = self._read_csv(output_file)
+            self.assertEqual(len(rows), 4)
+            self.assertNotIn("fail", [row['check_state'] for row in rows])
+            # only the output file is left in the folder
+            self.assertEqual(list(Path(temp_dir).iterdir()), [output_file])
+        self.assertEqual(progress[-1], 1.0)
+        self.assertEqual(progress, sorted(progress))
+
+    def test_save(self):
+        qajson = QajsonRoot.from_dict(_qa_json_dict())
+        with tempfile.TemporaryDirectory() as temp_dir:
+            output_file = Path(temp_dir).joinpath('qa.json')
+            job = ExportJob(qajson, QajsonJsonExporter(), output_file)
+            job.run()
+            self.assertEqual(job.status, "Complete")
+            saved = QajsonRoot.from_dict(json.loads(output_file.read_text()))
+        self.assertEqual(len(saved.qa.get_data_level("survey_products").checks), 4)
+
+    def test_cancel(self):
+        qajson = QajsonRoot.from_dict(_qa_json_dict())
+        with tempfile.TemporaryDirectory() as temp_dir:
+            output_file = Path(temp_dir).joinpath('results.csv')
+            output_file.write_text("existing")
+            job = ExportJob(qajson, QajsonCsvExporter(), output_file)
+            job.progress_callback = lambda progress: job.cancel()
+            job.run()
+            self.assertEqual(job.status, "Cancelled")
+            self.assertEqual(output_file.read_text(), "existing")
+            self.assertEqual(list(Path(temp_dir).iterdir()), [output_file])
+
+    def test_error(self):
+        qajson = QajsonRoot.from_dict(_qa_json_dict())
+        with tempfile.TemporaryDirectory() as temp_dir:
+            output_file = Path(temp_dir).joinpath('results.txt')
+            job = ExportJob(qajson, FailingExporter(), output_file)
+            job.run()
+            self.assertEqual(job.status, "Error")
+            self.assertEqual(job.error, "export failed")
+            self.assertEqual(list(Path(temp_dir).iterdir()), [])
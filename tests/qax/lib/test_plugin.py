@@ -1,16 +1,26 @@
 from pathlib import Path
 from typing import Dict, NoReturn, List
+from unittest import mock
+import pickle
+import tempfile
 import unittest
 
-from hyo2.qax.lib.config import QaxConfigCheckTool, QaxConfigProfile
+from hyo2.qax.lib.config import QaxConfig, QaxConfigCheckTool, \
+    QaxConfigProfile
 from hyo2.qax.lib.plugin import QaxCheckToolPlugin, QaxCheckReference
 from hyo2.qax.lib.plugin import QaxFileType, QaxFileGroup
-from hyo2.qax.lib.plugin import QaxPlugins
-from ausseabed.qajson.model import QajsonRoot
+from hyo2.qax.lib.plugin import QaxPlugins, QaxLazyCheckToolPlugin, \
+    _get_plugin_instance, _manifest_entry
+from hyo2.qax.lib import plugin_manifest
+from hyo2.qax.lib.plugin_manifest import PluginManifest, MANIFEST_VERSION
+from ausseabed.qajson.model import QajsonRoot, QajsonQa, QajsonDataLevel, \
+    QajsonCheck
 
 
 class MyPlugin(QaxCheckToolPlugin):
 
+    shared_instance = True
+
     supported_file_types = [
         QaxFileType(
             name="BAG file",
@@ -87,6 +97,18 @@ class MyOtherPlugin(QaxCheckToolPlugin):
         pass
 
 
+class AddCheckPlugin(MyOtherPlugin):
+
+    def add_check(
+            self,
+            data_level: QajsonDataLevel,
+            check_reference: QaxCheckReference) -> QajsonCheck:
+        check = super(AddCheckPlugin, self).add_check(
+            data_level, check_reference)
+        check.info.version = 'added by plugin'
+        return check
+
+
 class TestQaxPlugins(unittest.TestCase):
 
     check_tool_config = QaxConfigCheckTool.from_dict(
@@ -203,3 +225,157 @@ class TestQaxPlugins(unittest.TestCase):
         path = Path('test/file/path/raw.has_no_file_type')
         matching_file_type = sp1.matching_file_type(path)
         self.assertIsNone(matching_file_type)
+
+    def _load_plugins(self) -> QaxPlugins:
+        plugins = QaxPlugins()
+        plugins.plugins = [
+            plugins._load_plugin(
+                TestQaxPlugins.check_tool_profile, check_tool)
+            for check_tool in TestQaxPlugins.check_tool_profile.check_tools
+        ]
+        plugins._build_indexes()
+        return plugins
+
+    def test_get_plugin(self):
+        plugins = self._load_plugins()
+        plugin = plugins.get_plugin(
+            'test profile', 'tests.qax.lib.test_plugin.MyOtherPlugin')
+        self.assertIsInstance(plugin, MyOtherPlugin)
+        self.assertIsNone(plugins.get_plugin(
+            'other profile', 'tests.qax.lib.test_plugin.MyOtherPlugin'))
+
+    def test_get_plugin_for_check(self):
+        plugins = self._load_plugins()
+        check_id = "bff164d5-9fc8-40c5-ab36-6c73e47257bd"
+        self.assertIsInstance(
+            plugins.get_plugin_for_check(check_id), MyOtherPlugin)
+        self.assertEqual(
+            plugins.get_check_reference(check_id).name, "Test check 03")
+        self.assertIsNone(plugins.get_plugin_for_check("not a check"))
+
+        profile_plugins = plugins.get_profile_plugins(
+            TestQaxPlugins.check_tool_profile)
+        self.assertIsInstance(
+            profile_plugins.get_plugin_for_check(
+                "ecd55c7c-ce54-4555-a344-ae53ccdd774b"),
+            MyPlugin)
+
+    def test_check_reference_index(self):
+        plugin = MyPlugin()
+        check_id = "ca04d1f5-3b9e-44cd-bc96-6665df6206f9"
+        self.assertTrue(plugin.implements_check(check_id))
+
+        plugin._check_references = plugin._check_references[:1]
+        plugin.clear_check_reference_index()
+        self.assertFalse(plugin.implements_check(check_id))
+
+    def test_lazy_load(self):
+        other_profile = QaxConfigProfile.from_dict({
+            'name': 'other profile',
+            'checkTools': [{
+                'name': 'renamed check tool',
+                'pluginClass': 'tests.qax.lib.test_plugin.MyPlugin'
+            }]
+        })
+        config = QaxConfig(Path('.'))
+        config.profiles = [TestQaxPlugins.check_tool_profile, other_profile]
+
+        with tempfile.TemporaryDirectory() as temp_dir:
+            manifest_file = Path(temp_dir).joinpath('manifest.json')
+            QaxPlugins().load(config, PluginManifest(manifest_file))
+            self.assertTrue(manifest_file.exists())
+
+            # second load reads the plugin metadata from the manifest
+            manifest = PluginManifest(manifest_file)
+            plugins = QaxPlugins()
+            plugins.load(config, manifest)
+            self.assertFalse(manifest.changed)
+
+        plugin = plugins.get_plugin(
+            'other profile', 'tests.qax.lib.test_plugin.MyPlugin')
+        self.assertIsInstance(plugin, QaxLazyCheckToolPlugin)
+        self.assertFalse(plugin.is_loaded)
+        self.assertEqual(plugin.name, 'renamed check tool')
+        self.assertEqual(
+            [c.name for c in plugin.checks()],
+            ["Test check 01", "Test check 02"])
+        self.assertEqual(
+            [fg.name for fg in plugin.get_file_groups()], ["Survey DTMs"])
+        self.assertEqual(
+            plugins.get_plugin_for_check(
+                "bff164d5-9fc8-40c5-ab36-6c73e47257bd").plugin_class,
+            'tests.qax.lib.test_plugin.MyOtherPlugin')
+        self.assertFalse(plugin.is_loaded)
+
+        # instance is shared by the profiles
+        instance = plugin.get_instance()
+        self.assertIsInstance(instance, MyPlugin)
+        self.assertIs(
+            plugins.get_plugin(
+                'test profile', 'tests.qax.lib.test_plugin.MyPlugin'
+            ).get_instance(),
+            instance)
+
+        # plugins are only shared if they opt in
+        other_plugin = plugins.get_plugin(
+            'test profile', 'tests.qax.lib.test_plugin.MyOtherPlugin')
+        self.assertIsNot(
+            other_plugin.get_instance(),
+            _get_plugin_instance('tests.qax.lib.test_plugin.MyOtherPlugin'))
+
+        unpickled = pickle.loads(pickle.dumps(plugin))
+        self.assertFalse(unpickled.is_loaded)
+        self.assertEqual(unpickled.name, 'renamed check tool')
+
+    def test_lazy_overrides(self):
+        plugin_class = 'tests.qax.lib.test_plugin.AddCheckPlugin'
+        entry = _manifest_entry(_get_plugin_instance(plugin_class))
+        self.assertIn('add_check', entry['overrides'])
+        self.assertNotIn('get_file_details', entry['overrides'])
+
+        plugin = QaxLazyCheckToolPlugin(plugin_class, entry)
+        self.assertEqual(plugin.get_file_details('coverage.shp'), "")
+        self.assertFalse(plugin.is_loaded)
+
+        # methods the plugin overrides are called on the plugin
+        root = QajsonRoot(None)
+        root.qa = QajsonQa(
+            version='0.1.0', raw_data=None, survey_products=None)
+        data_level = root.qa.get_or_add_data_level('survey_products')
+        check = plugin.add_check(data_level, plugin.checks()[0])
+        self.assertTrue(plugin.is_loaded)
+        self.assertEqual(check.info.version, 'added by plugin')
+
+    def test_manifest_module_without_source(self):
+        # eg; plugin modules frozen into the QAX executable
+        plugin_class = 'tests.qax.lib.test_plugin.MyPlugin'
+        with mock.patch.object(
+                plugin_manifest, '_module_file', return_value=None), \
+                mock.patch.object(
+                    plugin_manifest, '_package_distributions',
+                    return_value={'tests': ['qax-test-plugins']}), \
+                mock.patch.object(
+                    plugin_manifest.importlib.metadata, 'version',
+                    return_value='1.2.3'), \
+                tempfile.TemporaryDirectory() as temp_dir:
+            self.assertEqual(
+                plugin_manifest.module_stamp(plugin_class),
+                f"{MANIFEST_VERSION}:tests.qax.lib.test_plugin:"
+                "qax-test-plugins==1.2.3")
+
+            manifest = PluginManifest(Path(temp_dir).joinpath('manifest.json'))
+            manifest.set(plugin_class, {'name': 'MyPlugin test'})
+            self.assertEqual(
+                manifest.get(plugin_class)['name'], 'MyPlugin test')
+
+        # the version of QAX is used if the distribution isn't known
+        with mock.patch.object(
+                plugin_manifest, '_module_file', return_value=None), \
+                mock.patch.object(
+                    plugin_manifest, '_package_distributions',
+                    return_value={}), \
+                mock.patch('hyo2.qax.__version__', '2.0.0'):
+            self.assertEqual(
+                plugin_manifest.module_stamp(plugin_class),
+                f"{MANIFEST_VERSION}:tests.qax.lib.test_plugin:"
+                "hyo2.qax==2.0.0")
@@ -0,0 +1,122 @@
+from pathlib import Path
+from typing import Dict, NoReturn, List
+import unittest
+
+from hyo2.qax.lib.plugin import QaxCheckToolPlugin, QaxCheckReference, \
+    QaxFileType, file_extensions
+from hyo2.qax.lib.plugin_service import PluginService
+
+from tests.qax.lib.test_plugin import MyPlugin
+
+
+class ArchivePlugin(QaxCheckToolPlugin):
+
+    supported_file_types = [
+        QaxFileType(
+            name="Compressed BAG file",
+            extension="bag.gz",
+            group="Compressed",
+        ),
+        QaxFileType(
+            name="Gzip file",
+            extension="gz",
+            group="Compressed",
+        ),
+        QaxFileType(
+            name="Any file",
+            extension="*",
+            group="Other",
+        )
+    ]
+
+    def __init__(self):
+        super(ArchivePlugin, self).__init__()
+        self.name = 'ArchivePlugin test'
+
+    def checks(self) -> List[QaxCheckReference]:
+        return [
+            QaxCheckReference(
+                id="0b3c6ba4-6f3b-4c55-a3a5-9a0f1c0e1d01",
+                name="Test archive check",
+                data_level="survey_products",
+                supported_file_types=ArchivePlugin.supported_file_types
+            )
+        ]
+
+    def run(self, qajson: Dict) -> NoReturn:
+        pass
+
+    def get_file_details(self, filename: str) -> str:
+        return "archive"
+
+
+class TestPluginService(unittest.TestCase):
+
+    def test_file_extensions(self):
+        self.assertEqual(
+            file_extensions(Path('/data/Line.0001.BAG.gz')),
+            ['0001.bag.gz', 'bag.gz', 'gz'])
+        self.assertEqual(file_extensions(Path('/data/README')), [])
+
+    def test_identify_file_group(self):
+        plugin_service = PluginService([MyPlugin(), ArchivePlugin()])
+        self.assertEqual(
+            plugin_service.identify_file_group('/data/survey.bag'),
+            "Survey DTMs")
+        self.assertEqual(
+            plugin_service.identify_file_group('/data/SURVEY.BAG'),
+            "Survey DTMs")
+        self.assertEqual(
+            plugin_service.identify_file_group('/data/survey.tif'),
+            "Unknown")
+
+        registry = plugin_service.file_type_registry
+        file_types = registry.file_types('/data/survey.BAG.gz')
+        self.assertEqual(
+            [ft.name for _, ft in file_types], ["Compressed BAG file"])
+        self.assertEqual(
+            [ft.name for _, ft in registry.file_types('/data/survey.gz')],
+            ["Gzip file"])
+
+        self.assertEqual(
+            plugin_service.get_all_file_group_names(),
+            ["Compressed", "Other", "Survey DTMs", "Unknown"])
+
+    def test_supporting_checks(self):
+        registry = PluginService([MyPlugin(), ArchivePlugin()]) \
+            .file_type_registry
+        self.assertEqual(
+            [c.name for c in registry.supporting_checks(
+                '/data/survey.csar', "Survey DTMs")],
+            ["Test check 01", "Test check 02"])
+        self.assertEqual(
+            [c.name for c in registry.supporting_checks(
+                '/data/notes.txt', "Other")],
+            ["Test archive check"])
+        self.assertEqual(
+            registry.supporting_checks('/data/survey.csar', "Compressed"), [])
+
+    def test_checks_supporting_files(self):
+        plugins = [MyPlugin(), ArchivePlugin()]
+        registry = PluginService(plugins).file_type_registry
+        checks = [c for p in plugins for c in p.checks()]
+        file_groups = [
+            [(Path('/data/a.bag'), "Survey DTMs")],
+            [(Path('/data/a.bag'), "Survey DTMs"),
+             (Path('/data/b.csar'), "Survey DTMs")],
+            [(Path('/data/a.bag'), "Survey DTMs"),
+             (Path('/data/notes.txt'), "Other")],
+            [(Path('/data/notes.txt'), "Other"),
+             (Path('/data/a.BAG.gz'), "Other")],
+            [(Path('/data/a.bag.gz'), "Survey DTMs")],
+        ]
+        for files in file_groups:
+            self.assertEqual(
+                [c.id for c in registry.checks_supporting_files(files)],
+                [c.id for c in checks if c.supports_files(files)])
+
+    def test_get_file_details(self):
+        plugin_service = PluginService([ArchivePlugin()])
+        self.assertEqual(
+            plugin_service.get_file_details('/data/notes.txt'), "archive")
+        self.assertEqual(PluginService([]).get_file_details('a.bag'), "")
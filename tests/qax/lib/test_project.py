@@ -6,7 +6,7 @@ from ausseabed.qajson.parser import QajsonParser
 from ausseabed.qajson.model import QajsonRoot, QajsonQa, QajsonQa, \
     QajsonDataLevel, QajsonCheck, QajsonOutputs, QajsonInputs, QajsonInfo, \
     QajsonParam, QajsonExecution, QajsonGroup, QajsonFile
-from hyo2.qax.lib.project import QaCheckSummary
+from hyo2.qax.lib.project import QaCheckSummary, QaCheckSummaryIndex
 
 
 class TestQaCheckSummary(unittest.TestCase):
@@ -125,3 +125,63 @@ class TestQaCheckSummary(unittest.TestCase):
         self.assertEqual(summary_02.total_executions, 1)
         self.assertEqual(summary_02.failed_executions, 1)
         self.assertEqual(summary_02.failed_check_state, 0)
+
+    def test_summary_index_update(self):
+        qa_json = QajsonRoot.from_dict(TestQaCheckSummary.qa_json.to_dict())
+        index = QaCheckSummaryIndex(qa_json)
+        summary_01 = index.summaries[0]
+        self.assertEqual(
+            [f.path for f in summary_01.failed_check_state_files],
+            ["file4.txt"])
+
+        # checks are updated in place, as done by a check run
+        checks = qa_json.qa.get_data_level('raw_data').checks
+        checks[0].outputs.check_state = 'warning'
+        checks[2].outputs.check_state = 'pass'
+        index.update_checks([('raw_data', 0), ('raw_data', 2)])
+
+        self.assertIs(index.summaries[0], summary_01)
+        self.assertEqual(summary_01.total_executions, 3)
+        self.assertEqual(summary_01.failed_check_state, 0)
+        self.assertEqual(summary_01.warning_check_state, 1)
+        self.assertEqual(summary_01.failed_check_state_files, [])
+        self.assertEqual(
+            [f.path for f in summary_01.warning_check_state_files],
+            ["file1.txt"])
+        self.assertEqual(
+            [c.inputs.files[0].path for c in summary_01.checks],
+            ["file1.txt", "file3.txt", "file4.txt"])
+
+        # same result as building the summary from all checks
+        rebuilt = QaCheckSummary.get_summary(qa_json)
+        self.assertEqual(
+            [
+                (s.id, s.total_executions, s.failed_executions,
+                    s.failed_check_state, s.warning_check_state)
+                for s in index.summaries
+            ],
+            [
+                (s.id, s.total_executions, s.failed_executions,
+                    s.failed_check_state, s.warning_check_state)
+                for s in rebuilt
+            ])
+
+    def test_summary_files(self):
+        qa_json = QajsonRoot.from_dict(TestQaCheckSummary.qa_json.to_dict())
+        checks = qa_json.qa.get_data_level('raw_data').checks
+        summary = QaCheckSummary("1", "check 01", "1", "raw_data")
+        for index, check in enumerate(checks):
+            summary.add_check(check, index)
+
+        checks[0].outputs.check_state = 'fail'
+        summary.add_check(checks[0], 0)
+        self.assertEqual(summary.failed_check_state, 2)
+        self.assertEqual(
+            sorted([f.path for f in summary.failed_check_state_files]),
+            ["file1.txt", "file4.txt"])
+
+        summary.remove_check(0)
+        self.assertEqual(len(summary), len(checks) - 1)
+        self.assertEqual(summary.failed_check_state, 1)
+        self.assertEqual(
+            [f.path for f in summary.failed_check_state_files], ["file4.txt"])
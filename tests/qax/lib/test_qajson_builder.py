@@ -0,0 +1,51 @@
+from pathlib import Path
+from typing import List
+import unittest
+
+from ausseabed.qajson.model import QajsonParam
+
+from hyo2.qax.lib.config import QaxConfig
+from hyo2.qax.lib.plugin import QaxPlugins, QaxCheckReference
+from hyo2.qax.lib.plugin_service import PluginService
+from hyo2.qax.lib.qajson_builder import build_qajson, group_files
+
+from tests.qax.lib.test_plugin import TestQaxPlugins
+
+
+class TestQajsonBuilder(unittest.TestCase):
+
+    def setUp(self):
+        self._previous_instance = QaxPlugins._instance
+        config = QaxConfig(Path('.'))
+        config.profiles = [TestQaxPlugins.check_tool_profile]
+        self.plugins = QaxPlugins()
+        self.plugins.load(config)
+
+    def tearDown(self):
+        QaxPlugins._instance = self._previous_instance
+
+    def test_build_qajson_multiple_plugins(self):
+        plugin_service = PluginService(self.plugins.plugins)
+        grouped_files = group_files(
+            plugin_service, ['/data/survey.bag', '/data/coverage.shp'])
+        checks = []
+        for plugin in self.plugins.plugins:
+            checks.extend(plugin.checks())
+
+        def check_params(check: QaxCheckReference) -> List[QajsonParam]:
+            plugin = self.plugins.get_plugin_for_check(check.id)
+            return [QajsonParam(name='plugin', value=plugin.plugin_class)]
+
+        root = build_qajson(
+            plugin_service, grouped_files, checks, None,
+            check_params=check_params)
+
+        qajson_checks = root.qa.survey_products.checks
+        self.assertEqual(
+            [c.info.name for c in qajson_checks],
+            ["Test check 01", "Test check 02", "Test check 03"])
+        for qajson_check in qajson_checks:
+            plugin = self.plugins.get_plugin_for_check(qajson_check.info.id)
+            self.assertEqual(
+                [(p.name, p.value) for p in qajson_check.inputs.params],
+                [('plugin', plugin.plugin_class)])
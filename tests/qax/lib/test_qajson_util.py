@@ -1,16 +1,51 @@
+import csv
+import importlib.util
 import os
 from collections import OrderedDict
 from pathlib import Path
+import tempfile
 import unittest
 
 
 from ausseabed.qajson.model import QajsonFile, QajsonParam, QajsonInputs, \
     QajsonOutputs, QajsonInfo, QajsonRoot, QajsonQa, QajsonDataLevel
 from ausseabed.qajson.parser import QajsonParser
-from hyo2.qax.lib.plugin import QaxPlugins, QaxConfig
+from hyo2.qax.lib.plugin import QaxPlugins, QaxConfig, QaxProfilePlugins
 from hyo2.qax.lib.qajson_util import QajsonExcelExporter, QajsonTableSummary, QajsonFileSummary
+from hyo2.qax.lib.qajson_util import _ColumnBlockSpool, \
+    CHECK_RESULT_COLUMNS, QajsonCsvExporter, QajsonParquetExporter, \
+    iter_check_results, count_check_results, get_exporters, \
+    register_exporter, unregister_exporter, QajsonExporter
 from hyo2.qax.app.gui_settings import GuiSettings
 
+from tests.qax.lib.test_check_executor import _qa_json_dict, \
+    StateCheckToolPlugin
+
+
+class SummaryCheckToolPlugin(StateCheckToolPlugin):
+    """ Test plugin that provides a summary field for each check and counts
+    the calls made to get the summary values
+    """
+
+    def __init__(self, check_id: str):
+        super(SummaryCheckToolPlugin, self).__init__(check_id, "pass")
+        self.summary_calls = 0
+
+    def get_summary_details(self, qajson: QajsonRoot):
+        return [
+            ("header", "File Name"),
+            ("checks", f"check {self._check_references[0].id}"),
+        ]
+
+    def get_summary_value(
+            self, field_section, field_name, filename, qajson) -> object:
+        return f"{field_name} {filename}"
+
+    def get_summary_values(self, fields, filename, qajson):
+        self.summary_calls += 1
+        return super(SummaryCheckToolPlugin, self).get_summary_values(
+            fields, filename, qajson)
+
 class TestParser(unittest.TestCase):
 
     def test_qajson_read(self):
@@ -92,3 +127,135 @@ class TestParser(unittest.TestCase):
         self.assertEqual(safe_name, 'Zi1039_B11_MBES_c1m')
 
         existing_data.append(summary3)
+
+    def test_table_summary(self):
+        qajson = QajsonRoot.from_dict(_qa_json_dict())
+        plugin_1 = SummaryCheckToolPlugin("1")
+        plugin_2 = SummaryCheckToolPlugin("2")
+        table_summary = QajsonTableSummary(
+            qajson, QaxProfilePlugins([plugin_1, plugin_2]))
+        table_summary.initialise_check_list()
+        table_summary.initialise_file_list()
+        table_summary.build_template()
+        table_summary.build()
+
+        # File Name is provided by the first plugin that includes it
+        self.assertIs(
+            table_summary.field_plugins[("header", "File Name")], plugin_1)
+        # one call to each plugin for each file
+        self.assertEqual(plugin_1.summary_calls, 2)
+        self.assertEqual(plugin_2.summary_calls, 2)
+
+        file_summary = table_summary.file_summaries[1]
+        values = {
+            (section.name, field.name): field.value
+            for section in file_summary.sections
+            for field in section.fields
+        }
+        self.assertEqual(values[("header", "Summary")], "no plugin")
+        self.assertEqual(
+            values[("header", "File Name")], "File Name file2.tif")
+        self.assertEqual(values[("checks", "check 2")], "check 2 file2.tif")
+
+    def test_column_block_spool(self):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            spool = _ColumnBlockSpool(Path(temp_dir), block_size=2)
+            for i in range(5):
+                spool.add([f"file {i}", i, None])
+            rows = list(spool.rows())
+        self.assertEqual(len(spool.block_files), 3)
+        self.assertEqual(
+            rows,
+            [
+                [f"file {i}" for i in range(5)],
+                list(range(5)),
+                [None] * 5,
+            ]
+        )
+
+    def test_constant_memory_export(self):
+        qajson = QajsonRoot.from_dict(_qa_json_dict())
+        plugins = QaxProfilePlugins([
+            SummaryCheckToolPlugin("1"), SummaryCheckToolPlugin("2")])
+        with tempfile.TemporaryDirectory() as temp_dir:
+            for constant_memory in [True, False]:
+                output_file = Path(temp_dir).joinpath(
+                    f'summary_{constant_memory}.xlsx')
+                exporter = QajsonExcelExporter(constant_memory)
+                exporter.export(qajson, file=output_file, plugins=plugins)
+                self.assertTrue(output_file.is_file())
+
+    def _run_qajson(self) -> QajsonRoot:
+        qajson = QajsonRoot.from_dict(_qa_json_dict())
+        for plugin in [
+                StateCheckToolPlugin("1", "pass"),
+                StateCheckToolPlugin("2", "fail")]:
+            plugin.run(qajson, lambda *args: None, lambda: None)
+        return qajson
+
+    def test_check_results(self):
+        rows = list(iter_check_results(self._run_qajson()))
+        self.assertEqual(len(rows), 4)
+        self.assertEqual(
+            [(r['check_id'], r['input_file'], r['check_state']) for r in rows],
+            [
+                ("1", "file1.tif", "pass"),
+                ("2", "file1.tif", "fail"),
+                ("1", "file2.tif", "pass"),
+                ("2", "file2.tif", "fail"),
+            ]
+        )
+        self.assertEqual(rows[0]['status'], "completed")
+        self.assertEqual(rows[0]['data_level'], "survey_products")
+
+    def test_csv_export(self):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            output_file = Path(temp_dir).joinpath('results.csv')
+            QajsonCsvExporter().export(self._run_qajson(), output_file)
+            with output_file.open(newline='') as csv_file:
+                rows = list(csv.DictReader(csv_file))
+        self.assertEqual(len(rows), 4)
+        self.assertEqual(
+            list(rows[0].keys()), [name for name, _ in CHECK_RESULT_COLUMNS])
+        self.assertEqual(rows[1]['check_state'], "fail")
+
+    @unittest.skipIf(
+        importlib.util.find_spec('pyarrow') is None, "requires pyarrow")
+    def test_parquet_export(self):
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        with tempfile.TemporaryDirectory() as temp_dir:
+            output_file = Path(temp_dir).joinpath('results.parquet')
+            QajsonParquetExporter().export(self._run_qajson(), output_file)
+            table = pq.read_table(str(output_file))
+        self.assertEqual(table.num_rows, 4)
+        self.assertTrue(
+            pa.types.is_dictionary(table.schema.field('check_id').type))
+        self.assertEqual(
+            table.column('check_state').to_pylist(),
+            ["pass", "fail", "pass", "fail"])
+
+    def test_count_check_results(self):
+        qajson = self._run_qajson()
+        self.assertEqual(
+            count_check_results(qajson),
+            len(list(iter_check_results(qajson))))
+
+    def test_exporter_registry(self):
+        class TextExporter(QajsonExporter):
+            def __init__(self) -> None:
+                super().__init__()
+                self.name = "Text"
+                self.extension = "txt"
+
+        expected = ["Microsoft Excel", "CSV"]
+        if importlib.util.find_spec('pyarrow') is not None:
+            expected.append("Parquet")
+        self.assertEqual([e.name for e in get_exporters()], expected)
+        register_exporter(TextExporter)
+        try:
+            self.assertIsInstance(get_exporters()[-1], TextExporter)
+        finally:
+            unregister_exporter(TextExporter)
+        self.assertEqual(len(get_exporters()), len(expected))
@@ -0,0 +1,85 @@
+from pathlib import Path
+import tempfile
+import unittest
+
+from hyo2.qax.lib.check_executor import CheckJob
+from hyo2.qax.lib.data import RasterBandInfo, RasterFileInfo
+from hyo2.qax.lib.scheduler import MemoryAdmission, raster_memory, \
+    RASTER_MEMORY_FACTOR, SchedulingPolicy, ThroughputHistory, order_jobs, \
+    DEFAULT_THROUGHPUT
+
+
+class FixedMemoryAdmission(MemoryAdmission):
+    """ Uses a fixed amount of available memory rather than that reported
+    by psutil
+    """
+
+    def __init__(self, available: int):
+        super(FixedMemoryAdmission, self).__init__(memory_fraction=0.5)
+        self.available = available
+
+    def memory_limit(self, running_memory: int) -> int:
+        return int(self.memory_fraction * (self.available + running_memory))
+
+
+class TestScheduler(unittest.TestCase):
+
+    def test_raster_memory(self):
+        file_info = RasterFileInfo()
+        file_info.size_x = 40000
+        file_info.size_y = 100
+        file_info.bands = [
+            RasterBandInfo(1, 'depth', 'Float32'),
+            RasterBandInfo(2, 'density', 'Int16'),
+        ]
+        # tile size limits the number of pixels processed at once
+        self.assertEqual(
+            raster_memory(file_info, 1000, 1000),
+            1000 * 100 * 6 * RASTER_MEMORY_FACTOR
+        )
+
+    def test_admission(self):
+        jobs = [CheckJob(i, None, []) for i in range(3)]
+        memory = {0: 400, 1: 350, 2: 100}
+        admission = FixedMemoryAdmission(available=1000)
+
+        # first job always starts
+        self.assertEqual(admission.select(jobs, [], memory), 0)
+        # limit is 0.5 * (1000 + 400), so only the smallest job fits
+        self.assertEqual(admission.select(jobs[1:], jobs[:1], memory), 1)
+        self.assertIsNone(admission.select(jobs[1:2], jobs[:1], memory))
+
+        # no estimates are needed when the memory limit is disabled
+        admission.memory_fraction = 0
+        self.assertFalse(admission.enabled)
+        self.assertEqual(admission.select(jobs[1:2], jobs[:1], {}), 0)
+
+    def test_throughput_history(self):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            path = Path(temp_dir).joinpath('history.json')
+            history = ThroughputHistory(path)
+            history.record(['a', 'b'], megabytes=100, seconds=10)
+            history.record(['c'], megabytes=100, seconds=1)
+            history.save()
+
+            history = ThroughputHistory(path)
+            history.load()
+            self.assertEqual(history.predict(['c'], 50), 0.5)
+            # slowest check of a group determines the duration
+            self.assertEqual(history.predict(['a', 'c'], 50), 5.0)
+            self.assertEqual(
+                history.predict(['unknown'], 50), 50 / DEFAULT_THROUGHPUT)
+
+    def test_order_jobs(self):
+        durations = {'slow': 10.0, 'quick': 1.0, 'medium': 5.0}
+        jobs = ['slow', 'quick', 'medium']
+        self.assertEqual(
+            order_jobs(jobs, SchedulingPolicy.sjf, durations.get),
+            ['quick', 'medium', 'slow']
+        )
+        self.assertEqual(
+            order_jobs(jobs, SchedulingPolicy.fifo, durations.get), jobs)
+        self.assertEqual(
+            sorted(order_jobs(jobs, SchedulingPolicy.arbitrary, None)),
+            sorted(jobs)
+        )
@@ -0,0 +1,43 @@
+from pathlib import Path
+import json
+import tempfile
+import time
+import unittest
+
+from hyo2.qax.lib.telemetry import CheckTelemetry, ResourceMonitor, \
+    TelemetryWriter
+
+
+class TestTelemetry(unittest.TestCase):
+
+    def test_resource_monitor(self):
+        monitor = ResourceMonitor(interval=0.01)
+        monitor.start()
+        data = [0] * 1000000
+        end = time.monotonic() + 0.2
+        while time.monotonic() < end:
+            pass
+        telemetry = monitor.stop()
+        del data
+
+        self.assertGreaterEqual(telemetry.wall_time, 0.2)
+        self.assertGreater(telemetry.cpu_time, 0.0)
+        self.assertGreater(telemetry.peak_rss, 0)
+
+    def test_writer(self):
+        telemetry = CheckTelemetry(1.0, 0.5, 1024, None)
+        with tempfile.TemporaryDirectory() as temp_dir:
+            path = Path(temp_dir).joinpath('telemetry.jsonl')
+            writer = TelemetryWriter(path)
+            writer.write([dict(telemetry.to_dict(), check_id='1')])
+            writer.write([dict(telemetry.to_dict(), check_id='2')])
+
+            records = [
+                json.loads(line)
+                for line in path.read_text().split('\n') if line
+            ]
+            self.assertEqual([r['check_id'] for r in records], ['1', '2'])
+            self.assertEqual(
+                CheckTelemetry.from_dict(records[0]).to_dict(),
+                telemetry.to_dict()
+            )
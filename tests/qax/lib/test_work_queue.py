@@ -0,0 +1,118 @@
+from pathlib import Path
+import multiprocessing as mp
+import tempfile
+import unittest
+
+from ausseabed.qajson.model import QajsonRoot
+from hyo2.qax.lib.check_executor import CheckExecutor
+from hyo2.qax.lib.check_options import CheckOption, ExecutorOption
+from hyo2.qax.lib.work_queue import WorkQueue, QueueWorker, JOB_DONE, \
+    JOB_CANCELLED, decode_options, encode_options
+
+from tests.qax.lib.test_check_executor import _qa_json_dict, \
+    StateCheckToolPlugin
+
+CHECK_STATES = {"1": "pass", "2": "fail"}
+
+
+def _get_plugin(profile_name: str, check_tool_class: str):
+    check_id = check_tool_class[-1]
+    return StateCheckToolPlugin(check_id, CHECK_STATES[check_id])
+
+
+def _run_worker(path: str, worker_id: str) -> None:
+    worker = QueueWorker(Path(path), worker_id, get_plugin=_get_plugin)
+    worker.run(poll_interval=0.1, idle_timeout=3.0)
+
+
+class TestWorkQueue(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.path = Path(self.temp_dir.name).joinpath('queue.db')
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def test_options(self):
+        options = {
+            CheckOption.gridprocessing_tile_x: 10,
+            ExecutorOption.workers: 4,
+        }
+        self.assertEqual(
+            decode_options(encode_options(options)),
+            {CheckOption.gridprocessing_tile_x: 10}
+        )
+
+    def test_claim(self):
+        work_queue = WorkQueue(self.path)
+        qajson = _qa_json_dict()
+        work_queue.submit('run', 0, 'test', 'Plugin1', {}, qajson)
+        work_queue.submit('run', 1, 'test', 'Plugin2', {}, qajson)
+
+        other_queue = WorkQueue(self.path)
+        item_a = work_queue.claim('a')
+        item_b = other_queue.claim('b')
+        self.assertEqual(item_a.check_tool_class, 'Plugin1')
+        self.assertEqual(item_b.check_tool_class, 'Plugin2')
+        self.assertIsNone(work_queue.claim('a'))
+
+        # jobs can only be completed by the worker that claimed them
+        self.assertFalse(work_queue.complete(item_a.id, 'b', qajson))
+        self.assertTrue(work_queue.complete(item_a.id, 'a', qajson))
+        work_queue.cancel('run')
+        # cancelled jobs can't be completed
+        self.assertFalse(other_queue.complete(item_b.id, 'b', qajson))
+        self.assertEqual(
+            [s.status for s in work_queue.statuses('run')],
+            [JOB_DONE, JOB_CANCELLED]
+        )
+
+    def test_requeue_stale(self):
+        work_queue = WorkQueue(self.path)
+        work_queue.submit('run', 0, 'test', 'Plugin1', {}, _qa_json_dict())
+        item = work_queue.claim('a')
+        self.assertEqual(work_queue.requeue_stale(stale_timeout=-1), 1)
+        self.assertFalse(work_queue.is_running(item.id))
+        self.assertEqual(work_queue.claim('b').id, item.id)
+
+        # the worker that abandoned the job can no longer update it
+        self.assertFalse(work_queue.heartbeat(item.id, 'a'))
+        self.assertFalse(work_queue.set_progress(item.id, 'a', 0.5))
+        self.assertFalse(work_queue.complete(item.id, 'a', _qa_json_dict()))
+        self.assertFalse(work_queue.fail(item.id, 'a', "lost"))
+        self.assertTrue(work_queue.is_running(item.id))
+        self.assertTrue(work_queue.complete(item.id, 'b', _qa_json_dict()))
+
+    def test_run_distributed(self):
+        qa_json = QajsonRoot.from_dict(_qa_json_dict())
+        executor = CheckExecutor(qa_json, 'test profile', [])
+        executor.check_tools = [
+            StateCheckToolPlugin("1", CHECK_STATES["1"]),
+            StateCheckToolPlugin("2", CHECK_STATES["2"]),
+        ]
+        executor.options = {
+            ExecutorOption.work_queue: str(self.path),
+            ExecutorOption.split_by_file_group: True,
+        }
+
+        workers = [
+            mp.Process(target=_run_worker, args=(str(self.path), f"w{i}"))
+            for i in range(3)
+        ]
+        for worker in workers:
+            worker.start()
+        executor.run()
+        for worker in workers:
+            worker.join()
+
+        self.assertEqual(executor.status, "Complete")
+        self.assertEqual(
+            [
+                check.outputs.check_state
+                for check in executor.qa_json.qa.survey_products.checks
+            ],
+            ["pass", "fail", "pass", "fail"]
+        )
+        # jobs of completed runs are removed from the queue
+        self.assertEqual(WorkQueue(self.path).statuses('run'), [])